@@ -11,42 +11,20 @@ import pandas as pd
 import os
 from datetime import datetime, timedelta, date
 from auth import authenticate_user, get_current_user, is_authenticated, initialize_auth, logout
-from utils import load_data, get_user_badges, get_team_by_id
-from models.team import Team
-from models.user import User
-from models.badge import Badge
-from models.sprint import Sprint
-from models.badge_award import BadgeAward
-from crud.db_manager import DatabaseManager
+from utils import get_user_badges, get_team_by_id
+from session_initializer import initialize_app_data, initialize_auth_state, refresh_session_data
+from monitoring.timing import begin_page, section, end_page
 
-# Ensure database is populated with initial data in the correct order
-# This will only add sample data if the tables are empty
-load_data('teams')  # First, create teams
-load_data('badges')  # Then badges
-load_data('users')  # Then users (which have team dependencies)
-load_data('sprints')  # Then sprints (which have team dependencies)
-load_data('awards')  # Finally awards (which depend on badges, users, and potentially sprints)
-
-# Store data in session state for UI rendering
-if 'teams' not in st.session_state:
-    st.session_state.teams = DatabaseManager.get_all(Team)
-if 'badges_dict' not in st.session_state:
-    all_badges = DatabaseManager.get_all(Badge)
-    st.session_state.badges_dict = {badge['id']: badge for badge in all_badges}
-if 'users' not in st.session_state:
-    st.session_state.users = DatabaseManager.get_all(User)
-if 'awards' not in st.session_state:
-    st.session_state.awards = DatabaseManager.get_all(BadgeAward)
-if 'sprints' not in st.session_state:
-    st.session_state.sprints = DatabaseManager.get_all(Sprint)
-if 'badges' not in st.session_state:
-    st.session_state.badges = st.session_state.badges_dict
+begin_page("Home")
+section("Bootstrap data")
+# Load teams, badges, users, awards and sprints into session state.
+# The five collections are fetched concurrently, once per session, and
+# reloaded when another process writes to their table.
+refresh_session_data()
+initialize_app_data()
 
 # Initialize session state for authentication
-if 'authenticated' not in st.session_state:
-    st.session_state.authenticated = False
-if 'current_user' not in st.session_state:
-    st.session_state.current_user = None
+initialize_auth_state()
 
 # Initialize authentication (for backwards compatibility)
 initialize_auth()
@@ -54,6 +32,7 @@ initialize_auth()
 # App title
 st.title("🏆 IT Team Gamification Platform")
 
+section("Login")
 # Authentication check
 if not is_authenticated():
     # Show login form
@@ -82,6 +61,7 @@ else:
     # Show the main content when authenticated
     user = get_current_user()
     
+    section("Sidebar")
     # Sidebar
     with st.sidebar:
         st.write(f"👤 Logged in as: **{user['name']}**")
@@ -105,6 +85,7 @@ else:
             logout()
             st.rerun()
     
+    section("Welcome")
     # Main page content
     st.markdown("""
     ## Welcome to the IT Team Gamification Platform
@@ -130,6 +111,7 @@ else:
     Use the navigation sidebar to explore the platform's features.
     """)
     
+    section("Badge summary")
     # Display some key metrics
     st.subheader("Your Badge Summary")
     
@@ -170,6 +152,7 @@ else:
             team_rank = "Top 5"
         st.metric("Team Ranking", team_rank)
     
+    section("Recent activity")
     # Recent activity
     st.subheader("Recent Activity")
     
@@ -188,3 +171,5 @@ else:
         st.dataframe(recent_awards_df, use_container_width=True)
     else:
         st.info("No badges awarded yet. Start completing tasks to earn badges!")
+
+end_page()
@@ -73,7 +73,9 @@ def user_has_access(feature_name):
         'edit_teams': ['Manager'],
         'create_sprints': ['Manager'],
         'view_reports': ['Manager'],
-        'export_data': ['Manager']
+        'export_data': ['Manager'],
+        'view_memory': ['Manager'],
+        'bulk_import': ['Manager']
     }
     
     if feature_name in access_rules:
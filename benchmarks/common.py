@@ -0,0 +1,181 @@
+# benchmarks/common.py
+"""
+Shared pieces of the benchmark suites: generated datasets, measurement,
+isolated worker processes and the JSON results format read by compare.py.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from statistics import median
+
+RESULTS_FORMAT = 1
+BENCH_DIR = os.environ.get('BENCH_DIR', os.path.join('.cache', 'benchmarks'))
+DATASET_SEED = 42
+DEFAULT_REPEAT = 3
+# Benchmarks measure computation, not cache hits: the warm-start snapshot and
+# the shared and report result caches default to files under .cache/ that
+# outlive a run, so all three are turned off, along with the debug panel
+BENCH_ENV = {'SNAPSHOT_PATH': '', 'SHARED_CACHE_PATH': '', 'REPORT_CACHE_PATH': '', 'PERF_DEBUG_PANEL': '0'}
+
+def org_params(awards):
+    """Generator arguments for an organisation holding the given number of awards."""
+    if awards <= 10_000:
+        return {'teams': 10, 'users': 200, 'badges': 100, 'awards': awards, 'years': 1}
+    if awards <= 200_000:
+        return {'teams': 40, 'users': 2_000, 'badges': 300, 'awards': awards, 'years': 2}
+    return {'teams': 100, 'users': 10_000, 'badges': 500, 'awards': awards, 'years': 3}
+
+def prepare_database(awards, seed=DATASET_SEED, end_date=None, directory=BENCH_DIR):
+    """
+    Return the URL of a SQLite database holding a generated organisation.
+    Datasets are cached on disk by their parameters, so repeated runs reuse them.
+    """
+    end_date = end_date or date.today().isoformat()
+    params = org_params(awards)
+    path = os.path.abspath(os.path.join(directory, f"org-{awards}-s{seed}-{end_date}.db"))
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        command = [sys.executable, '-m', 'data.generate_org', '--database-url', f"sqlite:///{tmp_path}",
+                   '--reset', '--seed', str(seed), '--end-date', end_date]
+        for name, value in params.items():
+            command += [f"--{name}", str(value)]
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env=worker_env())
+        os.replace(tmp_path, path)
+    return f"sqlite:///{path}"
+
+def worker_env(database_url=None):
+    """Environment for worker processes: no persistent caches, no debug panel (BENCH_ENV)."""
+    env = dict(os.environ, **BENCH_ENV)
+    if database_url:
+        env['DATABASE_URL'] = database_url
+    return env
+
+def run_worker(module, args, database_url, timeout=None):
+    """
+    Run `python -m module --worker ...` against database_url and return the
+    JSON document it prints on its last stdout line. Failures and timeouts are
+    returned as {'status': ...} instead of raised, so one slow case does not
+    lose the rest of the run.
+    """
+    command = [sys.executable, '-m', module, '--worker', *args]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout,
+                                   env=worker_env(database_url))
+    except subprocess.TimeoutExpired:
+        return {'status': 'timeout', 'timeout_s': timeout}
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        return {'status': 'error', 'error': completed.stderr.strip().splitlines()[-1:] or ['no output']}
+    return json.loads(lines[-1])
+
+def measure(fn, repeat=DEFAULT_REPEAT, warmup=1, count_queries=None):
+    """
+    Time fn over `repeat` runs after `warmup` untimed runs.
+    count_queries is a context manager factory yielding an object with a
+    `count` attribute (monitoring.query_stats.collect_queries by default).
+    Peak memory is the largest traced allocation during one extra run; it is
+    taken separately because tracemalloc slows everything down.
+    """
+    if count_queries is None:
+        from monitoring.query_stats import collect_queries as count_queries
+
+    for _ in range(warmup):
+        fn()
+    wall_ms, queries = [], 0
+    for _ in range(repeat):
+        with count_queries() as stats:
+            started = time.perf_counter()
+            fn()
+            wall_ms.append((time.perf_counter() - started) * 1000)
+        queries = stats.count
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'wall_ms_median': round(median(wall_ms), 3),
+        'wall_ms_min': round(min(wall_ms), 3),
+        'wall_ms_max': round(max(wall_ms), 3),
+        'queries': queries,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of samples as {'p50': ..., ...}."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{p}": None for p in points}
+    result = {}
+    for p in points:
+        rank = max(1, -(-len(ordered) * p // 100))
+        result[f"p{p}"] = round(ordered[rank - 1], 3)
+    return result
+
+def environment_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    import sqlalchemy
+    return {
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'platform': platform.platform(),
+        # Every suite runs with BENCH_ENV
+        'persistent_caches': 'disabled',
+    }
+
+def default_results_path(suite):
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    return os.path.join(BENCH_DIR, f"{suite}-{stamp}.json")
+
+def write_results(path, suite, results, **settings):
+    """
+    Write a results file. Every result is
+    {'case': str, 'scale': str, 'status': 'ok'|..., 'metrics': {name: number}}.
+    """
+    document = {
+        'format': RESULTS_FORMAT,
+        'suite': suite,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment_info(),
+        'settings': settings,
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return path
+
+def read_results(path):
+    with open(path) as f:
+        document = json.load(f)
+    if document.get('format') != RESULTS_FORMAT:
+        raise ValueError(f"{path} is not a benchmark results file (format {document.get('format')})")
+    return document
+
+def parse_scales(value):
+    """Parse '1k,100k,1M' into [1000, 100000, 1000000]."""
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    scales = []
+    for item in value.split(','):
+        item = item.strip().lower()
+        if item[-1:] in multipliers:
+            scales.append(int(float(item[:-1]) * multipliers[item[-1]]))
+        elif item:
+            scales.append(int(item))
+    return scales
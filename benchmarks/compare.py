@@ -0,0 +1,92 @@
+# benchmarks/compare.py
+"""
+Compare two benchmark results files and print a regression table.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10 --fail-on-regression
+"""
+import argparse
+import sys
+
+from benchmarks.common import read_results
+
+# Metrics where a larger value is an improvement; every other metric is a cost
+HIGHER_IS_BETTER = {'throughput_per_s', 'rows_per_s'}
+# Metrics that are reported but never flagged (spread, sample counts)
+INFORMATIONAL = {'wall_ms_min', 'wall_ms_max', 'samples', 'operations'}
+
+def compare_results(baseline, candidate, threshold=10.0):
+    """
+    Return rows of {'case', 'scale', 'metric', 'baseline', 'candidate', 'change_pct', 'verdict'}
+    for every case and metric present in either file.
+    """
+    base_index = {(r['case'], r['scale']): r for r in baseline['results']}
+    cand_index = {(r['case'], r['scale']): r for r in candidate['results']}
+    rows = []
+    for key in list(base_index) + [k for k in cand_index if k not in base_index]:
+        base, cand = base_index.get(key), cand_index.get(key)
+        if not base or not cand or base['status'] != 'ok' or cand['status'] != 'ok':
+            rows.append({'case': key[0], 'scale': key[1], 'metric': 'status',
+                         'baseline': base['status'] if base else 'missing',
+                         'candidate': cand['status'] if cand else 'missing',
+                         'change_pct': None,
+                         # A case that stopped finishing regressed; one not run in both files did not
+                         'verdict': 'regression' if base and cand and base['status'] == 'ok' else 'n/a'})
+            continue
+        for metric in base['metrics']:
+            if metric not in cand['metrics']:
+                continue
+            old, new = base['metrics'][metric], cand['metrics'][metric]
+            change = None if not old else (new - old) / old * 100
+            verdict = 'ok'
+            if metric in INFORMATIONAL:
+                pass
+            elif change is not None:
+                worse = -change if metric in HIGHER_IS_BETTER else change
+                if worse > threshold:
+                    verdict = 'regression'
+                elif worse < -threshold:
+                    verdict = 'improved'
+            elif new and metric not in HIGHER_IS_BETTER:
+                # A cost appearing from zero, e.g. queries added to an in-memory helper
+                verdict = 'regression'
+            rows.append({'case': key[0], 'scale': key[1], 'metric': metric, 'baseline': old,
+                         'candidate': new, 'change_pct': change, 'verdict': verdict})
+    return rows
+
+def format_table(rows):
+    headers = ['Case', 'Scale', 'Metric', 'Baseline', 'Candidate', 'Change', 'Verdict']
+    lines = [[r['case'], r['scale'], r['metric'], str(r['baseline']), str(r['candidate']),
+              '-' if r['change_pct'] is None else f"{r['change_pct']:+.1f}%", r['verdict']] for r in rows]
+    widths = [max(len(row[i]) for row in [headers] + lines) for i in range(len(headers))]
+    output = ['  '.join(h.ljust(w) for h, w in zip(headers, widths)),
+              '  '.join('-' * w for w in widths)]
+    output += ['  '.join(cell.ljust(w) for cell, w in zip(row, widths)) for row in lines]
+    return '\n'.join(output)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark results files.")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="Percent change counted as a regression or improvement (default 10)")
+    parser.add_argument('--only-changes', action='store_true', help="Hide rows within the threshold")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on regressions")
+    args = parser.parse_args(argv)
+
+    baseline, candidate = read_results(args.baseline), read_results(args.candidate)
+    if baseline['suite'] != candidate['suite']:
+        print(f"Warning: comparing suite {baseline['suite']} with {candidate['suite']}", file=sys.stderr)
+
+    rows = compare_results(baseline, candidate, args.threshold)
+    shown = [r for r in rows if r['verdict'] != 'ok'] if args.only_changes else rows
+    print(f"Baseline:  {args.baseline} ({baseline['environment'].get('git_commit')})")
+    print(f"Candidate: {args.candidate} ({candidate['environment'].get('git_commit')})\n")
+    print(format_table(shown) if shown else "No changes beyond the threshold.")
+
+    regressions = sum(1 for r in rows if r['verdict'] == 'regression')
+    print(f"\n{regressions} regression(s), {sum(1 for r in rows if r['verdict'] == 'improved')} improvement(s)")
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+# benchmarks/rerun_latency.py
+"""
+Multi-session rerun latency harness.
+
+Simulates N concurrent browser sessions with streamlit.testing.v1.AppTest,
+each in its own process: AppTest sessions sharing one interpreter's script
+compilation and widget registries break each other. Each session logs in
+through app.py as a Manager, then walks every page in pages/ with a
+scripted set of widget interactions. Every rerun is timed and its
+statements counted, and the results are reported per page as p50/p95/p99
+latency and queries per rerun. Reruns that raise, show an exception or
+never reach the page script are errors, not samples.
+
+Usage:
+    python -m benchmarks.rerun_latency --awards 100k --sessions 20 --iterations 3
+    python -m benchmarks.rerun_latency --database-url sqlite:///gamification.db --username manager
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from statistics import mean
+
+from benchmarks.common import (DATASET_SEED, default_results_path, parse_scales, percentiles,
+                               prepare_database, write_results, BENCH_ENV)
+
+SUITE = 'rerun-latency'
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RERUNS_KEY = '_bench_reruns'
+# Seconds a single rerun may take before AppTest gives up on it
+RERUN_TIMEOUT = 600
+
+# Page visits of one iteration. Actions are (widget type, label, option index)
+# and each one triggers a rerun; widgets missing from a render are skipped.
+SCRIPT = [
+    ('pages/8_Dashboard-Manager.py', [('selectbox', "Select a Team to View", 1),
+                                      ('selectbox', "Select Category", 1)]),
+    ('pages/1_Dashboard.py', []),
+    ('pages/2_Badge_Management.py', [('selectbox', "Filter by Category", 1),
+                                     ('selectbox', "Filter by Role", 1)]),
+    ('pages/3_Award_Badges.py', [('selectbox', "Filter by Time Period", 1)]),
+    ('pages/4_Badge_Progress.py', [('selectbox', "Select Team Member", 1),
+                                   ('selectbox', "Filter by Category", 1)]),
+    ('pages/5_Teams.py', [('selectbox', "Select Team", 1)]),
+    ('pages/6_Sprint_Planning.py', []),
+    ('pages/7_Reports.py', [('selectbox', "Report Type", 1), ('selectbox', "Report Type", 2),
+                            ('selectbox', "Report Type", 3), ('selectbox', "Time Period", 3)]),
+    ('app.py', []),
+]
+
+def _record_rerun(rerun):
+    """Rerun listener: keep a summary in the session that ran it."""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return
+    queries = rerun.extras.get('queries')
+    st.session_state.setdefault(RERUNS_KEY, []).append({
+        'page': rerun.page,
+        'elapsed_ms': rerun.elapsed_ms,
+        'queries': queries.count if queries else 0,
+    })
+
+class SessionDriver:
+    """One simulated browser session."""
+
+    def __init__(self, username, password, think_ms=0, rng=None):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(os.path.join(REPO_ROOT, 'app.py'), default_timeout=RERUN_TIMEOUT)
+        self.username = username
+        self.password = password
+        self.think_ms = think_ms
+        self.rng = rng or random.Random()
+        self.samples = []
+        self.errors = []
+
+    def _run(self, label, action):
+        """Apply action to the app, rerun, and record latency and statement count under label."""
+        self.at.session_state[RERUNS_KEY] = []
+        started = time.perf_counter()
+        try:
+            action()
+            self.at.run()
+        except Exception as e:
+            self.errors.append({'page': label, 'error': repr(e)})
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if self.at.exception:
+            self.errors.extend({'page': label, 'error': e.message} for e in self.at.exception)
+            return
+        reruns = self.at.session_state[RERUNS_KEY] if RERUNS_KEY in self.at.session_state else []
+        if not reruns:
+            # Compile errors are only logged, and the page never began its run
+            self.errors.append({'page': label, 'error': "page script did not run (compile error?)"})
+            return
+        self.samples.append({
+            'page': label,
+            'elapsed_ms': elapsed_ms,
+            'queries': sum(r['queries'] for r in reruns),
+        })
+        if self.think_ms:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.think_ms / 1000)
+
+    def login(self):
+        self._run('app.py (first load)', lambda: None)
+        def submit():
+            inputs = {t.label: t for t in self.at.text_input}
+            inputs['Username'].input(self.username)
+            inputs['Password'].input(self.password)
+            next(b for b in self.at.button if b.label == "Login").click()
+        self._run('app.py (login)', submit)
+
+    def _widget_action(self, kind, label, index):
+        widget = next((w for w in getattr(self.at, kind) if w.label == label), None)
+        if widget is None or not widget.options:
+            return None
+        # Options are reported formatted, so select by position
+        return lambda: widget.select_index(index % len(widget.options))
+
+    def run_script(self, script, iterations):
+        self.login()
+        for _ in range(iterations):
+            for page, actions in script:
+                self._run(page, lambda page=page: self.at.switch_page(page))
+                for kind, label, index in actions:
+                    action = self._widget_action(kind, label, index)
+                    if action:
+                        self._run(page, action)
+        return self
+
+def summarize(samples):
+    """Per-page latency percentiles and queries per rerun."""
+    by_page = defaultdict(list)
+    for sample in samples:
+        by_page[sample['page']].append(sample)
+    summary = {}
+    for page, items in sorted(by_page.items()):
+        queries = [s['queries'] for s in items]
+        summary[page] = {
+            **{f"{name}_ms": value for name, value in
+               percentiles([s['elapsed_ms'] for s in items]).items()},
+            'queries_mean': round(mean(queries), 1),
+            'queries_max': max(queries),
+            'samples': len(items),
+        }
+    return summary
+
+def _manager_usernames():
+    from database import Session
+    from models.user import User
+
+    with Session() as session:
+        return [name for (name,) in session.query(User.username).filter(User.role == 'Manager')
+                .order_by(User.username).all()]
+
+def _drive_session(index, sessions, iterations, usernames, password, think_ms, ramp_up_s, seed):
+    """Run one session through SCRIPT in this (worker) process; returns (samples, errors)."""
+    from monitoring.timing import add_rerun_listener
+
+    add_rerun_listener(_record_rerun)
+    # Stagger session starts across the ramp-up window
+    time.sleep(ramp_up_s * index / max(sessions, 1))
+    driver = SessionDriver(usernames[index % len(usernames)], password, think_ms,
+                           rng=random.Random(seed + index))
+    try:
+        driver.run_script(SCRIPT, iterations)
+    except Exception as e:
+        driver.errors.append({'page': 'session', 'error': repr(e)})
+    return driver.samples, driver.errors
+
+def run_sessions(sessions, iterations, usernames, password, think_ms=0, ramp_up_s=0.0, seed=DATASET_SEED):
+    """
+    Drive `sessions` concurrent sessions through SCRIPT, one process each;
+    returns (samples, errors). Workers are spawned, so they inherit the
+    environment (DATABASE_URL etc.) but not this process's engine or threads.
+    """
+    samples, errors = [], []
+    with ProcessPoolExecutor(max_workers=sessions, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(_drive_session, index, sessions, iterations, usernames, password,
+                               think_ms, ramp_up_s, seed) for index in range(sessions)]
+        for future in futures:
+            try:
+                session_samples, session_errors = future.result()
+            except Exception as e:
+                errors.append({'page': 'session', 'error': repr(e)})
+                continue
+            samples.extend(session_samples)
+            errors.extend(session_errors)
+    return samples, errors
+
+def main(argv=None):
+    from data.generate_org import DEFAULT_PASSWORD
+
+    parser = argparse.ArgumentParser(description="Measure page rerun latency under concurrent sessions.")
+    parser.add_argument('--database-url', help="Existing database to run against")
+    parser.add_argument('--awards', default='10k', help="Size of the generated dataset when no --database-url")
+    parser.add_argument('--end-date', help="Pin the generated dataset's last day (YYYY-MM-DD)")
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--iterations', type=int, default=2, help="Passes over the page script per session")
+    parser.add_argument('--think-ms', type=float, default=0, help="Average pause between interactions")
+    parser.add_argument('--ramp-up', type=float, default=0, help="Seconds over which sessions start")
+    parser.add_argument('--username', action='append', help="Manager login(s); default: all generated Managers")
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--output', help="Results file (default: .cache/benchmarks/<suite>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        database_url, scale = args.database_url, f"{args.sessions} sessions"
+    else:
+        awards = parse_scales(args.awards)[0]
+        print(f"Preparing dataset with {awards} awards...", flush=True)
+        database_url = prepare_database(awards, end_date=args.end_date)
+        scale = f"{awards} awards x {args.sessions} sessions"
+    # database.py binds the engine at import time
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.update(BENCH_ENV)
+    # Per-rerun N+1 warnings would drown the report; the counts are in the results
+    os.environ.setdefault('QUERY_LOG_LEVEL', 'ERROR')
+
+    usernames = args.username or _manager_usernames()
+    if not usernames:
+        parser.error("no Manager users found; pass --username")
+
+    started = time.perf_counter()
+    samples, errors = run_sessions(args.sessions, args.iterations, usernames, args.password,
+                                   think_ms=args.think_ms, ramp_up_s=args.ramp_up)
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(samples)
+    print(f"\n{len(samples)} reruns in {elapsed:.1f}s across {args.sessions} sessions, {len(errors)} errors\n")
+    print(f"{'Page':<40} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'queries':>9} {'n':>5}")
+    for page, stats in summary.items():
+        print(f"{page:<40} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['p99_ms']:>10.1f} "
+              f"{stats['queries_mean']:>9} {stats['samples']:>5}")
+    for error in errors[:10]:
+        print(f"error on {error['page']}: {error['error']}")
+
+    results = [{'case': page, 'scale': scale, 'status': 'ok', 'metrics': stats}
+               for page, stats in summary.items()]
+    results.append({'case': 'errors', 'scale': scale, 'status': 'ok',
+                    'metrics': {'errors': len(errors), 'samples': len(samples) + len(errors)}})
+    path = write_results(args.output or default_results_path(SUITE), SUITE, results,
+                         sessions=args.sessions, iterations=args.iterations, think_ms=args.think_ms,
+                         ramp_up=args.ramp_up, database_url=database_url.split('@')[-1])
+    print(f"\nResults written to {path}")
+    return 1 if errors and not samples else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# benchmarks/suite.py
+"""
+Benchmarks for the utils helpers and the report branches of pages/7_Reports.py.
+
+Every case runs in its own worker process against a generated SQLite
+organisation, once per scale, and records wall time, statement count and
+peak memory into a JSON results file (see compare.py).
+
+Usage:
+    python -m benchmarks.suite --scales 1k,100k,1M --output results.json
+    python -m benchmarks.suite --scales 1k --cases calculate_team_stats,report:Leaderboard
+"""
+import argparse
+import json
+import os
+import sys
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from benchmarks.common import (DATASET_SEED, DEFAULT_REPEAT, default_results_path, measure,
+                               parse_scales, prepare_database, run_worker, write_results)
+
+SUITE = 'helpers-reports'
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORTS_PAGE = os.path.join(REPO_ROOT, 'pages', '7_Reports.py')
+REPORT_TYPES = [
+    "Team Performance Overview", "Badge Distribution Analysis", "Work-Objective Balance",
+    "Sprint Achievement Analysis", "Leaderboard", "Custom Report",
+]
+# Seconds a single AppTest rerun may take before it is treated as failed
+RERUN_TIMEOUT = 3600
+
+def _largest_team_id():
+    from sqlalchemy import func
+    from database import Session
+    from models.user import User
+
+    with Session() as session:
+        return session.query(User.team_id).group_by(User.team_id) \
+            .order_by(func.count(User.id).desc()).limit(1).scalar()
+
+def _top_recipient_id():
+    from sqlalchemy import func
+    from database import Session
+    from models.badge_award import BadgeAward
+
+    with Session() as session:
+        return session.query(BadgeAward.user_id).group_by(BadgeAward.user_id) \
+            .order_by(func.count(BadgeAward.id).desc()).limit(1).scalar()
+
+def _calculate_team_stats():
+    from utils import calculate_team_stats
+    team_id = _largest_team_id()
+    return lambda: calculate_team_stats(team_id)
+
+def _get_user_badges():
+    from utils import get_user_badges
+    user_id = _top_recipient_id()
+    return lambda: get_user_badges(user_id)
+
+def _filter_badges_by_role():
+    from utils import filter_badges_by_role, load_data
+    badges = load_data('badges')
+    return lambda: filter_badges_by_role(badges, 'Dev')
+
+def _get_current_sprint():
+    from utils import get_current_sprint
+    return get_current_sprint
+
+HELPER_CASES = {
+    'calculate_team_stats': _calculate_team_stats,
+    'get_user_badges': _get_user_badges,
+    'filter_badges_by_role': _filter_badges_by_role,
+    'get_current_sprint': _get_current_sprint,
+}
+
+_reruns = []
+
+@contextmanager
+def _rerun_queries():
+    """Statement count of the last page rerun; AppTest runs scripts on its own thread."""
+    stats = SimpleNamespace(count=0)
+    _reruns.clear()
+    try:
+        yield stats
+    finally:
+        queries = _reruns[-1].extras.get('queries') if _reruns else None
+        stats.count = queries.count if queries else 0
+
+def _report_case(report_type):
+    """Render the Reports page as a Manager with the given report type selected."""
+    from streamlit.testing.v1 import AppTest
+    from monitoring.timing import add_rerun_listener
+    from session_initializer import BOOTSTRAP_COLLECTIONS, load_collections
+
+    add_rerun_listener(_reruns.append)
+    data, _ = load_collections(BOOTSTRAP_COLLECTIONS)
+    data['badges_dict'] = {b['id']: b for b in data['badges_dict']}
+
+    at = AppTest.from_file(REPORTS_PAGE, default_timeout=RERUN_TIMEOUT)
+    for key, value in data.items():
+        at.session_state[key] = value
+    at.session_state['badges'] = data['badges_dict']
+    at.session_state['authenticated'] = True
+    at.session_state['current_user'] = next(u for u in data['users'] if u['role'] == 'Manager')
+
+    def rerun():
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    rerun()
+    next(s for s in at.selectbox if s.label == "Report Type").set_value(report_type)
+    # Selecting the report is itself the warm-up rerun
+    rerun()
+    return rerun
+
+def case_names():
+    return list(HELPER_CASES) + [f"report:{name}" for name in REPORT_TYPES]
+
+def run_case(name, repeat=DEFAULT_REPEAT):
+    """Set up and measure one case in this process (worker side)."""
+    if name.startswith('report:'):
+        fn = _report_case(name.split(':', 1)[1])
+        return measure(fn, repeat=repeat, warmup=0, count_queries=_rerun_queries)
+    return measure(HELPER_CASES[name](), repeat=repeat)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark utils helpers and report computations.")
+    parser.add_argument('--scales', default='1k,100k,1M', help="Award counts, e.g. 1k,100k,1M")
+    parser.add_argument('--cases', help="Comma-separated case names (default: all)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=DATASET_SEED)
+    parser.add_argument('--end-date', help="Pin the dataset's last day (YYYY-MM-DD) for comparable runs")
+    parser.add_argument('--timeout', type=float, default=1800, help="Seconds allowed per case and scale")
+    parser.add_argument('--output', help="Results file (default: .cache/benchmarks/<suite>-<time>.json)")
+    parser.add_argument('--list', action='store_true', help="List case names and exit")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(case_names()))
+        return 0
+    if args.worker:
+        print(json.dumps({'status': 'ok', 'metrics': run_case(args.case, args.repeat)}))
+        return 0
+
+    cases = args.cases.split(',') if args.cases else case_names()
+    unknown = set(cases) - set(case_names())
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    results = []
+    for awards in parse_scales(args.scales):
+        print(f"Preparing dataset with {awards} awards...", flush=True)
+        database_url = prepare_database(awards, seed=args.seed, end_date=args.end_date)
+        for case in cases:
+            outcome = run_worker('benchmarks.suite', ['--case', case, '--repeat', str(args.repeat)],
+                                 database_url, timeout=args.timeout)
+            results.append({'case': case, 'scale': str(awards), **outcome})
+            metrics = outcome.get('metrics', {})
+            print(f"  {case:<45} {outcome['status']:<8} "
+                  f"{metrics.get('wall_ms_median', '-'):>12} ms  {metrics.get('queries', '-'):>8} queries", flush=True)
+
+    path = write_results(args.output or default_results_path(SUITE), SUITE, results,
+                         scales=args.scales, repeat=args.repeat, seed=args.seed, end_date=args.end_date)
+    print(f"Results written to {path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
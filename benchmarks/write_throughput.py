@@ -0,0 +1,312 @@
+# benchmarks/write_throughput.py
+"""
+Write-throughput and contention benchmark for the DatabaseManager write paths.
+
+Hammers DatabaseManager.create/update/delete (one session and commit per
+call) and DatabaseManager.bulk_insert from a thread pool, against a copy of
+a generated SQLite organisation and, when --postgres-url is given, a
+PostgreSQL database. Reports throughput, per-operation commit latency
+percentiles, lock waits and error rates for each workload and thread count.
+
+Usage:
+    python -m benchmarks.write_throughput --threads 1,4,16 --operations 2000
+    python -m benchmarks.write_throughput --postgres-url postgresql://bench@localhost/bench --pool-size 20
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import date, timedelta
+from statistics import median
+
+from benchmarks.common import (BENCH_DIR, DATASET_SEED, default_results_path, org_params, percentiles,
+                               prepare_database, run_worker, worker_env, write_results)
+
+SUITE = 'write-throughput'
+WORKLOADS = ['create', 'update', 'delete', 'mixed', 'bulk']
+MIXED_WEIGHTS = {'create': 0.7, 'update': 0.2, 'delete': 0.1}
+CALIBRATION_OPERATIONS = 20
+# Dataset the SQLite runs start from; each run writes to its own copy
+BASE_AWARDS = 10_000
+
+# Error messages that mean the write lost a lock race, per backend
+LOCK_ERROR_MARKERS = (
+    'database is locked', 'database table is locked',           # SQLite
+    'deadlock detected', 'could not serialize', 'lock timeout',  # PostgreSQL
+    'lock request time out', 'deadlock victim',                  # SQL Server
+)
+
+class ErrorCounter:
+    """Counts DBAPI errors seen by the engine, including commit failures
+    that DatabaseManager reports and swallows. Each thread's errors are
+    also kept until take() collects them, so an operation that returned
+    normally can still be counted as failed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counts = Counter()
+
+    def __call__(self, exception_context):
+        message = str(exception_context.original_exception).lower()
+        kind = 'lock' if any(marker in message for marker in LOCK_ERROR_MARKERS) else 'other'
+        with self._lock:
+            self.counts[kind] += 1
+        self._local.messages = getattr(self._local, 'messages', []) + [message]
+
+    def take(self):
+        """Messages of the errors this thread has seen since the last take()."""
+        messages = getattr(self._local, 'messages', [])
+        self._local.messages = []
+        return messages
+
+class LockSampler:
+    """Samples PostgreSQL backends waiting on a lock while the workload runs."""
+
+    def __init__(self, engine, interval=0.02):
+        self.engine = engine
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='lock-sampler', daemon=True)
+
+    def _run(self):
+        from sqlalchemy import text
+
+        query = text("SELECT count(*) FROM pg_stat_activity "
+                     "WHERE wait_event_type = 'Lock' AND datname = current_database()")
+        with self.engine.connect() as conn:
+            while not self._stop.wait(self.interval):
+                self.samples.append(conn.execute(query).scalar())
+                conn.rollback()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def metrics(self):
+        waiting = [s for s in self.samples if s]
+        return {
+            'lock_waiting_backends_max': max(self.samples, default=0),
+            # Share of samples in which at least one write was blocked on a lock
+            'lock_wait_ratio': round(len(waiting) / len(self.samples), 4) if self.samples else 0,
+        }
+
+def _reference_ids():
+    from database import Session
+    from models.user import User
+    from models.badge import Badge
+    from models.sprint import Sprint
+    from models.badge_award import BadgeAward
+
+    with Session() as session:
+        return {
+            'users': [i for (i,) in session.query(User.id).all()],
+            'badges': [i for (i,) in session.query(Badge.id).all()],
+            'sprints': [i for (i,) in session.query(Sprint.id).all()],
+            'awards': [i for (i,) in session.query(BadgeAward.id).all()],
+        }
+
+def _new_award(rng, ids):
+    return {
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'user_id': rng.choice(ids['users']),
+        'badge_id': rng.choice(ids['badges']),
+        'awarded_by': rng.choice(ids['users']),
+        'awarded_at': date.today() - timedelta(days=rng.randrange(365)),
+        'reason': "Write benchmark",
+        'sprint_id': rng.choice(ids['sprints']),
+    }
+
+def build_operations(workload, count, batch_size, ids, rng):
+    """Return a list of (kind, callable) where each callable returns rows written."""
+    from crud.db_manager import DatabaseManager
+    from models.badge_award import BadgeAward
+
+    def create(award):
+        return lambda: DatabaseManager.create(BadgeAward, award) and 1
+
+    def update(award_id, reason):
+        return lambda: DatabaseManager.update(BadgeAward, award_id, {'reason': reason}) and 1
+
+    def delete(award_id):
+        return lambda: 1 if DatabaseManager.delete(BadgeAward, award_id) else 0
+
+    def bulk(rows):
+        return lambda: DatabaseManager.bulk_insert(BadgeAward, rows, batch_size=batch_size)
+
+    if workload == 'bulk':
+        return [('bulk', bulk([_new_award(rng, ids) for _ in range(batch_size)])) for _ in range(count)]
+
+    kinds = [workload] * count if workload != 'mixed' else \
+        rng.choices(list(MIXED_WEIGHTS), list(MIXED_WEIGHTS.values()), k=count)
+    # Deletes each need their own row; they take existing awards without replacement
+    deletable = rng.sample(ids['awards'], min(len(ids['awards']), kinds.count('delete')))
+    operations = []
+    for kind in kinds:
+        if kind == 'create':
+            operations.append((kind, create(_new_award(rng, ids))))
+        elif kind == 'update':
+            operations.append((kind, update(rng.choice(ids['awards']), f"Updated {rng.random():.6f}")))
+        elif deletable:
+            operations.append((kind, delete(deletable.pop())))
+    return operations
+
+def _timed_call(operation, errors=None):
+    kind, fn = operation
+    if errors:
+        errors.take()
+    started = time.perf_counter()
+    try:
+        rows, error = fn(), None
+    except Exception as e:
+        rows, error = 0, str(e).lower()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # A commit failure DatabaseManager swallowed still fails the operation
+    swallowed = errors.take() if errors else []
+    if error is None and swallowed:
+        rows, error = 0, swallowed[-1]
+    return kind, elapsed_ms, rows or 0, error
+
+def run_workload(workload, threads, operations, batch_size, seed=DATASET_SEED):
+    """Run one workload in this process (worker side) and return its metrics."""
+    from sqlalchemy import event
+    from database import engine
+
+    rng = random.Random(seed)
+    ids = _reference_ids()
+
+    # Uncontended latency from a short single-threaded run of the same workload
+    calibration = build_operations(workload, CALIBRATION_OPERATIONS, batch_size, ids, rng)
+    baseline_ms = median(_timed_call(op)[1] for op in calibration)
+    ids = _reference_ids()
+    planned = build_operations(workload, operations, batch_size, ids, rng)
+
+    errors = ErrorCounter()
+    event.listen(engine, 'handle_error', errors)
+    sampler = LockSampler(engine) if engine.dialect.name == 'postgresql' else None
+    try:
+        started = time.perf_counter()
+        with sampler or nullcontext():
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='writer') as pool:
+                outcomes = list(pool.map(lambda operation: _timed_call(operation, errors), planned))
+        elapsed_s = time.perf_counter() - started
+    finally:
+        event.remove(engine, 'handle_error', errors)
+
+    latencies = [latency for _, latency, _, error in outcomes if error is None]
+    failed = [error for _, _, _, error in outcomes if error is not None]
+    lock_failures = sum(1 for e in failed if any(marker in e for marker in LOCK_ERROR_MARKERS))
+    rows = sum(r for _, _, r, error in outcomes if error is None)
+    metrics = {
+        'operations': len(outcomes),
+        'throughput_per_s': round(len(latencies) / elapsed_s, 1) if elapsed_s else 0,
+        'rows_per_s': round(rows / elapsed_s, 1) if elapsed_s else 0,
+        **{f"commit_{name}_ms": value for name, value in percentiles(latencies).items()},
+        'uncontended_ms': round(baseline_ms, 3),
+        # Time an operation spent beyond the uncontended median: waiting on
+        # locks, busy timeouts and pool checkouts
+        'lock_wait_ms_mean': round(sum(max(0.0, l - baseline_ms) for l in latencies) / len(latencies), 3)
+        if latencies else None,
+        'error_rate': round(len(failed) / len(outcomes), 4) if outcomes else 0,
+        'lock_errors': max(lock_failures, errors.counts['lock']),
+        'driver_errors': sum(errors.counts.values()),
+    }
+    if sampler:
+        metrics.update(sampler.metrics())
+    return metrics
+
+def _sqlite_copy(base_url, directory):
+    """Copy the cached SQLite dataset so writes never touch it."""
+    source = base_url[len('sqlite:///'):]
+    target = os.path.join(directory, f"write-bench-{os.getpid()}-{uuid.uuid4().hex[:8]}.db")
+    shutil.copyfile(source, target)
+    return target
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager write paths under concurrency.")
+    parser.add_argument('--workloads', default=','.join(WORKLOADS), help=f"Comma-separated subset of {WORKLOADS}")
+    parser.add_argument('--threads', default='1,4,16', help="Comma-separated thread pool sizes")
+    parser.add_argument('--operations', type=int, default=1000, help="Operations per workload run")
+    parser.add_argument('--batch-size', type=int, default=500, help="Rows per bulk_insert call")
+    parser.add_argument('--pool-size', type=int, help="Connection pool size (DB_POOL_SIZE)")
+    parser.add_argument('--max-overflow', type=int, help="Connection pool overflow (DB_MAX_OVERFLOW)")
+    parser.add_argument('--postgres-url', default=os.environ.get('BENCH_POSTGRES_URL'),
+                        help="Also run against this PostgreSQL database; its tables are dropped and recreated")
+    parser.add_argument('--no-sqlite', action='store_true', help="Skip the SQLite runs")
+    parser.add_argument('--timeout', type=float, default=1800, help="Seconds allowed per run")
+    parser.add_argument('--output', help="Results file (default: .cache/benchmarks/<suite>-<time>.json)")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--workload', help=argparse.SUPPRESS)
+    parser.add_argument('--thread-count', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        metrics = run_workload(args.workload, args.thread_count, args.operations, args.batch_size)
+        print(json.dumps({'status': 'ok', 'metrics': metrics}))
+        return 0
+
+    workloads = args.workloads.split(',')
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+    if args.pool_size:
+        os.environ['DB_POOL_SIZE'] = str(args.pool_size)
+    if args.max_overflow is not None:
+        os.environ['DB_MAX_OVERFLOW'] = str(args.max_overflow)
+
+    backends = []
+    if not args.no_sqlite:
+        backends.append(('sqlite', prepare_database(BASE_AWARDS)))
+    if args.postgres_url:
+        print("Loading the PostgreSQL database...", flush=True)
+        command = [sys.executable, '-m', 'data.generate_org', '--database-url', args.postgres_url,
+                   '--reset', '--seed', str(DATASET_SEED)]
+        for name, value in org_params(BASE_AWARDS).items():
+            command += [f"--{name}", str(value)]
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env=worker_env())
+        backends.append(('postgresql', args.postgres_url))
+
+    results = []
+    for backend, url in backends:
+        for workload in workloads:
+            for threads in (int(t) for t in args.threads.split(',')):
+                run_url, copy_path = url, None
+                if backend == 'sqlite':
+                    copy_path = _sqlite_copy(url, BENCH_DIR)
+                    run_url = f"sqlite:///{copy_path}"
+                try:
+                    outcome = run_worker('benchmarks.write_throughput',
+                                         ['--workload', workload, '--thread-count', str(threads),
+                                          '--operations', str(args.operations), '--batch-size', str(args.batch_size)],
+                                         run_url, timeout=args.timeout)
+                finally:
+                    if copy_path and os.path.exists(copy_path):
+                        os.remove(copy_path)
+                results.append({'case': workload, 'scale': f"{backend} x{threads} threads", **outcome})
+                m = outcome.get('metrics', {})
+                print(f"  {backend:<10} {workload:<7} x{threads:<3} {outcome['status']:<8} "
+                      f"{m.get('throughput_per_s', '-'):>9} ops/s  p95 {m.get('commit_p95_ms', '-'):>9} ms  "
+                      f"errors {m.get('error_rate', '-')}", flush=True)
+
+    path = write_results(args.output or default_results_path(SUITE), SUITE, results,
+                         workloads=workloads, threads=args.threads, operations=args.operations,
+                         batch_size=args.batch_size, pool_size=args.pool_size, max_overflow=args.max_overflow)
+    print(f"Results written to {path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# caching/report_cache.py
+"""
+Cache of computed Reports page results, shared by every session and process.
+
+Keys are built from the report type and its normalised parameters: the
+date range clamped to the days that have awards, "All ..." selections
+as None, and multi-selections as tuples. The data versions the result
+is built from are added too (see key_versions()), so views over the
+same data share an entry however the range was picked, and any write
+makes them unreachable. So is the database identity, as in shared_cache,
+so another or a reseeded database never reads these entries. Entries are stored with shared_cache
+in their own file, and least recently used entries are evicted by size
+in bytes.
+"""
+import os
+
+import streamlit as st
+from sqlalchemy import func, select
+
+from caching import shared_cache
+from caching.version_poller import current_versions
+from crud.data_versions import database_identity
+from crud.unit_of_work import read_session
+from models.award_daily_rollup import AwardDailyRollup
+from monitoring.metrics import record_cache_lookup
+from session_initializer import BOOTSTRAP_COLLECTIONS
+
+REPORT_CACHE_PATH = os.environ.get('REPORT_CACHE_PATH', os.path.join('.cache', 'report_cache.sqlite'))
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+REPORT_CACHE_TTL_SECONDS = int(os.environ.get('REPORT_CACHE_TTL_SECONDS', '900'))
+
+# Tables report results are computed from
+REPORT_TABLES = (
+    'teams', 'users', 'badges', 'sprints', 'badge_awards', 'badge_awards_archive',
+    'award_archive_summary', 'award_daily_rollup', 'recipient_sketches',
+)
+
+def award_date_bounds():
+    """(first, last) day with awards, or (None, None) when there are none."""
+    day = AwardDailyRollup.day
+    with read_session() as session:
+        return tuple(session.execute(select(func.min(day), func.max(day))).one())
+
+def normalize_range(start_date, end_date):
+    """
+    Clamp a range to the days that have awards, so e.g. "All Time" and
+    "This Year" share an entry while all awards fall in this year.
+    """
+    first, last = award_date_bounds()
+    if first is None:
+        return None, None
+    start, end = max(start_date, first), min(end_date, last)
+    if start > end:
+        return None, None
+    return start, end
+
+def key_versions():
+    """
+    {table: version} for REPORT_TABLES as this session sees them: the
+    versions its collections were loaded at, so a write polled after they
+    were loaded cannot file a result built from the older data under the
+    newer version, and the current versions of the tables builders query
+    directly (archive, rollup, sketches).
+    """
+    versions = current_versions()
+    for key, version in st.session_state.get('loaded_versions', {}).items():
+        versions[BOOTSTRAP_COLLECTIONS[key].__tablename__] = version
+    return {table: versions.get(table) for table in REPORT_TABLES}
+
+def _normalize(value):
+    if isinstance(value, str) and (not value or value.startswith('All ')):
+        return None
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    if isinstance(value, list):
+        # Selection order is kept: it orders result rows and columns
+        return tuple(value)
+    return value
+
+def report_key(report_type, start_date=None, end_date=None, team=None, role=None, category=None,
+               award_range=True, **options):
+    """
+    Cache key for a report over normalised parameters at the session's
+    data versions. Pass award_range=False when the range selects more than
+    awards (e.g. sprints), so it is not clamped to the award days.
+    """
+    if award_range and start_date is not None and end_date is not None:
+        start_date, end_date = normalize_range(start_date, end_date)
+    params = {
+        'start': start_date.isoformat() if start_date else None,
+        'end': end_date.isoformat() if end_date else None,
+        'team': _normalize(team),
+        'role': _normalize(role),
+        'category': _normalize(category),
+    }
+    params.update({name: _normalize(value) for name, value in options.items()})
+    return shared_cache.fingerprint(report_type, kwargs=params, versions=key_versions(),
+                                    database=database_identity(current_versions()))
+
+def cached_report(report_type, build, start_date=None, end_date=None, team=None, role=None,
+                  category=None, award_range=True, **options):
+    """
+    build() from the cache when the same report was computed for the
+    same normalised parameters and data versions, else compute and store it.
+    Other keyword options (e.g. selected metrics) are part of the key as given.
+    """
+    if not REPORT_CACHE_PATH:
+        return build()
+    shared_cache.use_database(database_identity(current_versions()), path=REPORT_CACHE_PATH)
+    key = report_key(report_type, start_date, end_date, team, role, category, award_range, **options)
+    hit, value = shared_cache.get(key, path=REPORT_CACHE_PATH)
+    record_cache_lookup('reports', hit)
+    if hit:
+        return value
+    value = build()
+    shared_cache.put(key, value, REPORT_CACHE_TTL_SECONDS, path=REPORT_CACHE_PATH,
+                     max_bytes=REPORT_CACHE_MAX_BYTES)
+    return value
+
+def stats():
+    """{'entries', 'bytes'} currently stored."""
+    return shared_cache.stats(REPORT_CACHE_PATH)
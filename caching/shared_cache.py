@@ -0,0 +1,188 @@
+# caching/shared_cache.py
+"""
+Result cache shared by every Streamlit process on the host.
+
+Entries live in a local SQLite file (WAL mode, so readers in one process
+never block on a writer in another). Keys are a fingerprint of the
+function name and arguments plus the data_versions of the tables the
+result depends on, so a write to any of those tables makes the old
+entries unreachable; they age out via TTL or LRU eviction. Version
+numbers repeat across databases, so the key also holds the database
+identity (see crud.data_versions.database_identity); the file records
+the identity it was last used with and is emptied when that changes. Each write
+is a single transaction, so other processes see a whole entry or none.
+The total size of stored values is bounded; least recently used entries
+go first.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from crud.data_versions import read_versions, database_identity
+from crud.unit_of_work import read_session
+from monitoring.metrics import record_cache_lookup
+
+SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH', os.path.join('.cache', 'shared_cache.sqlite'))
+SHARED_CACHE_MAX_BYTES = int(os.environ.get('SHARED_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+SHARED_CACHE_TTL_SECONDS = int(os.environ.get('SHARED_CACHE_TTL_SECONDS', '600'))
+# last_access is only rewritten when older than this, to keep reads cheap
+TOUCH_INTERVAL_SECONDS = 30
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialised = set()
+# Database identity this process last checked each cache file against
+_databases = {}
+
+def _connect(path=SHARED_CACHE_PATH):
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with _init_lock:
+            if path not in _initialised:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+                    " expires_at REAL, last_access REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+                _initialised.add(path)
+        connections[path] = conn
+    return conn
+
+def fingerprint(name, args=(), kwargs=None, versions=None, database=None):
+    """Stable key for a call of name with these arguments at these data versions of database."""
+    parts = [name, repr(args), repr(sorted((kwargs or {}).items())), repr(sorted((versions or {}).items())),
+             repr(database)]
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+def use_database(database, path=SHARED_CACHE_PATH):
+    """
+    Record that path caches results of database, emptying it when it last
+    held another database's results. Checked once per process and database.
+    """
+    if not path or _databases.get(path) == database:
+        return
+    try:
+        conn = _connect(path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'database'").fetchone()
+            if row is None or row[0] != database:
+                conn.execute("DELETE FROM entries")
+                conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('database', ?)", (database,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    except sqlite3.Error as e:
+        print(f"Shared cache database check failed: {e}")
+        return
+    _databases[path] = database
+
+def get(key, path=SHARED_CACHE_PATH):
+    """(True, value) for a live entry, else (False, None)."""
+    if not path:
+        return False, None
+    try:
+        conn = _connect(path)
+        row = conn.execute("SELECT value, expires_at, last_access FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        value, expires_at, last_access = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM entries WHERE key = ? AND expires_at <= ?", (key, now))
+            return False, None
+        if now - last_access > TOUCH_INTERVAL_SECONDS:
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        return True, pickle.loads(value)
+    except (sqlite3.Error, pickle.UnpicklingError, EOFError) as e:
+        print(f"Shared cache read failed: {e}")
+        return False, None
+
+def put(key, value, ttl=SHARED_CACHE_TTL_SECONDS, path=SHARED_CACHE_PATH, max_bytes=SHARED_CACHE_MAX_BYTES):
+    """Store value under key, then evict least recently used entries over max_bytes."""
+    if not path:
+        return
+    blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(blob) > max_bytes:
+        return
+    now = time.time()
+    try:
+        conn = _connect(path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now + ttl if ttl else None, now),
+            )
+            conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > max_bytes:
+                excess = total - max_bytes
+                freed = 0
+                victims = []
+                for victim, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+                    if freed >= excess:
+                        break
+                    victims.append((victim,))
+                    freed += size
+                conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    except sqlite3.Error as e:
+        print(f"Shared cache write failed: {e}")
+
+def clear(path=SHARED_CACHE_PATH):
+    if path:
+        _connect(path).execute("DELETE FROM entries")
+
+def stats(path=SHARED_CACHE_PATH):
+    """{'entries', 'bytes'} currently stored."""
+    if not path:
+        return {'entries': 0, 'bytes': 0}
+    entries, size = _connect(path).execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+    return {'entries': entries, 'bytes': size}
+
+def table_versions(tables):
+    """(current data_versions of tables, database identity)."""
+    with read_session() as session:
+        versions = read_versions(session)
+    return {table: versions.get(table) for table in tables}, database_identity(versions)
+
+def cached(name, tables, ttl=SHARED_CACHE_TTL_SECONDS):
+    """
+    Cache fn's results across processes. tables are the table names the
+    result is computed from; arguments must have a stable repr().
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not SHARED_CACHE_PATH:
+                return fn(*args, **kwargs)
+            versions, database = table_versions(tables)
+            use_database(database)
+            key = fingerprint(name, args, kwargs, versions, database)
+            hit, value = get(key)
+            record_cache_lookup('shared', hit)
+            if hit:
+                return value
+            value = fn(*args, **kwargs)
+            put(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
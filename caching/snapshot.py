@@ -0,0 +1,194 @@
+# caching/snapshot.py
+"""
+Warm-start snapshot of the reference collections (teams, users, badges, sprints).
+
+The collections live in a process-wide store that is persisted to a local
+pickle file at shutdown and on a schedule. On startup the file is loaded
+first and then delta-synced against the database: only collections whose
+row in data_versions moved since the snapshot was written are re-read.
+The snapshot records the database identity it was taken from; a snapshot
+of another database, or of this one before a reset, is ignored whole.
+"""
+import atexit
+import contextvars
+import copy
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from database import Session
+from models.team import Team
+from models.user import User
+from models.badge import Badge
+from models.sprint import Sprint
+from crud.db_manager import DatabaseManager
+from crud.data_versions import read_versions, database_identity
+from caching.version_poller import add_version_listener
+from monitoring.metrics import record_cache_lookup
+
+SNAPSHOT_PATH = os.environ.get('SNAPSHOT_PATH', os.path.join('.cache', 'reference_snapshot.pkl'))
+SNAPSHOT_INTERVAL_SECONDS = int(os.environ.get('SNAPSHOT_INTERVAL_SECONDS', '300'))
+SNAPSHOT_FORMAT = 1
+# Collections are read in chunks of this many rows
+LOAD_BATCH_SIZE = 5000
+
+REFERENCE_MODELS = {
+    'teams': Team,
+    'users': User,
+    'badges': Badge,
+    'sprints': Sprint,
+}
+
+_lock = threading.Lock()
+_store = {'collections': {}, 'versions': {}, 'database': None}
+_snapshot_loaded = False
+_written_versions = None
+_writer_started = False
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """Return the snapshot stored at path, or None if missing or unreadable."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT:
+        return None
+    return snapshot
+
+def write_snapshot(path=SNAPSHOT_PATH):
+    """
+    Atomically write the current store to path.
+    Returns True if a file was written; unchanged stores are skipped.
+    """
+    global _written_versions
+
+    if not path:
+        return False
+    with _lock:
+        if not _store['collections'] or _store['versions'] == _written_versions:
+            return False
+        snapshot = {
+            'format': SNAPSHOT_FORMAT,
+            'written_at': time.time(),
+            'database': _store['database'],
+            'versions': dict(_store['versions']),
+            'collections': dict(_store['collections']),
+        }
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # The users collection holds password hashes, keep the file private
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    _written_versions = snapshot['versions']
+    return True
+
+def _load_snapshot_once():
+    global _snapshot_loaded
+
+    if _snapshot_loaded:
+        return
+    snapshot = read_snapshot()
+    if snapshot:
+        _store['collections'] = {
+            name: rows for name, rows in snapshot['collections'].items() if name in REFERENCE_MODELS
+        }
+        _store['versions'] = {
+            name: snapshot['versions'].get(name) for name in _store['collections']
+        }
+        _store['database'] = snapshot.get('database')
+    _snapshot_loaded = True
+
+def _load_collection(model):
+    rows = []
+    for chunk in DatabaseManager.iter_all(model, LOAD_BATCH_SIZE):
+        rows.extend(chunk)
+    return rows
+
+def sync_reference_data():
+    """
+    Bring the store up to date with the database.
+    Reads data_versions once and reloads, concurrently, only the
+    collections whose version differs from the stored one.
+    Returns the names of the collections that were reloaded.
+    """
+    # Versions are read before the tables, so a write racing with the
+    # reload leaves a stale version behind and is picked up next sync
+    with Session() as session:
+        versions = read_versions(session)
+    database = database_identity(versions)
+
+    with _lock:
+        _load_snapshot_once()
+        if _store['database'] != database:
+            # Collections of another database: reload them all
+            _store.update(collections={}, versions={}, database=database)
+        stored_versions = dict(_store['versions'])
+
+    stale = [
+        name for name, model in REFERENCE_MODELS.items()
+        if name not in stored_versions or stored_versions[name] != versions.get(model.__tablename__)
+    ]
+    if not stale:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(stale), thread_name_prefix='snapshot') as pool:
+        futures = {
+            name: pool.submit(contextvars.copy_context().run, _load_collection, REFERENCE_MODELS[name])
+            for name in stale
+        }
+        reloaded = {name: future.result() for name, future in futures.items()}
+
+    with _lock:
+        for name, rows in reloaded.items():
+            _store['collections'][name] = rows
+            _store['versions'][name] = versions.get(REFERENCE_MODELS[name].__tablename__)
+    return stale
+
+def _sync_changed(changed):
+    # Writes from other processes are picked up before the next session asks
+    if any(model.__tablename__ in changed for model in REFERENCE_MODELS.values()):
+        sync_reference_data()
+
+add_version_listener(_sync_changed)
+
+def get_reference_data(names=None):
+    """
+    Return {name: rows} for the requested reference collections.
+    Rows are deep-copied because pages mutate their session copies in place.
+    """
+    stale = sync_reference_data()
+    with _lock:
+        wanted = names or list(REFERENCE_MODELS)
+        for name in wanted:
+            record_cache_lookup('reference_snapshot', name not in stale)
+        return {name: copy.deepcopy(_store['collections'][name]) for name in wanted}
+
+def _write_periodically():
+    while True:
+        time.sleep(SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            write_snapshot()
+        except Exception as e:
+            print(f"Snapshot write failed: {e}")
+
+def start_snapshot_writer():
+    """Write the snapshot on a schedule and at interpreter shutdown (idempotent)."""
+    global _writer_started
+
+    with _lock:
+        if _writer_started or not SNAPSHOT_PATH:
+            return
+        _writer_started = True
+    atexit.register(write_snapshot)
+    if SNAPSHOT_INTERVAL_SECONDS > 0:
+        threading.Thread(target=_write_periodically, name='snapshot-writer', daemon=True).start()
@@ -0,0 +1,74 @@
+# caching/version_poller.py
+"""
+Background poller of the data_versions table.
+
+Every DatabaseManager write bumps its table's row in data_versions in the
+same transaction, so one small query tells a process which tables other
+processes have written to. The poller runs that query every
+VERSION_POLL_SECONDS, keeps the latest versions in memory for sessions
+to compare against, and calls listeners with the tables that moved.
+"""
+import os
+import threading
+import time
+
+from database import Session
+from crud.data_versions import read_versions
+
+VERSION_POLL_SECONDS = float(os.environ.get('VERSION_POLL_SECONDS', '5'))
+
+_lock = threading.Lock()
+_versions = None
+_listeners = []
+_poller_started = False
+
+def add_version_listener(listener):
+    """Register listener(changed), called with {table: version} for tables that moved."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+def poll_once():
+    """Read data_versions, notify listeners of changes and return the versions."""
+    global _versions
+
+    with Session() as session:
+        versions = read_versions(session)
+    with _lock:
+        previous, _versions = _versions, versions
+    if previous is not None:
+        changed = {table: version for table, version in versions.items() if previous.get(table) != version}
+        if changed:
+            for listener in list(_listeners):
+                try:
+                    listener(changed)
+                except Exception as e:
+                    print(f"Version listener {listener.__name__} failed: {e}")
+    return dict(versions)
+
+def current_versions():
+    """
+    The latest polled versions; read directly while the poller is not
+    running (or has not completed a poll yet).
+    """
+    with _lock:
+        if _poller_started and _versions is not None:
+            return dict(_versions)
+    return poll_once()
+
+def _poll_periodically():
+    while True:
+        try:
+            poll_once()
+        except Exception as e:
+            print(f"Version poll failed: {e}")
+        time.sleep(VERSION_POLL_SECONDS)
+
+def start_version_poller():
+    """Poll data_versions in a daemon thread (idempotent, disabled when the interval is 0)."""
+    global _poller_started
+
+    with _lock:
+        if _poller_started or VERSION_POLL_SECONDS <= 0:
+            return
+        _poller_started = True
+    threading.Thread(target=_poll_periodically, name='version-poller', daemon=True).start()
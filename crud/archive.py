@@ -0,0 +1,124 @@
+# crud/archive.py
+"""
+Archive tier for old badge awards.
+
+archive_awards() moves awards older than the horizon from badge_awards
+into badge_awards_archive one month at a time, each month in its own
+transaction, and adds them to the per-user monthly counts in
+award_archive_summary. Pages and sessions then only load the recent
+history; reads that reach back past archived_through() also query the
+archive, and totals add the summary counts.
+
+Run it with data/archive_awards.py.
+"""
+import os
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+
+from database import Session
+from models.badge_award import BadgeAward
+from models.badge_award_archive import BadgeAwardArchive
+from models.award_archive_summary import AwardArchiveSummary
+from crud.data_versions import bump_version
+from crud.rows import fetch_dicts, select_rows
+from crud.unit_of_work import read_session
+
+# Awards older than this many days are archived
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '730'))
+
+def _month_start(day):
+    return day.replace(day=1)
+
+def _next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _archive_range(session, start, end):
+    """Move awards with start <= awarded_at < end (within one month). Returns the count."""
+    in_range = (BadgeAward.awarded_at >= start) & (BadgeAward.awarded_at < end)
+    counts = session.execute(
+        select(BadgeAward.user_id, func.count()).where(in_range).group_by(BadgeAward.user_id)
+    ).all()
+    if not counts:
+        return 0
+
+    columns = [column.name for column in BadgeAward.__table__.columns]
+    session.execute(insert(BadgeAwardArchive.__table__).from_select(
+        columns, select(*BadgeAward.__table__.columns).where(in_range)))
+
+    month = _month_start(start)
+    summary = AwardArchiveSummary.__table__
+    existing = set(session.execute(select(summary.c.user_id).where(summary.c.month == month)).scalars())
+    for user_id, count in counts:
+        if user_id in existing:
+            session.execute(update(summary)
+                            .where(summary.c.user_id == user_id, summary.c.month == month)
+                            .values(award_count=summary.c.award_count + count))
+    new_rows = [{'user_id': user_id, 'month': month, 'award_count': count}
+                for user_id, count in counts if user_id not in existing]
+    if new_rows:
+        session.execute(insert(summary), new_rows)
+
+    session.execute(delete(BadgeAward.__table__).where(in_range))
+    return sum(count for _, count in counts)
+
+def archive_awards(older_than_days=ARCHIVE_AFTER_DAYS, today=None, log=print):
+    """
+    Archive every award older than older_than_days. Each month commits on
+    its own, so an interrupted run leaves whole months in one tier or the
+    other and can simply be run again. Returns the number of awards moved.
+    """
+    horizon = (today or date.today()) - timedelta(days=older_than_days)
+    with Session() as session:
+        oldest = session.execute(select(func.min(BadgeAward.awarded_at))).scalar()
+    if oldest is None or oldest >= horizon:
+        return 0
+
+    moved = 0
+    month = _month_start(oldest)
+    while month < horizon:
+        end = min(_next_month(month), horizon)
+        with Session.begin() as session:
+            count = _archive_range(session, month, end)
+            if count:
+                for table in (BadgeAward, BadgeAwardArchive, AwardArchiveSummary):
+                    bump_version(session, table.__tablename__)
+        if count:
+            log(f"{month:%Y-%m}: archived {count} awards")
+        moved += count
+        month = end
+    return moved
+
+def archived_through():
+    """Date of the newest archived award, or None when nothing is archived."""
+    with read_session() as session:
+        return session.execute(select(func.max(BadgeAwardArchive.awarded_at))).scalar()
+
+def reaches_archive(start_date):
+    """Whether a range starting at start_date includes archived awards."""
+    newest = archived_through()
+    return newest is not None and start_date <= newest
+
+def get_archived_awards(start_date, end_date):
+    """Archived awards with start_date <= awarded_at <= end_date, as BadgeAward dicts."""
+    with read_session() as session:
+        return fetch_dicts(session, BadgeAwardArchive, statement=select_rows(BadgeAwardArchive).where(
+            BadgeAwardArchive.awarded_at >= start_date,
+            BadgeAwardArchive.awarded_at <= end_date,
+        ))
+
+def get_archived_sprint_awards(sprint_ids):
+    """Archived awards recorded against any of sprint_ids, as BadgeAward dicts."""
+    with read_session() as session:
+        return fetch_dicts(session, BadgeAwardArchive, statement=select_rows(BadgeAwardArchive).where(
+            BadgeAwardArchive.sprint_id.in_(list(sprint_ids)),
+        ))
+
+def get_archived_counts(user_ids=None):
+    """{user_id: archived award count} from the summary, optionally for some users only."""
+    summary = AwardArchiveSummary
+    query = select(summary.user_id, func.sum(summary.award_count)).group_by(summary.user_id)
+    if user_ids is not None:
+        query = query.where(summary.user_id.in_(list(user_ids)))
+    with read_session() as session:
+        return {user_id: int(count) for user_id, count in session.execute(query)}
@@ -0,0 +1,137 @@
+# crud/async_db_manager.py
+"""
+Async data access on SQLAlchemy's asyncio engine.
+
+AsyncDatabaseManager mirrors DatabaseManager's static methods as
+coroutines. They all run on one background event loop thread, which owns
+the async engine and its pool, because Streamlit scripts have no loop of
+their own. A page passes several independent queries to gather(), which
+runs them concurrently and blocks until all are done, so the page waits
+for its slowest query rather than the sum of them.
+
+Optional: needs sqlalchemy[asyncio] (greenlet) and the backend's async
+driver, e.g. aiosqlite for SQLite (see database.ASYNC_DRIVERS).
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future
+
+from database import get_async_engine
+from models.user import User
+from crud.db_manager import create_row, update_row, delete_row
+from crud.rows import row_decoder, select_rows
+from queries import statements
+from monitoring.timing import timed_function
+
+_loop = None
+_loop_lock = threading.Lock()
+_sessionmaker = None
+
+def _event_loop():
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='async-db', daemon=True).start()
+            _loop = loop
+    return _loop
+
+def async_session():
+    """A new AsyncSession; only use it on the background loop."""
+    global _sessionmaker
+
+    if _sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _sessionmaker = async_sessionmaker(get_async_engine(), expire_on_commit=False)
+    return _sessionmaker()
+
+def run(coro):
+    """
+    Run a coroutine on the background loop and return its result. It runs
+    in a copy of the caller's context, so its statements and timings are
+    recorded against the page rerun that asked for them.
+    """
+    loop = _event_loop()
+    context = contextvars.copy_context()
+    result = Future()
+
+    def finish(task):
+        if task.cancelled():
+            result.cancel()
+        elif task.exception() is not None:
+            result.set_exception(task.exception())
+        else:
+            result.set_result(task.result())
+
+    def start():
+        loop.create_task(coro, context=context).add_done_callback(finish)
+
+    loop.call_soon_threadsafe(start)
+    return result.result()
+
+def gather(**queries):
+    """
+    Run independent queries concurrently and return {name: result}, e.g.
+    gather(users=AsyncDatabaseManager.get_all(User), sprints=AsyncDatabaseManager.get_all(Sprint)).
+    The first failure is raised.
+    """
+    async def run_all():
+        results = await asyncio.gather(*queries.values())
+        return dict(zip(queries, results))
+    return run(run_all())
+
+async def fetch_all(model, statement, params=None):
+    """Run statement and decode every row to a to_dict()-style dict."""
+    decode = row_decoder(model)
+    async with async_session() as session:
+        result = await session.execute(statement, params)
+        return [decode(row) for row in result]
+
+class AsyncDatabaseManager:
+    @staticmethod
+    @timed_function()
+    async def get_all(model, columns=None):
+        """Every row of model as to_dict()-style dicts; columns limits the keys returned."""
+        decode = row_decoder(model, columns)
+        async with async_session() as session:
+            result = await session.execute(select_rows(model, columns))
+            return [decode(row) for row in result]
+
+    @staticmethod
+    @timed_function()
+    async def get_by_id(model, item_id):
+        rows = await fetch_all(model, statements.by_id(model), {'id': item_id})
+        return rows[0] if rows else None
+
+    @staticmethod
+    @timed_function()
+    async def get_user_by_username(username):
+        try:
+            rows = await fetch_all(User, statements.statement('user_by_username'), {'username': username})
+            return rows[0] if rows else None
+        except Exception as e:
+            print(f"Database error: {str(e)}")
+            return None
+
+    @staticmethod
+    @timed_function()
+    async def create(model, data):
+        async with async_session() as session:
+            async with session.begin():
+                return await session.run_sync(create_row, model, data)
+
+    @staticmethod
+    @timed_function()
+    async def update(model, item_id, update_data):
+        async with async_session() as session:
+            async with session.begin():
+                return await session.run_sync(update_row, model, item_id, update_data)
+
+    @staticmethod
+    @timed_function()
+    async def delete(model, item_id):
+        async with async_session() as session:
+            async with session.begin():
+                return await session.run_sync(delete_row, model, item_id)
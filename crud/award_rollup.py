@@ -0,0 +1,206 @@
+# crud/award_rollup.py
+"""
+Daily award rollup: counts per day × team × user × badge category × badge type.
+
+DatabaseManager keeps it current by calling apply_award_changes() in the
+same transaction as every badge award write (bulk inserts collect
+award_deltas() per batch and apply them once), and rebuild_rollup()
+recomputes it from badge_awards and badge_awards_archive in bulk. Rows
+carry the user's current team and the badge's current category and type:
+when either changes, refresh_users() recomputes the affected users' rows.
+Time-series charts read get_daily_counts() instead of grouping raw
+awards at render time. Archiving does not touch the rollup, which
+always covers the whole history.
+"""
+from collections import Counter
+from datetime import date, datetime
+
+from sqlalchemy import bindparam, delete, func, insert, literal, select, union_all, update
+
+from models.user import User
+from models.badge import Badge
+from models.badge_award import BadgeAward
+from models.badge_award_archive import BadgeAwardArchive
+from models.award_daily_rollup import AwardDailyRollup
+from crud.data_versions import bump_version
+from crud.unit_of_work import read_session
+
+ROLLUP_KEYS = ('day', 'team_id', 'user_id', 'category', 'badge_type')
+LOOKUP_BATCH_SIZE = 500
+
+def _day(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    return None
+
+def _lookup(session, columns, key_column, ids):
+    """{id: row} for ids, in IN-list batches."""
+    ids = list(ids)
+    found = {}
+    for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+        batch = ids[start:start + LOOKUP_BATCH_SIZE]
+        for row in session.execute(select(key_column, *columns).where(key_column.in_(batch))):
+            found[row[0]] = row[1:]
+    return found
+
+def award_deltas(session, removed=(), added=()):
+    """
+    Counter of rollup key -> count change for awards removed from and added
+    to the award tables (dicts with user_id, badge_id, awarded_at).
+    """
+    awards = [(award, -1) for award in removed] + [(award, 1) for award in added]
+    deltas = Counter()
+    if not awards:
+        return deltas
+    teams = _lookup(session, [User.team_id], User.id, {a['user_id'] for a, _ in awards})
+    badges = _lookup(session, [Badge.category, Badge.badge_type], Badge.id, {a['badge_id'] for a, _ in awards})
+
+    for award, sign in awards:
+        day = _day(award.get('awarded_at'))
+        if day is None:
+            continue
+        category, badge_type = badges.get(award['badge_id'], (None, None))
+        team_id = teams.get(award['user_id'], (None,))[0]
+        deltas[(day, team_id or '', award['user_id'], category or '', badge_type or '')] += sign
+    return deltas
+
+def upsert(session, table):
+    """
+    An INSERT that can take ON CONFLICT clauses on PostgreSQL and SQLite,
+    or None on other backends.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(table)
+
+def apply_deltas(session, deltas):
+    """Add award_deltas() output to the rollup inside the caller's transaction."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    table = AwardDailyRollup.__table__
+    key_columns = [table.c[name] for name in ROLLUP_KEYS]
+    days = sorted({key[0] for key in deltas})
+    existing = set()
+    for start in range(0, len(days), LOOKUP_BATCH_SIZE):
+        existing.update(tuple(row) for row in session.execute(
+            select(*key_columns).where(table.c.day.in_(days[start:start + LOOKUP_BATCH_SIZE]))))
+
+    # One executemany per kind of change, so bulk loads stay cheap
+    match = [column == bindparam(f"k_{column.name}") for column in key_columns]
+    def params(key, **extra):
+        return dict({f"k_{name}": value for name, value in zip(ROLLUP_KEYS, key)}, **extra)
+
+    updates = [params(key, delta=delta) for key, delta in deltas.items() if key in existing]
+    if updates:
+        session.execute(update(table).where(*match)
+                        .values(award_count=table.c.award_count + bindparam('delta')), updates)
+    removals = [params(key) for key, delta in deltas.items() if key in existing and delta < 0]
+    if removals:
+        session.execute(delete(table).where(*match, table.c.award_count <= 0), removals)
+    new_rows = [dict(zip(ROLLUP_KEYS, key), award_count=delta)
+                for key, delta in deltas.items() if key not in existing and delta > 0]
+    if new_rows:
+        # A concurrent writer may have inserted the same key since the lookup
+        statement = upsert(session, table)
+        if statement is not None:
+            statement = statement.on_conflict_do_update(
+                index_elements=list(ROLLUP_KEYS),
+                set_={'award_count': table.c.award_count + statement.excluded.award_count})
+        session.execute(statement if statement is not None else insert(table), new_rows)
+    bump_version(session, AwardDailyRollup.__tablename__)
+
+def apply_award_changes(session, removed=(), added=()):
+    """Adjust the rollup for removed and added awards inside the caller's transaction."""
+    apply_deltas(session, award_deltas(session, removed, added))
+
+def _grouped_awards(user_ids=None):
+    """Rollup rows (keys + count) computed from both award tiers, optionally for some users only."""
+    tiers = []
+    for model in (BadgeAward, BadgeAwardArchive):
+        tier = select(model.awarded_at, model.user_id, model.badge_id)
+        if user_ids is not None:
+            tier = tier.where(model.user_id.in_(user_ids))
+        tiers.append(tier)
+    awards = union_all(*tiers).subquery()
+    team_id = func.coalesce(User.team_id, literal(''))
+    category = func.coalesce(Badge.category, literal(''))
+    badge_type = func.coalesce(Badge.badge_type, literal(''))
+    return (
+        select(awards.c.awarded_at, team_id, awards.c.user_id, category, badge_type, func.count())
+        .select_from(awards)
+        .outerjoin(User, User.id == awards.c.user_id)
+        .outerjoin(Badge, Badge.id == awards.c.badge_id)
+        .where(awards.c.awarded_at.isnot(None))
+        .group_by(awards.c.awarded_at, team_id, awards.c.user_id, category, badge_type)
+    )
+
+def rebuild_rollup(session):
+    """Recompute the whole rollup from both award tiers in the caller's transaction."""
+    table = AwardDailyRollup.__table__
+    session.execute(delete(table))
+    session.execute(insert(table).from_select(list(ROLLUP_KEYS) + ['award_count'], _grouped_awards()))
+    bump_version(session, AwardDailyRollup.__tablename__)
+    return session.execute(select(func.coalesce(func.sum(table.c.award_count), 0))).scalar()
+
+def refresh_users(session, user_ids):
+    """
+    Recompute the given users' rows from the award tables inside the
+    caller's transaction (call after the change is flushed), e.g. after a
+    user moves team or a badge they hold changes category or type.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    table = AwardDailyRollup.__table__
+    for start in range(0, len(user_ids), LOOKUP_BATCH_SIZE):
+        batch = user_ids[start:start + LOOKUP_BATCH_SIZE]
+        session.execute(delete(table).where(table.c.user_id.in_(batch)))
+        session.execute(insert(table).from_select(list(ROLLUP_KEYS) + ['award_count'], _grouped_awards(batch)))
+    bump_version(session, AwardDailyRollup.__tablename__)
+
+def badge_holders(session, badge_id):
+    """Ids of the users holding a badge in either award tier."""
+    return set(session.execute(union_all(
+        select(BadgeAward.user_id).where(BadgeAward.badge_id == badge_id),
+        select(BadgeAwardArchive.user_id).where(BadgeAwardArchive.badge_id == badge_id),
+    )).scalars())
+
+def needs_rebuild(session):
+    """True when awards exist but the rollup is empty (e.g. right after upgrading)."""
+    has_rollup = session.execute(select(AwardDailyRollup.day).limit(1)).first() is not None
+    if has_rollup:
+        return False
+    return any(session.execute(select(model.id).limit(1)).first() is not None
+               for model in (BadgeAward, BadgeAwardArchive))
+
+def get_daily_counts(group_by=('day',), start_date=None, end_date=None, team_id=None,
+                     user_id=None, category=None, badge_type=None):
+    """
+    Summed award counts grouped by the given rollup keys, as dicts with
+    those keys plus 'count' (days as date objects), ordered by the keys.
+    Filters left as None are not applied.
+    """
+    table = AwardDailyRollup.__table__
+    columns = [table.c[name] for name in group_by]
+    query = select(*columns, func.sum(table.c.award_count).label('count')).group_by(*columns).order_by(*columns)
+    filters = {'team_id': team_id, 'user_id': user_id, 'category': category, 'badge_type': badge_type}
+    for name, value in filters.items():
+        if value is not None:
+            query = query.where(table.c[name] == value)
+    if start_date is not None:
+        query = query.where(table.c.day >= start_date)
+    if end_date is not None:
+        query = query.where(table.c.day <= end_date)
+    with read_session() as session:
+        return [dict(zip(list(group_by) + ['count'], row)) for row in session.execute(query)]
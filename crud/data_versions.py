@@ -0,0 +1,45 @@
+# crud/data_versions.py
+import random
+
+from sqlalchemy import select, update
+from models.data_version import DataVersion
+
+# Row holding a random number picked when data_versions is first seeded,
+# so a reset and reseeded database does not repeat the old versions
+EPOCH_ENTITY = '_epoch'
+
+def bump_version(session, entity):
+    """
+    Increment the version of an entity (table name) inside the caller's
+    session, so the bump commits or rolls back together with the write.
+    """
+    result = session.execute(
+        update(DataVersion)
+        .where(DataVersion.entity == entity)
+        .values(version=DataVersion.version + 1)
+    )
+    if not result.rowcount:
+        session.add(DataVersion(entity=entity, version=1))
+
+def read_versions(session):
+    """Return {entity: version} for every tracked table."""
+    return dict(session.execute(select(DataVersion.entity, DataVersion.version)).all())
+
+def seed_versions(session, entities):
+    """Create version rows for entities that do not have one yet, and the epoch."""
+    existing = set(read_versions(session))
+    for entity in entities:
+        if entity not in existing:
+            session.add(DataVersion(entity=entity, version=0))
+    if EPOCH_ENTITY not in existing:
+        session.add(DataVersion(entity=EPOCH_ENTITY, version=random.randrange(1, 2 ** 31)))
+
+def database_identity(versions):
+    """
+    Which database versions (as from read_versions) were read from: the
+    engine URL without its password plus the epoch. Version numbers alone
+    repeat across databases, so caches key on this too.
+    """
+    from database import engine  # database imports this module while it initialises
+
+    return f"{engine.url.render_as_string(hide_password=True)}#{versions.get(EPOCH_ENTITY)}"
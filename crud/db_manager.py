@@ -1,12 +1,77 @@
 # crud/db_manager.py
 
+from collections import Counter
+from contextlib import contextmanager
+from sqlalchemy import insert
 from sqlalchemy.orm import sessionmaker
 from database import engine
 from models.user import User
+from models.badge import Badge
+from models.badge_award import BadgeAward
+from crud.data_versions import bump_version
+from crud import award_rollup, recipient_sketches
+from crud.award_rollup import apply_award_changes, apply_deltas, award_deltas
+from crud.recipient_sketches import apply_sketches, collect_sketches, update_sketches
+from crud.rows import fetch_dict, fetch_dicts, row_decoder, select_rows
+from crud.unit_of_work import read_session, rerun_session, current_transaction
 from queries.gamification_queries import GamificationQueries
+from queries import statements
+from monitoring.timing import timed_function
 
 Session = sessionmaker(bind=engine)
 
+# BadgeAward fields that place an award in the daily rollup and recipient sketches
+AWARD_KEY_FIELDS = ('user_id', 'badge_id', 'awarded_at', 'sprint_id')
+# Badge fields copied into the daily rollup
+BADGE_ROLLUP_FIELDS = ('category', 'badge_type')
+
+# Single-row writes inside the caller's session, shared with AsyncDatabaseManager
+def create_row(session, model, data):
+    item = model(**data)
+    session.add(item)
+    session.flush()
+    bump_version(session, model.__tablename__)
+    result = item.to_dict()
+    if model is BadgeAward:
+        apply_award_changes(session, added=[result])
+        update_sketches(session, added=[result])
+    return result
+
+def update_row(session, model, item_id, update_data):
+    item = session.get(model, item_id)
+    if not item:
+        return None
+    before = item.to_dict()
+    for key, value in update_data.items():
+        setattr(item, key, value)
+    bump_version(session, model.__tablename__)
+    result = item.to_dict()
+    if model is BadgeAward and any(before[key] != result[key] for key in AWARD_KEY_FIELDS):
+        apply_award_changes(session, removed=[before], added=[result])
+        session.flush()
+        update_sketches(session, removed=[before], added=[result])
+    elif model is User and before.get('team_id') != result.get('team_id'):
+        session.flush()
+        award_rollup.refresh_users(session, [item_id])
+        recipient_sketches.refresh_users(session, {item_id: before.get('team_id')})
+    elif model is Badge and any(before.get(key) != result.get(key) for key in BADGE_ROLLUP_FIELDS):
+        session.flush()
+        award_rollup.refresh_users(session, award_rollup.badge_holders(session, item_id))
+    return result
+
+def delete_row(session, model, item_id):
+    item = session.get(model, item_id)
+    if not item:
+        return False
+    removed = item.to_dict()
+    session.delete(item)
+    bump_version(session, model.__tablename__)
+    if model is BadgeAward:
+        apply_award_changes(session, removed=[removed])
+        session.flush()
+        update_sketches(session, removed=[removed])
+    return True
+
 class DatabaseManager:
     def __init__(self):
         self.session = Session()
@@ -27,56 +92,134 @@ class DatabaseManager:
             self.session.close()
 
     @staticmethod
-    def get_all(model):
-        with DatabaseManager() as session:
-            return [item.to_dict() for item in session.query(model).all()]
+    @contextmanager
+    def write_session():
+        """
+        Session for a single write. Inside transaction() the write joins that
+        block's commit; otherwise it commits on its own, through the rerun's
+        shared session when there is one so later reads see it.
+        """
+        session = current_transaction()
+        if session is not None:
+            yield session
+            return
+        session = rerun_session()
+        if session is None:
+            with DatabaseManager() as session:
+                yield session
+            return
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        try:
+            session.commit()
+        except Exception as e:
+            print(f"Commit failed: {str(e)}")
+            session.rollback()
+
+    @staticmethod
+    @timed_function()
+    def get_all(model, columns=None):
+        """
+        Every row of model as to_dict()-style dicts, read with a Core select()
+        rather than ORM instances. columns limits the keys returned.
+        """
+        with read_session() as session:
+            return fetch_dicts(session, model, columns)
     
     @staticmethod
+    def iter_all(model, batch_size=1000, columns=None):
+        """
+        Yield every row of model in lists of at most batch_size dicts, so
+        only one chunk is held at a time. Results are streamed with a
+        server-side cursor where the driver supports one (PostgreSQL,
+        SQL Server); SQLite fetches from its cursor as it goes anyway.
+        Uses its own session, since an open cursor can block other
+        statements on the same connection.
+        """
+        decode = row_decoder(model, columns)
+        with Session() as session:
+            result = session.execute(select_rows(model, columns),
+                                     execution_options={'yield_per': batch_size})
+            for partition in result.partitions():
+                yield [decode(row) for row in partition]
+
+    @staticmethod
+    @timed_function()
     def get_by_id(model, item_id):
-        with DatabaseManager() as session:
-            item = session.get(model, item_id)
-            return item.to_dict() if item else None
+        with read_session() as session:
+            return fetch_dict(session, model, statements.by_id(model), {'id': item_id})
     
     @staticmethod
+    @timed_function()
     def create(model, data):
-        with DatabaseManager() as session:
-            item = model(**data)
-            session.add(item)
-            session.flush()
-            return item.to_dict()
+        with DatabaseManager.write_session() as session:
+            return create_row(session, model, data)
     
     @staticmethod
+    @timed_function()
     def update(model, item_id, update_data):
-        with DatabaseManager() as session:
-            item = session.get(model, item_id)
-            if not item:
-                return None
-            for key, value in update_data.items():
-                setattr(item, key, value)
-            return item.to_dict()
+        with DatabaseManager.write_session() as session:
+            return update_row(session, model, item_id, update_data)
     
     @staticmethod
+    @timed_function()
     def delete(model, item_id):
-        with DatabaseManager() as session:
-            item = session.get(model, item_id)
-            if item:
-                session.delete(item)
-                return True
-            return False
+        with DatabaseManager.write_session() as session:
+            return delete_row(session, model, item_id)
 
     @staticmethod
+    @timed_function()
+    def bulk_insert(model, rows, batch_size=1000):
+        """
+        Insert column dicts in executemany batches within one transaction.
+        Rows are written as-is (no model constructor), so JSON text columns
+        must already be serialised. Returns the number of rows inserted.
+        """
+        table = model.__table__
+        count = 0
+        rollup = Counter()
+        sketches = {}
+        with Session.begin() as session:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    session.execute(insert(table), batch)
+                    if model is BadgeAward:
+                        rollup.update(award_deltas(session, added=batch))
+                        collect_sketches(session, batch, into=sketches)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                session.execute(insert(table), batch)
+                if model is BadgeAward:
+                    rollup.update(award_deltas(session, added=batch))
+                    collect_sketches(session, batch, into=sketches)
+                count += len(batch)
+            if count:
+                bump_version(session, model.__tablename__)
+            if rollup:
+                apply_deltas(session, rollup)
+            if sketches:
+                apply_sketches(session, sketches)
+        return count
+
+    @staticmethod
+    @timed_function()
     def get_user_by_username(username):
         try:
-            session = Session()
-            user = session.query(User).filter(User.username == username).first()
-            return user.to_dict() if user else None
+            with read_session() as session:
+                return fetch_dict(session, User, statements.statement('user_by_username'),
+                                  {'username': username})
         except Exception as e:
             print(f"Database error: {str(e)}")
             return None
-        finally:
-            session.close()
 
     @staticmethod
+    @timed_function()
     def filter_by(model_class, **filters):
         try:
             all_items = DatabaseManager.get_all(model_class)
@@ -115,6 +258,7 @@ class DatabaseManager:
             return []
         
     @staticmethod
+    @timed_function()
     def get_team_members_filtered(team_id):
         query = "SELECT * FROM users WHERE team_id = ? AND role NOT IN ('tl', 'rmo', 'manager')"
         team_members = GamificationQueries.execute_query(query, (team_id,))
@@ -0,0 +1,255 @@
+# crud/recipient_sketches.py
+"""
+Approximate distinct-recipient counts from HyperLogLog sketches.
+
+recipient_sketches holds one sketch per day × team × sprint: 2**PRECISION
+one-byte registers over the hashed user ids of that slice's award
+recipients. Sketches merge by taking the register-wise maximum, so the
+distinct recipients of any range of days, teams or sprints are estimated
+from the merged registers in memory that does not grow with the range
+(standard error about 1.04 / sqrt(2**PRECISION), ~3%).
+
+DatabaseManager adds recipients in the same transaction as every award
+write. Registers cannot forget a recipient, so slices that lose an award
+are recomputed from the award tables, as are the slices of a user who
+moves team (refresh_users()); rebuild_sketches() recomputes them all.
+"""
+import hashlib
+import math
+
+import numpy as np
+from sqlalchemy import delete, func, insert, literal, select, union_all, update
+
+from models.user import User
+from models.badge_award import BadgeAward
+from models.badge_award_archive import BadgeAwardArchive
+from models.recipient_sketch import RecipientSketch
+from crud.award_rollup import _day, _lookup, upsert
+from crud.data_versions import bump_version
+from crud.unit_of_work import read_session
+
+PRECISION = 10
+REGISTERS = 1 << PRECISION
+SKETCH_KEYS = ('day', 'team_id', 'sprint_id')
+BATCH_SIZE = 500
+
+_RANK_BITS = 64 - PRECISION
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+def new_sketch():
+    return np.zeros(REGISTERS, dtype=np.uint8)
+
+def add(sketch, user_id):
+    """Add a recipient to a sketch in place."""
+    digest = hashlib.blake2b(str(user_id).encode(), digest_size=8).digest()
+    value = int.from_bytes(digest, 'big')
+    index = value >> _RANK_BITS
+    rank = _RANK_BITS - (value & ((1 << _RANK_BITS) - 1)).bit_length() + 1
+    if rank > sketch[index]:
+        sketch[index] = rank
+
+def merge(sketch, registers):
+    """Merge stored registers (bytes) into a sketch in place."""
+    np.maximum(sketch, np.frombuffer(registers, dtype=np.uint8), out=sketch)
+
+def estimate(sketch):
+    """Estimated number of distinct recipients in a sketch."""
+    raw = _ALPHA * REGISTERS * REGISTERS / float(np.sum(np.ldexp(1.0, -sketch.astype(np.int32))))
+    zeros = int(np.count_nonzero(sketch == 0))
+    if raw <= 2.5 * REGISTERS and zeros:
+        # Small-range correction (linear counting)
+        raw = REGISTERS * math.log(REGISTERS / zeros)
+    return int(round(raw))
+
+def _award_keys(session, awards):
+    """(sketch key, user_id) for each award dict."""
+    teams = _lookup(session, [User.team_id], User.id, {a['user_id'] for a in awards})
+    keyed = []
+    for award in awards:
+        day = _day(award.get('awarded_at'))
+        if day is None:
+            continue
+        team_id = teams.get(award['user_id'], (None,))[0]
+        keyed.append(((day, team_id or '', award.get('sprint_id') or ''), award['user_id']))
+    return keyed
+
+def collect_sketches(session, added, into=None):
+    """Sketches of the recipients of added awards, by key (merged into `into` if given)."""
+    sketches = into if into is not None else {}
+    for key, user_id in _award_keys(session, added):
+        if key not in sketches:
+            sketches[key] = new_sketch()
+        add(sketches[key], user_id)
+    return sketches
+
+def _key_filter(table, keys):
+    days = sorted({key[0] for key in keys})
+    return table.c.day.in_(days)
+
+def _match(table, key):
+    return [table.c[name] == value for name, value in zip(SKETCH_KEYS, key)]
+
+def _merge_stored(session, table, sketches):
+    """Merge sketches into their stored rows (locked); returns the keys with no row yet."""
+    keys = list(sketches)
+    stored = {}
+    for start in range(0, len(keys), BATCH_SIZE):
+        batch = keys[start:start + BATCH_SIZE]
+        query = select(table).where(_key_filter(table, batch)).with_for_update()
+        for row in session.execute(query):
+            key = (row.day, row.team_id, row.sprint_id)
+            if key in sketches:
+                stored[key] = row.registers
+
+    for key, registers in stored.items():
+        merged = sketches[key].copy()
+        merge(merged, registers)
+        if not np.array_equal(merged, np.frombuffer(registers, dtype=np.uint8)):
+            session.execute(update(table).where(*_match(table, key)).values(registers=merged.tobytes()))
+    return [key for key in keys if key not in stored]
+
+def apply_sketches(session, sketches):
+    """Merge collected sketches into the stored ones inside the caller's transaction."""
+    if not sketches:
+        return
+    table = RecipientSketch.__table__
+    missing = _merge_stored(session, table, sketches)
+    if missing:
+        new_rows = [dict(zip(SKETCH_KEYS, key), registers=sketches[key].tobytes()) for key in missing]
+        statement = upsert(session, table)
+        if statement is None:
+            session.execute(insert(table), new_rows)
+        else:
+            # A concurrent writer may have created some of these slices since
+            # the lookup; keep theirs and merge ours into it
+            session.execute(statement.on_conflict_do_nothing(index_elements=list(SKETCH_KEYS)), new_rows)
+            _merge_stored(session, table, {key: sketches[key] for key in missing})
+    bump_version(session, RecipientSketch.__tablename__)
+
+def _recipients(key):
+    """Union of both award tiers' recipients in one sketch slice."""
+    day, team_id, sprint_id = key
+    tiers = []
+    for model in (BadgeAward, BadgeAwardArchive):
+        tiers.append(
+            select(model.user_id)
+            .outerjoin(User, User.id == model.user_id)
+            .where(model.awarded_at == day,
+                   func.coalesce(model.sprint_id, literal('')) == sprint_id,
+                   func.coalesce(User.team_id, literal('')) == team_id)
+        )
+    return union_all(*tiers)
+
+def recompute_sketches(session, keys):
+    """Rebuild the given slices from the award tables inside the caller's transaction."""
+    if not keys:
+        return
+    table = RecipientSketch.__table__
+    for key in set(keys):
+        sketch = new_sketch()
+        user_ids = session.execute(_recipients(key)).scalars().all()
+        for user_id in user_ids:
+            add(sketch, user_id)
+        session.execute(delete(table).where(*_match(table, key)))
+        if user_ids:
+            session.execute(insert(table), [dict(zip(SKETCH_KEYS, key), registers=sketch.tobytes())])
+    bump_version(session, RecipientSketch.__tablename__)
+
+def update_sketches(session, removed=(), added=()):
+    """
+    Keep sketches current after award writes (call after the write is
+    flushed): slices that lost an award are recomputed, the rest merged.
+    """
+    stale = {key for key, _ in _award_keys(session, removed)} if removed else set()
+    additions = collect_sketches(session, added) if added else {}
+    recompute_sketches(session, stale)
+    apply_sketches(session, {key: sketch for key, sketch in additions.items() if key not in stale})
+
+def refresh_users(session, previous_teams):
+    """
+    Recompute the slices of users who moved team, given {user_id: previous
+    team_id}, inside the caller's transaction (call after the move is flushed).
+    """
+    if not previous_teams:
+        return
+    user_ids = list(previous_teams)
+    keys = set()
+    for model in (BadgeAward, BadgeAwardArchive):
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            query = (select(model.awarded_at, model.sprint_id, model.user_id, User.team_id)
+                     .outerjoin(User, User.id == model.user_id)
+                     .where(model.user_id.in_(user_ids[start:start + BATCH_SIZE])))
+            for awarded_at, sprint_id, user_id, team_id in session.execute(query):
+                day = _day(awarded_at)
+                if day is None:
+                    continue
+                keys.add((day, previous_teams[user_id] or '', sprint_id or ''))
+                keys.add((day, team_id or '', sprint_id or ''))
+    recompute_sketches(session, keys)
+
+def rebuild_sketches(session):
+    """Recompute every sketch from both award tiers. Returns the number of sketches."""
+    awards = union_all(
+        select(BadgeAward.awarded_at, BadgeAward.user_id, BadgeAward.sprint_id),
+        select(BadgeAwardArchive.awarded_at, BadgeAwardArchive.user_id, BadgeAwardArchive.sprint_id),
+    ).subquery()
+    query = (
+        select(awards.c.awarded_at, func.coalesce(User.team_id, literal('')),
+               func.coalesce(awards.c.sprint_id, literal('')), awards.c.user_id)
+        .select_from(awards)
+        .outerjoin(User, User.id == awards.c.user_id)
+        .where(awards.c.awarded_at.isnot(None))
+        .distinct()
+    )
+    sketches = {}
+    for day, team_id, sprint_id, user_id in session.execute(query.execution_options(yield_per=5000)):
+        key = (_day(day), team_id, sprint_id)
+        if key not in sketches:
+            sketches[key] = new_sketch()
+        add(sketches[key], user_id)
+
+    table = RecipientSketch.__table__
+    session.execute(delete(table))
+    rows = [dict(zip(SKETCH_KEYS, key), registers=sketch.tobytes()) for key, sketch in sketches.items()]
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute(insert(table), rows[start:start + BATCH_SIZE])
+    bump_version(session, RecipientSketch.__tablename__)
+    return len(rows)
+
+def needs_rebuild(session):
+    """True when awards exist but no sketches do (e.g. right after upgrading)."""
+    if session.execute(select(RecipientSketch.day).limit(1)).first() is not None:
+        return False
+    return any(session.execute(select(model.id).limit(1)).first() is not None
+               for model in (BadgeAward, BadgeAwardArchive))
+
+def approx_unique_recipients(group_by=(), start_date=None, end_date=None, team_id=None, sprint_ids=None):
+    """
+    Estimated distinct recipients grouped by the given sketch keys, as
+    dicts with those keys plus 'count'. Sketches are merged while they
+    stream in, so memory grows with the number of groups, not the range.
+    """
+    table = RecipientSketch.__table__
+    query = select(table)
+    if start_date is not None:
+        query = query.where(table.c.day >= start_date)
+    if end_date is not None:
+        query = query.where(table.c.day <= end_date)
+    if team_id is not None:
+        query = query.where(table.c.team_id == team_id)
+
+    queries = [query]
+    if sprint_ids is not None:
+        sprint_ids = list(sprint_ids)
+        queries = [query.where(table.c.sprint_id.in_(sprint_ids[start:start + BATCH_SIZE]))
+                   for start in range(0, len(sprint_ids), BATCH_SIZE)]
+
+    groups = {}
+    with read_session() as session:
+        for statement in queries:
+            for row in session.execute(statement.execution_options(yield_per=BATCH_SIZE)):
+                group = tuple(getattr(row, name) for name in group_by)
+                if group not in groups:
+                    groups[group] = new_sketch()
+                merge(groups[group], row.registers)
+    return [dict(zip(group_by, group), count=estimate(sketch)) for group, sketch in sorted(groups.items(), key=lambda item: item[0])]
@@ -0,0 +1,74 @@
+# crud/rows.py
+"""
+Core read path for list-style reads.
+
+Builds select() statements over a model's table and turns the rows
+straight into the same dicts the model's to_dict() returns, without
+creating ORM instances. Column values that to_dict() converts (JSON text,
+dates) are decoded here, in one place.
+"""
+import json
+
+from sqlalchemy import select
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+def _json_list(value):
+    return json.loads(value) if value else []
+
+# Per table: column -> converter, matching each model's to_dict()
+CONVERTERS = {
+    'badges': {'eligible_roles': _json_list},
+    'badge_awards': {'awarded_at': _iso},
+    'badge_awards_archive': {'awarded_at': _iso},
+    'award_archive_summary': {'month': _iso},
+    'sprints': {'start_date': _iso, 'end_date': _iso},
+}
+
+def table_columns(model, columns=None):
+    """The table columns to read: all of them, or the named ones in order."""
+    table = model.__table__
+    if columns is None:
+        return list(table.columns)
+    return [table.columns[name] for name in columns]
+
+def select_rows(model, columns=None):
+    return select(*table_columns(model, columns))
+
+_full_row_decoders = {}
+
+def row_decoder(model, columns=None):
+    """A function turning one result row (a tuple) into a to_dict()-style dict."""
+    if columns is None:
+        decode = _full_row_decoders.get(model)
+        if decode is None:
+            decode = _full_row_decoders[model] = _build_decoder(model, None)
+        return decode
+    return _build_decoder(model, columns)
+
+def _build_decoder(model, columns):
+    names = [column.name for column in table_columns(model, columns)]
+    converters = CONVERTERS.get(model.__tablename__, {})
+    convert_at = [(i, converters[name]) for i, name in enumerate(names) if name in converters]
+
+    if not convert_at:
+        return lambda row: dict(zip(names, row))
+
+    def decode(row):
+        values = list(row)
+        for i, convert in convert_at:
+            values[i] = convert(values[i])
+        return dict(zip(names, values))
+    return decode
+
+def fetch_dicts(session, model, columns=None, statement=None, params=None):
+    """Run statement (all rows of the model by default) and decode every row."""
+    decode = row_decoder(model, columns)
+    statement = select_rows(model, columns) if statement is None else statement
+    return [decode(row) for row in session.execute(statement, params)]
+
+def fetch_dict(session, model, statement, params=None):
+    """The first row of statement as a to_dict()-style dict, or None."""
+    row = session.execute(statement, params).first()
+    return row_decoder(model)(row) if row is not None else None
@@ -0,0 +1,88 @@
+# crud/unit_of_work.py
+"""
+One database session per page rerun.
+
+Reads made from the script thread during a rerun share a single session
+(and transaction), opened on first use and closed when the rerun ends.
+Writes either commit on their own, as before, or are grouped with
+transaction(), which commits once when the block exits:
+
+    with transaction():
+        DatabaseManager.update(Team, team_id, team_data)
+        DatabaseManager.update(User, lead_id, {'is_lead': True})
+
+Worker threads and code running outside a rerun get short-lived sessions.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+
+from database import Session
+from monitoring.timing import current_rerun, add_rerun_listener
+
+_transaction = contextvars.ContextVar('db_transaction', default=None)
+
+def rerun_session():
+    """
+    The session shared by the current rerun, or None outside a rerun and
+    on threads other than the script thread (sessions are not thread-safe).
+    """
+    rerun = current_rerun()
+    if rerun is None or rerun.thread_id != threading.get_ident():
+        return None
+    session = rerun.extras.get('db_session')
+    if session is None:
+        # Closed by _close_rerun_session when the rerun finishes: at end_page()
+        # or stop_page(), from the script error handler when the page raises,
+        # or at the session's next begin_page() otherwise (e.g. st.rerun())
+        session = rerun.extras['db_session'] = Session()
+    return session
+
+def _close_rerun_session(rerun):
+    session = rerun.extras.pop('db_session', None)
+    if session is not None:
+        session.close()
+
+add_rerun_listener(_close_rerun_session)
+
+def current_transaction():
+    """The session of the enclosing transaction() block on this thread, if any."""
+    active = _transaction.get()
+    if active is not None and active[1] == threading.get_ident():
+        return active[0]
+    return None
+
+@contextmanager
+def read_session():
+    """A session for reads: the rerun's shared one if available, else a new one."""
+    session = current_transaction() or rerun_session()
+    if session is not None:
+        yield session
+        return
+    with Session() as session:
+        yield session
+
+@contextmanager
+def transaction():
+    """
+    Group writes into one commit at the end of the block, rolling back on
+    error. Nested blocks join the outermost one.
+    """
+    session = current_transaction()
+    if session is not None:
+        yield session
+        return
+
+    shared = rerun_session()
+    session = shared or Session()
+    token = _transaction.set((session, threading.get_ident()))
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        _transaction.reset(token)
+        if shared is None:
+            session.close()
@@ -0,0 +1,29 @@
+# data/archive_awards.py
+"""
+Move badge awards older than a horizon into the archive table.
+
+Usage:
+    python -m data.archive_awards --older-than-days 730 --database-url sqlite:///scale.db
+"""
+import argparse
+import json
+import os
+import sys
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--older-than-days', type=int,
+                        help="Archive awards older than this (defaults to ARCHIVE_AFTER_DAYS, 730)")
+    parser.add_argument('--database-url', help="Target database (defaults to DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    # database.py binds the engine at import time
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    from crud.archive import ARCHIVE_AFTER_DAYS, archive_awards
+
+    days = args.older_than_days if args.older_than_days is not None else ARCHIVE_AFTER_DAYS
+    print(json.dumps({'archived': archive_awards(days)}))
+
+if __name__ == '__main__':
+    sys.exit(main())
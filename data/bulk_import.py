@@ -0,0 +1,406 @@
+# data/bulk_import.py
+"""
+Streaming bulk import of users, teams, badges, sprints and badge awards
+from CSV or JSONL files.
+
+Records are read and validated in chunks: each one is built with its
+model's constructor (so the same rules apply as in the app), checked
+against required columns, existing keys and referenced rows, and the
+valid rows of a chunk are written with one batched insert in one
+transaction. After every chunk a checkpoint records how far the file
+got, so an interrupted import resumes where it stopped. Rejected records
+are appended to a CSV report with their line number and reason.
+
+Usage:
+    python -m data.bulk_import awards.csv --entity awards --database-url sqlite:///scale.db
+    python -m data.bulk_import users.jsonl --entity users --chunk-size 2000 --restart
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+
+from models.team import Team
+from models.user import User
+from models.badge import Badge
+from models.sprint import Sprint
+from models.badge_award import BadgeAward
+
+DEFAULT_CHUNK_SIZE = 5000
+IMPORT_DIR = os.path.join('.cache', 'imports')
+# Values per IN (...) list when checking existing keys
+LOOKUP_BATCH_SIZE = 500
+
+ENTITIES = {
+    'teams': Team,
+    'users': User,
+    'badges': Badge,
+    'sprints': Sprint,
+    'awards': BadgeAward,
+}
+
+class RecordError(ValueError):
+    """A record that cannot be imported."""
+
+def _text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _int(value):
+    value = _text(value)
+    return int(value) if value is not None else None
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    value = _text(value)
+    if value is None:
+        return None
+    if value.lower() in ('1', 'true', 'yes', 'y'):
+        return True
+    if value.lower() in ('0', 'false', 'no', 'n'):
+        return False
+    raise RecordError(f"not a boolean: {value!r}")
+
+def _date(value):
+    if isinstance(value, date):
+        return value
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    except ValueError:
+        raise RecordError(f"not a YYYY-MM-DD date: {value!r}")
+
+def _list(value):
+    """JSON arrays or ';'-separated text (as written by spreadsheets)."""
+    if isinstance(value, list):
+        return value
+    value = _text(value)
+    if value is None:
+        return []
+    if value.startswith('['):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            raise RecordError(f"not a JSON list: {value!r}")
+    return [item.strip() for item in value.split(';') if item.strip()]
+
+def _build_team(r):
+    return Team(id=_text(r.get('id')), name=_text(r.get('name')),
+                description=_text(r.get('description')), department=_text(r.get('department')))
+
+def _build_user(r):
+    password = _text(r.get('password'))
+    if password is None:
+        raise RecordError("password is required")
+    return User(id=_text(r.get('id')), name=_text(r.get('name')), username=_text(r.get('username')),
+                password=hashlib.sha256(password.encode()).hexdigest(), email=_text(r.get('email')),
+                role=_text(r.get('role')) or 'Developer', team_id=_text(r.get('team_id')),
+                is_lead=bool(_bool(r.get('is_lead'))))
+
+def _build_badge(r):
+    kwargs = {}
+    if _int(r.get('expected_time_days')) is not None:
+        kwargs['expected_time_days'] = _int(r['expected_time_days'])
+    for name in ('validity', 'badge_type'):
+        if _text(r.get(name)) is not None:
+            kwargs[name] = _text(r[name])
+    return Badge(id=_text(r.get('id')), name=_text(r.get('name')),
+                 description=_text(r.get('description')), category=_text(r.get('category')),
+                 how_to_achieve=_text(r.get('how_to_achieve')),
+                 eligible_roles=_list(r.get('eligible_roles')), **kwargs)
+
+def _build_sprint(r):
+    return Sprint(id=_text(r.get('id')), name=_text(r.get('name')),
+                  start_date=_date(r.get('start_date')), end_date=_date(r.get('end_date')),
+                  team_id=_text(r.get('team_id')), description=_text(r.get('description')),
+                  goals=_list(r.get('goals')), status=_text(r.get('status')) or 'upcoming')
+
+def _build_award(r):
+    awarded_at = _date(r.get('awarded_at'))
+    if awarded_at is None:
+        raise RecordError("awarded_at is required")
+    award = BadgeAward(id=_text(r.get('id')), user_id=_text(r.get('user_id')),
+                       badge_id=_text(r.get('badge_id')), awarded_by=_text(r.get('awarded_by')),
+                       awarded_at=awarded_at, reason=_text(r.get('reason')),
+                       sprint_id=_text(r.get('sprint_id')))
+    recent = _bool(r.get('recent'))
+    if recent is not None:
+        award.recent = recent
+    return award
+
+BUILDERS = {
+    Team: _build_team,
+    User: _build_user,
+    Badge: _build_badge,
+    Sprint: _build_sprint,
+    BadgeAward: _build_award,
+}
+
+def to_row(model, record):
+    """Validate record with model's constructor and return its column values."""
+    try:
+        instance = BUILDERS[model](record)
+    except RecordError:
+        raise
+    except (ValueError, TypeError) as e:
+        raise RecordError(str(e))
+
+    row = {}
+    for column in model.__table__.columns:
+        value = getattr(instance, column.key)
+        if value is None and column.default is not None and column.default.is_scalar:
+            value = column.default.arg
+        if value is None and not column.nullable:
+            raise RecordError(f"{column.name} is required")
+        if isinstance(value, str) and getattr(column.type, 'length', None) and len(value) > column.type.length:
+            raise RecordError(f"{column.name} is longer than {column.type.length} characters")
+        row[column.name] = value
+    if row.get('start_date') and row.get('end_date') and row['end_date'] < row['start_date']:
+        raise RecordError("end_date is before start_date")
+    return row
+
+def detect_format(name):
+    return 'jsonl' if name.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+def read_records(stream, fmt):
+    """
+    Yield (line, record) from a text stream without reading it whole.
+    Malformed JSONL lines are yielded as (line, RecordError).
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield line, RecordError(f"invalid JSON: {e.msg}")
+            continue
+        if not isinstance(record, dict):
+            yield line, RecordError("not a JSON object")
+            continue
+        yield line, record
+
+def _existing(session, column, values):
+    """The subset of values already present in column."""
+    from sqlalchemy import select
+
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), LOOKUP_BATCH_SIZE):
+        batch = values[start:start + LOOKUP_BATCH_SIZE]
+        found.update(session.execute(select(column).where(column.in_(batch))).scalars())
+    return found
+
+def _check_chunk(model, rows):
+    """
+    Split a chunk's (line, row) pairs into accepted rows and (line, reason)
+    rejections: duplicate keys (in the chunk or already stored) and
+    references to rows that do not exist.
+    """
+    from database import Session
+
+    table = model.__table__
+    unique_columns = [c for c in table.columns if c.primary_key or c.unique]
+    rejected = {}
+
+    with Session() as session:
+        for column in unique_columns:
+            values = {row[column.name] for _, row in rows if row[column.name] is not None}
+            stored = _existing(session, column, values)
+            seen = set()
+            for line, row in rows:
+                value = row[column.name]
+                if value in stored:
+                    rejected.setdefault(line, f"{column.name} {value!r} already exists")
+                elif value in seen:
+                    rejected.setdefault(line, f"duplicate {column.name} {value!r} in file")
+                seen.add(value)
+
+        for column in table.columns:
+            for fk in column.foreign_keys:
+                values = {row[column.name] for _, row in rows if row[column.name] is not None}
+                stored = _existing(session, fk.column, values)
+                for line, row in rows:
+                    value = row[column.name]
+                    if value is not None and value not in stored:
+                        rejected.setdefault(line, f"{column.name} {value!r} does not exist in {fk.column.table.name}")
+
+    accepted = [(line, row) for line, row in rows if line not in rejected]
+    return accepted, sorted(rejected.items())
+
+def _write_rows(model, rows):
+    """
+    Insert a chunk in one transaction. If the batch fails (a constraint the
+    checks above do not cover), retry row by row and reject the failures.
+    """
+    from crud.db_manager import DatabaseManager
+
+    try:
+        return DatabaseManager.bulk_insert(model, [row for _, row in rows], batch_size=len(rows) or 1), []
+    except Exception:
+        inserted, rejected = 0, []
+        for line, row in rows:
+            try:
+                inserted += DatabaseManager.bulk_insert(model, [row])
+            except Exception as e:
+                rejected.append((line, f"database error: {str(e).splitlines()[0][:200]}"))
+        return inserted, rejected
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def default_paths(source_id):
+    """Checkpoint and rejected-rows report locations for an import source."""
+    safe = ''.join(ch if ch.isalnum() or ch in '-_.' else '_' for ch in source_id)
+    return (os.path.join(IMPORT_DIR, f"{safe}.checkpoint.json"),
+            os.path.join(IMPORT_DIR, f"{safe}.rejected.csv"))
+
+def load_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def import_stream(stream, entity, fmt='csv', source_id=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                  checkpoint_path=None, rejected_path=None, restart=False, progress=None):
+    """
+    Import records of entity from a text stream. source_id identifies the
+    input for checkpointing (a file path, or an upload's name and size).
+    progress(summary) is called after every chunk. Returns the summary.
+    """
+    model = ENTITIES[entity]
+    source_id = source_id or entity
+    default_checkpoint, default_rejected = default_paths(f"{entity}-{source_id}")
+    checkpoint_path = checkpoint_path or default_checkpoint
+    rejected_path = rejected_path or default_rejected
+    os.makedirs(os.path.dirname(checkpoint_path) or '.', exist_ok=True)
+    os.makedirs(os.path.dirname(rejected_path) or '.', exist_ok=True)
+
+    checkpoint = None if restart else load_checkpoint(checkpoint_path)
+    if checkpoint and (checkpoint.get('entity') != entity or checkpoint.get('source') != source_id):
+        checkpoint = None
+    summary = {
+        'entity': entity,
+        'source': source_id,
+        'records_done': 0,
+        'inserted': 0,
+        'rejected': 0,
+        'complete': False,
+        'checkpoint': checkpoint_path,
+        'rejected_report': rejected_path,
+    }
+    if checkpoint:
+        summary.update({key: checkpoint[key] for key in ('records_done', 'inserted', 'rejected', 'complete')})
+        if summary['complete']:
+            return summary
+    elif os.path.exists(rejected_path):
+        os.remove(rejected_path)
+
+    skip = summary['records_done']
+    started = time.perf_counter()
+
+    def flush(chunk, errors):
+        accepted, rejected = _check_chunk(model, chunk) if chunk else ([], [])
+        inserted, failed = _write_rows(model, accepted) if accepted else (0, [])
+        rejected = sorted(errors + rejected + failed)
+        if rejected:
+            new_report = not os.path.exists(rejected_path)
+            with open(rejected_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new_report:
+                    writer.writerow(['line', 'reason'])
+                writer.writerows(rejected)
+        summary['records_done'] += len(chunk) + len(errors)
+        summary['inserted'] += inserted
+        summary['rejected'] += len(rejected)
+        summary['elapsed_s'] = round(time.perf_counter() - started, 2)
+        _write_json_atomic(checkpoint_path, summary)
+        if progress:
+            progress(dict(summary))
+
+    chunk, errors, position = [], [], 0
+    for line, record in read_records(stream, fmt):
+        position += 1
+        if position <= skip:
+            continue
+        if isinstance(record, RecordError):
+            errors.append((line, str(record)))
+        else:
+            try:
+                chunk.append((line, to_row(model, record)))
+            except RecordError as e:
+                errors.append((line, str(e)))
+        if len(chunk) + len(errors) >= chunk_size:
+            flush(chunk, errors)
+            chunk, errors = [], []
+    flush(chunk, errors)
+
+    summary['complete'] = True
+    _write_json_atomic(checkpoint_path, summary)
+    return summary
+
+def import_file(path, entity, fmt=None, **kwargs):
+    """Import a CSV or JSONL file from disk; see import_stream."""
+    fmt = fmt or detect_format(path)
+    with open(path, newline='' if fmt == 'csv' else None, encoding='utf-8-sig') as stream:
+        return import_stream(stream, entity, fmt, source_id=os.path.abspath(path), **kwargs)
+
+def import_upload(data, name, entity, **kwargs):
+    """Import an uploaded file-like object of bytes; name and size identify it for resuming."""
+    fmt = detect_format(name)
+    data.seek(0, os.SEEK_END)
+    size = data.tell()
+    data.seek(0)
+    stream = io.TextIOWrapper(data, encoding='utf-8-sig', newline='' if fmt == 'csv' else None)
+    try:
+        return import_stream(stream, entity, fmt, source_id=f"{name}-{size}", **kwargs)
+    finally:
+        stream.detach()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('path', help="CSV or JSONL file")
+    parser.add_argument('--entity', required=True, choices=sorted(ENTITIES))
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension")
+    parser.add_argument('--database-url', help="Target database (defaults to DATABASE_URL)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--checkpoint', help=f"Checkpoint file (default under {IMPORT_DIR})")
+    parser.add_argument('--rejected', help=f"Rejected-rows report (default under {IMPORT_DIR})")
+    parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    # database.py binds the engine at import time
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+
+    def report(summary):
+        print(f"{summary['records_done']} records: {summary['inserted']} inserted, "
+              f"{summary['rejected']} rejected ({summary['elapsed_s']}s)", file=sys.stderr)
+
+    summary = import_file(args.path, args.entity, args.format, chunk_size=args.chunk_size,
+                          checkpoint_path=args.checkpoint, rejected_path=args.rejected,
+                          restart=args.restart, progress=report)
+    print(json.dumps(summary))
+    return 1 if summary['rejected'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+# data/generate_org.py
+"""
+Deterministic synthetic organisation generator for scale testing.
+
+Writes teams, users (with the usual role mix), a badge catalog with
+eligible roles, per-team sprint calendars and a skewed award history into
+the configured database using bulk inserts. The same arguments and seed
+always produce the same data.
+
+Usage:
+    python -m data.generate_org --database-url sqlite:///scale.db --reset \\
+        --teams 40 --users 3000 --badges 300 --awards 200000 --years 3
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+DEFAULT_PASSWORD = "password123"
+
+DEPARTMENTS = ['Engineering', 'Quality', 'Operations', 'Data', 'Infrastructure', 'Security']
+TEAM_NAMES = ['Platform', 'Payments', 'Mobile', 'Identity', 'Search', 'Billing', 'Analytics',
+              'Integrations', 'Core API', 'Web', 'Reliability', 'Growth', 'Messaging', 'Reporting']
+FIRST_NAMES = ['Aisha', 'Omar', 'Priya', 'John', 'Maria', 'Chen', 'Fatima', 'Lucas', 'Sara', 'Ahmed',
+               'Elena', 'Ravi', 'Nadia', 'Tom', 'Yusuf', 'Grace', 'Hassan', 'Mei', 'Daniel', 'Leila']
+LAST_NAMES = ['Khan', 'Smith', 'Patel', 'Garcia', 'Wang', 'Ali', 'Costa', 'Nair', 'Haddad', 'Silva',
+              'Kowalski', 'Ibrahim', 'Tanaka', 'Murphy', 'Rahman', 'Fischer', 'Lopez', 'Menon']
+
+# Role mix of non-lead team members; each team also gets one TL
+MEMBER_ROLES = ['Dev', 'QA', 'RMO']
+MEMBER_ROLE_WEIGHTS = [0.62, 0.26, 0.12]
+ELIGIBLE_ROLES = ['Dev', 'QA', 'RMO', 'TL']
+
+BADGE_CATEGORIES = ['Technical', 'Leadership', 'Teamwork', 'Innovation', 'Process', 'Other']
+BADGE_CATEGORY_WEIGHTS = [0.35, 0.12, 0.22, 0.12, 0.12, 0.07]
+BADGE_ADJECTIVES = ['Swift', 'Steady', 'Bold', 'Sharp', 'Reliable', 'Creative', 'Relentless', 'Curious']
+BADGE_NOUNS = ['Bug Hunter', 'Code Reviewer', 'Mentor', 'Firefighter', 'Automator', 'Architect',
+               'Documenter', 'Release Captain', 'Test Champion', 'Idea Spark', 'Collaborator']
+VALIDITIES = ['Permanent', '1 Month', '3 Months', '6 Months', '1 Year']
+SPRINT_GOALS = ['Reduce open bugs', 'Ship the release', 'Improve test coverage', 'Pay down tech debt',
+                'Automate deployments', 'Update runbooks', 'Cut page load time']
+REASONS = ['Outstanding delivery', 'Great teamwork this sprint', 'Resolved a critical incident',
+           'Mentored a new joiner', 'Improved the release process', 'Delivered an innovative idea']
+
+SPRINT_DAYS = 14
+AWARD_SKEW = 1.1  # Zipf exponent for recipient and badge popularity
+
+def zipf_cum_weights(n, skew):
+    """Cumulative Zipf weights for ranks 1..n, for random.choices(cum_weights=...)."""
+    return list(accumulate(1.0 / (rank ** skew) for rank in range(1, n + 1)))
+
+def generate_teams(rng, count):
+    teams = []
+    for i in range(count):
+        base = TEAM_NAMES[i % len(TEAM_NAMES)]
+        name = base if i < len(TEAM_NAMES) else f"{base} {i // len(TEAM_NAMES) + 1}"
+        teams.append({
+            'id': f"team_{i:05d}",
+            'name': name,
+            'description': f"{name} team",
+            'department': rng.choice(DEPARTMENTS),
+        })
+    return teams
+
+def generate_users(rng, teams, count):
+    """One TL per team, roughly one Manager per 150 users, the rest by role mix."""
+    password = hashlib.sha256(DEFAULT_PASSWORD.encode()).hexdigest()
+    managers = max(1, count // 150)
+    users = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        if i < len(teams):
+            team, role = teams[i], 'TL'
+        elif i < len(teams) + managers:
+            team, role = rng.choice(teams), 'Manager'
+        else:
+            team, role = rng.choice(teams), rng.choices(MEMBER_ROLES, MEMBER_ROLE_WEIGHTS)[0]
+        username = f"{first}.{last}{i}".lower()
+        users.append({
+            'id': f"user_{i:06d}",
+            'name': f"{first} {last}",
+            'username': username,
+            'password': password,
+            'email': f"{username}@example.com",
+            'role': role,
+            'team_id': team['id'],
+            'is_lead': role == 'TL',
+        })
+    return users
+
+def generate_badges(rng, count):
+    badges = []
+    for i in range(count):
+        noun = BADGE_NOUNS[i % len(BADGE_NOUNS)]
+        adjective = BADGE_ADJECTIVES[(i // len(BADGE_NOUNS)) % len(BADGE_ADJECTIVES)]
+        tier = i // (len(BADGE_NOUNS) * len(BADGE_ADJECTIVES)) + 1
+        roles = rng.sample(ELIGIBLE_ROLES, rng.randint(1, len(ELIGIBLE_ROLES)))
+        badges.append({
+            'id': f"badge_{i:05d}",
+            'name': f"{adjective} {noun} {tier}",
+            'description': f"Awarded for being a {adjective.lower()} {noun.lower()}.",
+            'category': rng.choices(BADGE_CATEGORIES, BADGE_CATEGORY_WEIGHTS)[0],
+            'how_to_achieve': "Nominated by a team lead or manager.",
+            'eligible_roles': json.dumps(sorted(roles)),
+            'expected_time_days': rng.choice([7, 14, 30, 60, 90]),
+            'validity': rng.choice(VALIDITIES),
+            'badge_type': 'objective' if rng.random() < 0.2 else 'work',
+        })
+    return badges
+
+def generate_sprints(rng, teams, start, end):
+    """Two-week sprints per team from start until a month past end."""
+    sprints = []
+    for team in teams:
+        # Stagger team calendars so sprints do not all start on the same day
+        sprint_start = start + timedelta(days=rng.randrange(SPRINT_DAYS))
+        number = 1
+        while sprint_start <= end + timedelta(days=28):
+            sprint_end = sprint_start + timedelta(days=SPRINT_DAYS - 1)
+            if sprint_end < end:
+                status = 'completed'
+            elif sprint_start <= end:
+                status = 'active'
+            else:
+                status = 'upcoming'
+            sprints.append({
+                'id': f"sprint_{team['id'][5:]}_{number:04d}",
+                'name': f"{team['name']} Sprint {number}",
+                'description': "",
+                'start_date': sprint_start,
+                'end_date': sprint_end,
+                'team_id': team['id'],
+                'goals': rng.sample(SPRINT_GOALS, rng.randint(1, 3)),
+                'status': status,
+            })
+            sprint_start = sprint_end + timedelta(days=1)
+            number += 1
+    return sprints
+
+def generate_awards(rng, users, badges, sprints, count, start, end):
+    """
+    Yield award rows. Recipients and badges follow Zipf popularity, dates lean
+    towards recent history (usage grows over time) and each award is linked
+    to the recipient team's sprint covering its date.
+    """
+    recipients = [u for u in users if u['role'] not in ('Manager',)]
+    rng.shuffle(recipients)
+    recipient_weights = zipf_cum_weights(len(recipients), AWARD_SKEW)
+
+    badges_by_role = {}
+    for role in ELIGIBLE_ROLES:
+        eligible = [b for b in badges if role in json.loads(b['eligible_roles'])] or badges
+        rng.shuffle(eligible)
+        badges_by_role[role] = (eligible, zipf_cum_weights(len(eligible), AWARD_SKEW))
+
+    leads = {u['team_id']: u['id'] for u in users if u['role'] == 'TL'}
+    managers = [u['id'] for u in users if u['role'] == 'Manager']
+    sprints_by_team = {}
+    for sprint in sprints:
+        sprints_by_team.setdefault(sprint['team_id'], []).append(sprint)
+    sprint_starts = {team_id: [s['start_date'] for s in items] for team_id, items in sprints_by_team.items()}
+
+    span_days = (end - start).days
+    for i in range(count):
+        recipient = rng.choices(recipients, cum_weights=recipient_weights)[0]
+        eligible, badge_weights = badges_by_role.get(recipient['role'], badges_by_role['Dev'])
+        badge = rng.choices(eligible, cum_weights=badge_weights)[0]
+        awarded_at = start + timedelta(days=int(span_days * rng.random() ** 0.6))
+
+        team_id = recipient['team_id']
+        sprint_id = None
+        index = bisect_right(sprint_starts.get(team_id, []), awarded_at) - 1
+        if index >= 0:
+            sprint = sprints_by_team[team_id][index]
+            if sprint['end_date'] >= awarded_at:
+                sprint_id = sprint['id']
+
+        if rng.random() < 0.8 and leads.get(team_id) not in (None, recipient['id']):
+            awarded_by = leads[team_id]
+        else:
+            awarded_by = rng.choice(managers)
+        yield {
+            'id': f"award_{i:08d}",
+            'user_id': recipient['id'],
+            'badge_id': badge['id'],
+            'awarded_at': awarded_at,
+            'awarded_by': awarded_by,
+            'reason': rng.choice(REASONS),
+            'sprint_id': sprint_id,
+            'recent': (end - awarded_at).days <= 30,
+        }
+
+def generate(teams=20, users=1000, badges=150, awards=50000, years=2, seed=42,
+             end_date=None, batch_size=5000, reset=False, log=print):
+    """Generate an organisation into the configured database. Returns row counts."""
+    from database import engine, Session, VERSIONED_TABLES
+    from db_base import Base
+    from crud.db_manager import DatabaseManager
+    from crud.data_versions import seed_versions
+    from models.team import Team
+    from models.user import User
+    from models.badge import Badge
+    from models.sprint import Sprint
+    from models.badge_award import BadgeAward
+
+    if reset:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        with Session.begin() as session:
+            seed_versions(session, VERSIONED_TABLES)
+
+    rng = random.Random(seed)
+    end = end_date or date.today()
+    start = end - timedelta(days=365 * years)
+
+    team_rows = generate_teams(rng, teams)
+    user_rows = generate_users(rng, team_rows, max(users, teams + 1))
+    badge_rows = generate_badges(rng, badges)
+    sprint_rows = generate_sprints(rng, team_rows, start, end)
+    award_rows = generate_awards(rng, user_rows, badge_rows, sprint_rows, awards, start, end)
+
+    counts = {}
+    for model, rows in ((Team, team_rows), (User, user_rows), (Badge, badge_rows),
+                        (Sprint, sprint_rows), (BadgeAward, award_rows)):
+        started = time.perf_counter()
+        counts[model.__tablename__] = DatabaseManager.bulk_insert(model, rows, batch_size=batch_size)
+        log(f"{model.__tablename__}: {counts[model.__tablename__]} rows in {time.perf_counter() - started:.1f}s")
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--database-url', help="Target database (defaults to DATABASE_URL)")
+    parser.add_argument('--teams', type=int, default=20)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--badges', type=int, default=150)
+    parser.add_argument('--awards', type=int, default=50000)
+    parser.add_argument('--years', type=int, default=2, help="Length of the award and sprint history")
+    parser.add_argument('--end-date', type=lambda v: datetime.strptime(v, "%Y-%m-%d").date(),
+                        help="Last day of history, YYYY-MM-DD (defaults to today)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--reset', action='store_true', help="Drop and recreate all tables first")
+    args = parser.parse_args(argv)
+
+    # database.py binds the engine at import time
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+
+    counts = generate(teams=args.teams, users=args.users, badges=args.badges, awards=args.awards,
+                      years=args.years, seed=args.seed, end_date=args.end_date,
+                      batch_size=args.batch_size, reset=args.reset)
+    print(json.dumps(counts))
+
+if __name__ == '__main__':
+    sys.exit(main())
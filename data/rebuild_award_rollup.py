@@ -0,0 +1,32 @@
+# data/rebuild_award_rollup.py
+"""
+Recompute the daily award rollup and recipient sketches from badge_awards
+and badge_awards_archive.
+
+Usage:
+    python -m data.rebuild_award_rollup --database-url sqlite:///scale.db
+"""
+import argparse
+import json
+import os
+import sys
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--database-url', help="Target database (defaults to DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    # database.py binds the engine at import time
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    from database import Session
+    from crud.award_rollup import rebuild_rollup
+    from crud.recipient_sketches import rebuild_sketches
+
+    with Session.begin() as session:
+        total = rebuild_rollup(session)
+        sketches = rebuild_sketches(session)
+    print(json.dumps({'awards': total, 'sketches': sketches}))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,7 @@
 # database.py
 import os
-import pyodbc  # Ensure pyodbc is imported if using raw DB connections elsewhere
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from db_base import Base  # Import Base from db_base module
 from models.team import Team
@@ -9,6 +9,17 @@ from models.user import User
 from models.badge import Badge
 from models.sprint import Sprint
 from models.badge_award import BadgeAward
+from models.badge_award_archive import BadgeAwardArchive
+from models.award_archive_summary import AwardArchiveSummary
+from models.award_daily_rollup import AwardDailyRollup
+from models.recipient_sketch import RecipientSketch
+from models.data_version import DataVersion
+from monitoring.query_stats import install_query_stats
+from monitoring.metrics import install_metrics
+from monitoring.slow_queries import install_slow_query_log
+from monitoring.tracing import install_tracing
+from monitoring.memory import install_memory_accounting
+from queries.statements import install_statement_stats
 # Database Configuration
 DATABASE_URL = os.environ.get('DATABASE_URL')
 if not DATABASE_URL:
@@ -19,15 +30,32 @@ if not DATABASE_URL:
     )
     print("Using SQL Server with Windows Authentication")
 
-ENGINE_CONFIG = {
-    "pool_pre_ping": True,
-    "connect_args": {
+# Driver-specific connect arguments, keyed by backend name
+CONNECT_ARGS = {
+    "mssql": {
         "connect_timeout": 10,
         "autocommit": False
     },
+    "postgresql": {
+        "connect_timeout": 10
+    },
+    "sqlite": {
+        "timeout": 10
+    },
+}
+
+ENGINE_CONFIG = {
+    "pool_pre_ping": True,
+    "connect_args": CONNECT_ARGS.get(make_url(DATABASE_URL).get_backend_name(), {}),
     "echo_pool": "debug" if os.getenv('DEBUG') else False
 }
 
+# Optional connection pool sizing (SQLAlchemy defaults: 5 + 10 overflow)
+if os.getenv('DB_POOL_SIZE'):
+    ENGINE_CONFIG["pool_size"] = int(os.environ['DB_POOL_SIZE'])
+if os.getenv('DB_MAX_OVERFLOW'):
+    ENGINE_CONFIG["max_overflow"] = int(os.environ['DB_MAX_OVERFLOW'])
+
 def get_engine():
     for attempt in range(3):
         try:
@@ -40,6 +68,7 @@ def get_database_connection():
     """
     Establishes a connection to the MS SQL Server and returns the connection object.
     """
+    import pyodbc  # Only needed for raw SQL Server connections
     conn = pyodbc.connect(
         "Driver={ODBC Driver 17 for SQL Server};"
         "Server=DXBSHINAZ;"
@@ -49,8 +78,62 @@ def get_database_connection():
     return conn
 
 engine = get_engine()
+install_query_stats(engine)
+install_metrics(engine)
+install_slow_query_log(engine)
+install_tracing()
+install_memory_accounting()
+install_statement_stats(engine)
 Session = sessionmaker(bind=engine)
 
+# Async driver for each backend (crud/async_db_manager.py). Optional: needs
+# sqlalchemy[asyncio] plus the driver, and is only imported on first use.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mssql": "mssql+aioodbc",
+}
+ASYNC_CONNECT_ARGS = {
+    "postgresql": {"timeout": 10},
+    "sqlite": {"timeout": 10},
+}
+_async_engine = None
+
+def get_async_engine():
+    """
+    AsyncEngine on the same database (ASYNC_DATABASE_URL overrides the
+    derived URL), created on first use with the same pool settings as the
+    sync engine.
+    """
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = os.environ.get('ASYNC_DATABASE_URL')
+        if not url:
+            sync_url = make_url(DATABASE_URL)
+            url = sync_url.set(drivername=ASYNC_DRIVERS[sync_url.get_backend_name()])
+        config = dict(ENGINE_CONFIG, connect_args=ASYNC_CONNECT_ARGS.get(make_url(url).get_backend_name(), {}))
+        async_engine = create_async_engine(url, **config)
+        # Statement listeners feed per-rerun stats, metrics and the slow-query log
+        install_query_stats(async_engine.sync_engine)
+        install_statement_stats(async_engine.sync_engine)
+        _async_engine = async_engine
+    return _async_engine
+
+# Tables whose writes bump a row in data_versions
+VERSIONED_TABLES = [
+    Team.__tablename__,
+    User.__tablename__,
+    Badge.__tablename__,
+    Sprint.__tablename__,
+    BadgeAward.__tablename__,
+    BadgeAwardArchive.__tablename__,
+    AwardArchiveSummary.__tablename__,
+    AwardDailyRollup.__tablename__,
+    RecipientSketch.__tablename__,
+]
+
 # Initialization
 def initialize_database():
     try:
@@ -58,5 +141,25 @@ def initialize_database():
         print("Database schema initialized")
     except Exception as e:
         print(f"Failed to create tables: {e}")
+    try:
+        from crud.data_versions import seed_versions
+        with Session.begin() as session:
+            seed_versions(session, VERSIONED_TABLES)
+    except Exception as e:
+        print(f"Failed to seed data versions: {e}")
+    try:
+        from crud import award_rollup
+        with Session.begin() as session:
+            if award_rollup.needs_rebuild(session):
+                print(f"Built award rollup from {award_rollup.rebuild_rollup(session)} awards")
+    except Exception as e:
+        print(f"Failed to build award rollup: {e}")
+    try:
+        from crud import recipient_sketches
+        with Session.begin() as session:
+            if recipient_sketches.needs_rebuild(session):
+                print(f"Built {recipient_sketches.rebuild_sketches(session)} recipient sketches")
+    except Exception as e:
+        print(f"Failed to build recipient sketches: {e}")
 
 initialize_database()
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Date, Integer, ForeignKey
+from db_base import Base
+
+class AwardArchiveSummary(Base):
+    """Archived award counts per user and month, kept up to date by crud.archive."""
+    __tablename__ = 'award_archive_summary'
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(String(36), ForeignKey('users.id'), primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    award_count = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'month': self.month.isoformat() if self.month else None,
+            'award_count': self.award_count
+        }
+
+    def __repr__(self):
+        return f"<AwardArchiveSummary(user_id='{self.user_id}', month='{self.month}')>"
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Date, Integer
+from db_base import Base
+
+class AwardDailyRollup(Base):
+    """
+    Badge award counts per day, team, user, badge category and badge type,
+    over both the hot and archived awards. Maintained by crud.award_rollup.
+    Missing teams, categories and types are stored as '' (key columns
+    cannot be NULL).
+    """
+    __tablename__ = 'award_daily_rollup'
+    __table_args__ = {'extend_existing': True}
+
+    day = Column(Date, primary_key=True)
+    team_id = Column(String(36), primary_key=True, default='')
+    user_id = Column(String(36), primary_key=True)
+    category = Column(String(50), primary_key=True, default='')
+    badge_type = Column(String(50), primary_key=True, default='')
+    award_count = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'team_id': self.team_id,
+            'user_id': self.user_id,
+            'category': self.category,
+            'badge_type': self.badge_type,
+            'award_count': self.award_count
+        }
+
+    def __repr__(self):
+        return f"<AwardDailyRollup(day='{self.day}', user_id='{self.user_id}', count={self.award_count})>"
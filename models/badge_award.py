@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from sqlalchemy import Column, String, Date, ForeignKey, Text, Boolean
 from sqlalchemy.orm import relationship
-from database import Base
+from db_base import Base
 
 class BadgeAward(Base):
     __tablename__ = 'badge_awards'
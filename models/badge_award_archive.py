@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Date, ForeignKey, Text, Boolean
+from db_base import Base
+
+class BadgeAwardArchive(Base):
+    """
+    Badge awards older than the archive horizon, moved out of badge_awards
+    by crud.archive. Same columns as BadgeAward, so rows read the same way.
+    """
+    __tablename__ = 'badge_awards_archive'
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(String(36), primary_key=True)
+    user_id = Column(String(36), ForeignKey('users.id'), nullable=False, index=True)
+    badge_id = Column(String(36), ForeignKey('badges.id'), nullable=False)
+    awarded_at = Column(Date, index=True)
+    awarded_by = Column(String(36), ForeignKey('users.id'))
+    reason = Column(Text)
+    sprint_id = Column(String(36), ForeignKey('sprints.id'))
+    recent = Column(Boolean, default=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'badge_id': self.badge_id,
+            'awarded_by': self.awarded_by,
+            'awarded_at': self.awarded_at.isoformat() if self.awarded_at else None,
+            'reason': self.reason,
+            'sprint_id': self.sprint_id,
+            'recent': self.recent
+        }
+
+    def __repr__(self):
+        return f"<BadgeAwardArchive(user_id='{self.user_id}', badge_id='{self.badge_id}')>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer
+from db_base import Base
+
+class DataVersion(Base):
+    """
+    Monotonic change counter per table.
+    Bumped in the same transaction as every write through DatabaseManager,
+    so caches can tell whether a collection changed without re-reading it.
+    """
+    __tablename__ = 'data_versions'
+    __table_args__ = {'extend_existing': True}
+
+    entity = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'entity': self.entity,
+            'version': self.version
+        }
+
+    def __repr__(self):
+        return f"<DataVersion(entity='{self.entity}', version={self.version})>"
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Date, LargeBinary
+from db_base import Base
+
+class RecipientSketch(Base):
+    """
+    HyperLogLog registers over the recipients of the awards given on one
+    day, to members of one team, in one sprint. Sketches merge across any
+    range of these keys. Maintained by crud.recipient_sketches; missing
+    teams and sprints are stored as ''.
+    """
+    __tablename__ = 'recipient_sketches'
+    __table_args__ = {'extend_existing': True}
+
+    day = Column(Date, primary_key=True)
+    team_id = Column(String(36), primary_key=True, default='')
+    sprint_id = Column(String(36), primary_key=True, default='')
+    registers = Column(LargeBinary, nullable=False)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'team_id': self.team_id,
+            'sprint_id': self.sprint_id,
+            'registers': self.registers
+        }
+
+    def __repr__(self):
+        return f"<RecipientSketch(day='{self.day}', team_id='{self.team_id}', sprint_id='{self.sprint_id}')>"
@@ -0,0 +1,51 @@
+# monitoring/debug_panel.py
+"""Sidebar panel with timing details, enabled with PERF_DEBUG_PANEL=1."""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from monitoring.timing import get_section_stats
+from monitoring.query_stats import N_PLUS_ONE_THRESHOLD
+from queries.statements import get_statement_stats
+
+PANEL_ENABLED = os.environ.get('PERF_DEBUG_PANEL', '').lower() in ('1', 'true', 'yes')
+PANEL_ROWS = 10
+
+def render_debug_panel(rerun):
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        st.write(f"**{rerun.page}** rendered in **{rerun.elapsed_ms:.0f} ms**")
+
+        st.caption("Slowest sections in this rerun")
+        slowest = rerun.slowest(PANEL_ROWS)
+        if slowest:
+            st.dataframe(pd.DataFrame([
+                {'Section': t['name'], 'ms': round(t['elapsed_ms'], 1)} for t in slowest
+            ]), use_container_width=True, hide_index=True)
+
+        st.caption("Slowest sections across all sessions (rolling)")
+        stats = get_section_stats()[:PANEL_ROWS]
+        if stats:
+            st.dataframe(pd.DataFrame(stats), use_container_width=True, hide_index=True)
+
+        queries = rerun.extras.get('queries')
+        if queries is not None:
+            summary = queries.summary()
+            st.caption(f"Queries in this rerun: {summary['statements']} statements, "
+                       f"{summary['distinct']} distinct, {summary['total_ms']:.0f} ms")
+            for entry in queries.flagged():
+                st.warning(f"Possible N+1: executed {entry['count']} times "
+                           f"(> {N_PLUS_ONE_THRESHOLD}): {entry['shape'][:200]}")
+            st.dataframe(pd.DataFrame([
+                {'Statement': e['shape'], 'Count': e['count'], 'Total ms': round(e['total_ms'], 1)}
+                for e in queries.top(PANEL_ROWS)
+            ]), use_container_width=True, hide_index=True)
+
+        statement_stats = get_statement_stats()
+        if statement_stats:
+            st.caption("Registered statements (compiled cache, all sessions)")
+            st.dataframe(pd.DataFrame([
+                {'Statement': name, 'Executions': s['executions'],
+                 'Hits': s['compiled_hits'], 'Misses': s['compiled_misses']}
+                for name, s in statement_stats.items()
+            ]), use_container_width=True, hide_index=True)
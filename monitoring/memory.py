@@ -0,0 +1,180 @@
+# monitoring/memory.py
+"""
+Memory accounting per session and per st.session_state key.
+
+With MEMORY_ACCOUNTING=1 every session's state is measured at the end of
+a rerun (at most once per MEMORY_SAMPLE_SECONDS) by walking each key's
+object graph. Results are kept per session in process memory and summed
+across sessions. tracemalloc snapshots can be taken on demand.
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from monitoring.timing import add_rerun_listener
+
+MEMORY_ACCOUNTING = os.environ.get('MEMORY_ACCOUNTING', '').lower() in ('1', 'true', 'yes')
+MEMORY_SAMPLE_SECONDS = int(os.environ.get('MEMORY_SAMPLE_SECONDS', '60'))
+# Sessions without a rerun for this long are dropped from the totals
+MEMORY_SESSION_TTL_SECONDS = int(os.environ.get('MEMORY_SESSION_TTL_SECONDS', '1800'))
+TRACEMALLOC_FRAMES = int(os.environ.get('TRACEMALLOC_FRAMES', '10'))
+
+_lock = threading.Lock()
+_sessions = {}
+_last_snapshot = None
+
+def deep_size(obj, seen=None):
+    """Approximate bytes held by obj and everything it references."""
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        # DataFrames know their own footprint better than their attributes do
+        if hasattr(item, 'memory_usage') and hasattr(item, 'columns'):
+            try:
+                size += int(item.memory_usage(index=True, deep=True).sum())
+                continue
+            except Exception:
+                pass
+        size += sys.getsizeof(item, 0)
+        if isinstance(item, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__') and not isinstance(item, type):
+            stack.append(vars(item))
+    return size
+
+def measure_session_state(state=None):
+    """{key: bytes} for every key of a session state (the current one by default)."""
+    state = st.session_state if state is None else state
+    # Objects shared between keys (badges and badges_dict) count once, on the first key
+    seen = set()
+    return {str(key): deep_size(state[key], seen) for key in list(state.keys())}
+
+def record_session(session_id, page=None, state=None):
+    sizes = measure_session_state(state)
+    with _lock:
+        _sessions[session_id] = {
+            'session_id': session_id,
+            'page': page,
+            'keys': sizes,
+            'total': sum(sizes.values()),
+            'measured_at': time.time(),
+            'last_seen': time.time(),
+        }
+    return sizes
+
+def _sample_rerun(rerun):
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return
+    now = time.time()
+    with _lock:
+        entry = _sessions.get(ctx.session_id)
+        if entry is not None:
+            entry['last_seen'] = now
+            if now - entry['measured_at'] < MEMORY_SAMPLE_SECONDS:
+                return
+    record_session(ctx.session_id, rerun.page)
+
+def _expire_sessions():
+    cutoff = time.time() - MEMORY_SESSION_TTL_SECONDS
+    with _lock:
+        for session_id in [s for s, e in _sessions.items() if e['last_seen'] < cutoff]:
+            del _sessions[session_id]
+
+def get_session_usage():
+    """Measured sessions, largest first."""
+    _expire_sessions()
+    with _lock:
+        entries = [dict(e, keys=dict(e['keys'])) for e in _sessions.values()]
+    return sorted(entries, key=lambda e: e['total'], reverse=True)
+
+def get_key_totals():
+    """Bytes per session_state key summed across sessions, largest first."""
+    totals = {}
+    for entry in get_session_usage():
+        for key, size in entry['keys'].items():
+            item = totals.setdefault(key, {'key': key, 'sessions': 0, 'total': 0, 'max': 0})
+            item['sessions'] += 1
+            item['total'] += size
+            item['max'] = max(item['max'], size)
+    return sorted(totals.values(), key=lambda t: t['total'], reverse=True)
+
+def get_largest_consumers(limit=20):
+    """The largest (session, key) pairs across all sessions."""
+    items = [
+        {'session_id': e['session_id'], 'page': e['page'], 'key': key, 'bytes': size}
+        for e in get_session_usage() for key, size in e['keys'].items()
+    ]
+    return sorted(items, key=lambda i: i['bytes'], reverse=True)[:limit]
+
+def process_rss():
+    """Resident set size of this process in bytes, or None where unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
+
+def start_tracemalloc():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+def stop_tracemalloc():
+    global _last_snapshot
+    _last_snapshot = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def take_tracemalloc_snapshot(limit=25, group_by='lineno'):
+    """
+    Snapshot current allocations and return (top, diff): the largest
+    allocation sites and the change since the previous snapshot.
+    """
+    global _last_snapshot
+
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ])
+    top = [
+        {'location': str(stat.traceback[0]), 'size': stat.size, 'count': stat.count}
+        for stat in snapshot.statistics(group_by)[:limit]
+    ]
+    diff = []
+    if _last_snapshot is not None:
+        diff = [
+            {'location': str(stat.traceback[0]), 'size_diff': stat.size_diff, 'count_diff': stat.count_diff}
+            for stat in snapshot.compare_to(_last_snapshot, group_by)[:limit]
+        ]
+    _last_snapshot = snapshot
+    return top, diff
+
+def install_memory_accounting():
+    """Measure session state at the end of reruns when MEMORY_ACCOUNTING is on."""
+    if MEMORY_ACCOUNTING:
+        add_rerun_listener(_sample_rerun)
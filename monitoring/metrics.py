@@ -0,0 +1,302 @@
+# monitoring/metrics.py
+"""
+In-process metrics registry published in Prometheus text format.
+
+Counters, gauges and histograms live in one process-wide registry. The
+engine, rerun and cache hooks below feed them; exporters publish the
+registry either on a small HTTP endpoint (METRICS_PORT) or by rewriting a
+file for a textfile collector (METRICS_FILE).
+"""
+import atexit
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sqlalchemy import event
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from monitoring.timing import add_rerun_listener
+from monitoring.query_stats import add_statement_listener
+
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '0'))
+METRICS_HOST = os.environ.get('METRICS_HOST', '127.0.0.1')
+METRICS_FILE = os.environ.get('METRICS_FILE', '')
+METRICS_FILE_INTERVAL_SECONDS = int(os.environ.get('METRICS_FILE_INTERVAL_SECONDS', '15'))
+# A session counts as active if it reran within this window
+ACTIVE_SESSION_SECONDS = int(os.environ.get('ACTIVE_SESSION_SECONDS', '300'))
+PREFIX = 'gamification_'
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RERUN_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+STATEMENT_KINDS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """Yield (suffix, label values, extra labels, value) for exposition."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield '', key, None, value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        if self.callback is not None:
+            # Callback gauges are read at scrape time
+            try:
+                yield '', (), None, self.callback()
+            except Exception as e:
+                print(f"Gauge {self.name} callback failed: {e}")
+            return
+        yield from super().samples()
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['counts'][i] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, dict(entry, counts=list(entry['counts']))) for key, entry in self._values.items()]
+        for key, entry in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry['counts']):
+                cumulative += count
+                yield '_bucket', key, {'le': _format_value(bound)}, cumulative
+            yield '_sum', key, None, entry['sum']
+            yield '_count', key, None, entry['count']
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        name = PREFIX + name
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        return self._get_or_create(Gauge, name, documentation, labelnames, callback=callback)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """The whole registry in Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+QUERY_DURATION = REGISTRY.histogram(
+    'db_query_duration_seconds', "Database statement latency by statement kind.", ['kind'])
+POOL_CHECKOUTS = REGISTRY.counter(
+    'db_pool_checkouts_total', "Connections checked out of the pool.")
+POOL_WAIT = REGISTRY.histogram(
+    'db_pool_wait_seconds', "Time spent waiting for a pooled connection.")
+CACHE_REQUESTS = REGISTRY.counter(
+    'cache_requests_total', "Cache lookups by cache and result (hit or miss).", ['cache', 'result'])
+RERUN_DURATION = REGISTRY.histogram(
+    'rerun_duration_seconds', "Page script rerun duration by page.", ['page'], buckets=RERUN_BUCKETS)
+
+_session_lock = threading.Lock()
+_session_last_seen = {}
+
+def _active_sessions():
+    cutoff = time.time() - ACTIVE_SESSION_SECONDS
+    with _session_lock:
+        for session_id in [s for s, seen in _session_last_seen.items() if seen < cutoff]:
+            del _session_last_seen[session_id]
+        return len(_session_last_seen)
+
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    'active_sessions', f"Browser sessions with a rerun in the last {ACTIVE_SESSION_SECONDS} seconds.",
+    callback=_active_sessions)
+
+def record_cache_lookup(cache, hit):
+    """Count one lookup in the named cache."""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+def statement_kind(statement):
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ''
+    return word if word in STATEMENT_KINDS else 'OTHER'
+
+def _observe_statement(conn, statement, parameters, elapsed_ms):
+    QUERY_DURATION.observe(elapsed_ms / 1000, kind=statement_kind(statement))
+
+def _observe_rerun(rerun):
+    RERUN_DURATION.observe(rerun.elapsed_ms / 1000, page=rerun.page)
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is not None:
+        with _session_lock:
+            _session_last_seen[ctx.session_id] = time.time()
+
+def _instrument_pool(engine):
+    pool = engine.pool
+    if getattr(pool, '_metrics_instrumented', False):
+        return
+    connect = pool.connect
+
+    # Pool events fire only once a connection is handed out, so the wait is
+    # measured around Pool.connect itself
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+    pool._metrics_instrumented = True
+    event.listen(pool, 'checkout', lambda *args: POOL_CHECKOUTS.inc())
+    REGISTRY.gauge('db_pool_checked_out', "Connections currently checked out.",
+                   callback=lambda: pool.checkedout() if hasattr(pool, 'checkedout') else 0)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def write_metrics_file(path=METRICS_FILE):
+    """Atomically rewrite path with the current registry."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
+
+def _write_periodically():
+    while True:
+        time.sleep(METRICS_FILE_INTERVAL_SECONDS)
+        try:
+            write_metrics_file()
+        except Exception as e:
+            print(f"Metrics file write failed: {e}")
+
+_exporters_started = False
+
+def start_exporters():
+    """Start the configured exporters once per process."""
+    global _exporters_started
+
+    if _exporters_started:
+        return
+    _exporters_started = True
+    if METRICS_PORT:
+        try:
+            server = ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), _MetricsHandler)
+        except OSError as e:
+            print(f"Metrics endpoint not started on {METRICS_HOST}:{METRICS_PORT}: {e}")
+        else:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    if METRICS_FILE:
+        atexit.register(write_metrics_file)
+        threading.Thread(target=_write_periodically, name='metrics-file', daemon=True).start()
+
+def install_metrics(engine):
+    """Hook the registry into the engine, the pool and page reruns, then start exporters."""
+    add_statement_listener(_observe_statement)
+    add_rerun_listener(_observe_rerun)
+    _instrument_pool(engine)
+    start_exporters()
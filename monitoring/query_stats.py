@@ -0,0 +1,158 @@
+# monitoring/query_stats.py
+"""
+Statement counting and N+1 detection on the SQLAlchemy engine.
+
+Cursor-execute listeners time every statement and group it by its
+normalised SQL text. Statements run during a page rerun are collected on
+that rerun; any shape executed more than N_PLUS_ONE_THRESHOLD times in a
+single rerun is flagged in the debug panel and in the structured log.
+"""
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from monitoring.timing import current_rerun, add_rerun_listener
+
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', '10'))
+
+logger = logging.getLogger('gamification.queries')
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(os.environ.get('QUERY_LOG_LEVEL', 'WARNING').upper())
+    logger.propagate = False
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+# Not the digits of $1-style placeholders, so their IN lists still collapse
+_NUMBER_LITERAL = re.compile(r"(?<!\$)\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_collector = contextvars.ContextVar('query_collector', default=None)
+_statement_listeners = []
+
+def normalize_sql(statement):
+    """Reduce a statement to its shape: literals and IN lists become '?'."""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+class QueryStats:
+    """Statement counts and timings grouped by normalised SQL."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.shapes = {}
+        self.count = 0
+        self.total_ms = 0.0
+
+    def add(self, shape, elapsed_ms):
+        with self._lock:
+            entry = self.shapes.get(shape)
+            if entry is None:
+                entry = self.shapes[shape] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            self.count += 1
+            self.total_ms += elapsed_ms
+
+    def top(self, limit=10):
+        with self._lock:
+            items = [dict(shape=shape, **entry) for shape, entry in self.shapes.items()]
+        return sorted(items, key=lambda e: (e['count'], e['total_ms']), reverse=True)[:limit]
+
+    def flagged(self, threshold=None):
+        """Shapes executed more than threshold times (likely N+1 loops)."""
+        threshold = N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        return [entry for entry in self.top(limit=None) if entry['count'] > threshold]
+
+    def summary(self):
+        return {
+            'statements': self.count,
+            'distinct': len(self.shapes),
+            'total_ms': round(self.total_ms, 2),
+        }
+
+def rerun_query_stats(rerun):
+    """QueryStats of a rerun, created on first use."""
+    return rerun.extras.setdefault('queries', QueryStats())
+
+@contextmanager
+def collect_queries():
+    """Collect statements executed in this context (outside of page reruns too)."""
+    stats = QueryStats()
+    token = _collector.set(stats)
+    try:
+        yield stats
+    finally:
+        _collector.reset(token)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for listener in _statement_listeners:
+        try:
+            listener(conn, statement, parameters, elapsed_ms)
+        except Exception as e:
+            print(f"Statement listener {listener.__name__} failed: {e}")
+
+    rerun = current_rerun()
+    collector = _collector.get()
+    if rerun is None and collector is None:
+        return
+    shape = normalize_sql(statement)
+    if rerun is not None:
+        rerun_query_stats(rerun).add(shape, elapsed_ms)
+    if collector is not None:
+        collector.add(shape, elapsed_ms)
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_started'):
+        conn.info['query_started'].pop()
+
+def _log_rerun_queries(rerun):
+    stats = rerun.extras.get('queries')
+    if stats is None:
+        return
+    flagged = stats.flagged()
+    record = {
+        'event': 'rerun_queries',
+        'page': rerun.page,
+        'rerun_ms': round(rerun.elapsed_ms, 2),
+        **stats.summary(),
+        'flagged': [
+            {'shape': e['shape'], 'count': e['count'], 'total_ms': round(e['total_ms'], 2)}
+            for e in flagged
+        ],
+    }
+    logger.log(logging.WARNING if flagged else logging.INFO, json.dumps(record))
+
+def add_statement_listener(listener):
+    """Register listener(conn, statement, parameters, elapsed_ms), called after every statement."""
+    if listener not in _statement_listeners:
+        _statement_listeners.append(listener)
+
+def install_query_stats(engine):
+    """Attach the statement listeners to an engine (idempotent)."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+    add_rerun_listener(_log_rerun_queries)
@@ -0,0 +1,137 @@
+# monitoring/slow_queries.py
+"""
+Slow-query log.
+
+Every statement slower than SLOW_QUERY_MS is written as one JSON line to a
+rotating file, with its parameters, elapsed time and the page and section
+that ran it. With SLOW_QUERY_EXPLAIN=1 the backend's plan is captured too:
+EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL and the XML showplan
+on SQL Server.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from monitoring.timing import current_rerun
+from monitoring.query_stats import add_statement_listener, normalize_sql
+
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '500'))
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', os.path.join('.cache', 'slow_queries.jsonl'))
+SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get('SLOW_QUERY_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.environ.get('SLOW_QUERY_LOG_BACKUPS', '5'))
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', '').lower() in ('1', 'true', 'yes')
+# Each statement shape is explained at most once per interval
+EXPLAIN_INTERVAL_SECONDS = int(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS', '300'))
+MAX_PARAMETER_LENGTH = 200
+MAX_PARAMETERS = 50
+
+logger = logging.getLogger('gamification.slow_queries')
+logger.propagate = False
+
+_lock = threading.Lock()
+_last_explained = {}
+_engine = None
+
+def _get_logger():
+    # The file is only created once the first slow statement shows up
+    if not logger.handlers:
+        with _lock:
+            if not logger.handlers:
+                os.makedirs(os.path.dirname(SLOW_QUERY_LOG) or '.', exist_ok=True)
+                handler = RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+                                              backupCount=SLOW_QUERY_LOG_BACKUPS, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                logger.addHandler(handler)
+                logger.setLevel(logging.INFO)
+    return logger
+
+def _loggable(value):
+    if isinstance(value, (list, tuple)):
+        return [_loggable(v) for v in value[:MAX_PARAMETERS]]
+    if isinstance(value, dict):
+        return {str(k): _loggable(v) for k, v in list(value.items())[:MAX_PARAMETERS]}
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    return text if len(text) <= MAX_PARAMETER_LENGTH else text[:MAX_PARAMETER_LENGTH] + '…'
+
+def _should_explain(shape):
+    now = time.time()
+    with _lock:
+        last = _last_explained.get(shape)
+        if last is not None and now - last < EXPLAIN_INTERVAL_SECONDS:
+            return False
+        _last_explained[shape] = now
+        return True
+
+def explain(conn, statement, parameters):
+    """
+    Return the backend's plan for statement as text (or rows for SQLite).
+    Runs on raw DBAPI cursors so it does not re-enter the engine listeners.
+    """
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+            return [' '.join(str(col) for col in row[1:]) if len(row) > 1 else str(row[0])
+                    for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    if dialect == 'postgresql':
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    if dialect == 'mssql':
+        # SHOWPLAN must be alone in its batch, and the statement's own
+        # connection may still hold unread results, so use a separate one
+        raw = _engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SET SHOWPLAN_XML ON")
+            try:
+                cursor.execute(statement, parameters or ())
+                return cursor.fetchone()[0]
+            finally:
+                cursor.execute("SET SHOWPLAN_XML OFF")
+                cursor.close()
+        finally:
+            raw.close()
+    return None
+
+def _log_slow_statement(conn, statement, parameters, elapsed_ms):
+    if SLOW_QUERY_MS <= 0 or elapsed_ms < SLOW_QUERY_MS or not SLOW_QUERY_LOG:
+        return
+    rerun = current_rerun()
+    executemany = isinstance(parameters, list)
+    entry = {
+        'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'elapsed_ms': round(elapsed_ms, 2),
+        'page': rerun.page if rerun else None,
+        'section': rerun.current_section if rerun else None,
+        'thread': threading.current_thread().name,
+        'dialect': conn.dialect.name,
+        'statement': statement,
+        'parameters': _loggable(parameters[:MAX_PARAMETERS] if executemany else parameters),
+        'executemany': executemany,
+    }
+    # Plans of batched statements would describe a single row only
+    if SLOW_QUERY_EXPLAIN and not executemany and _should_explain(normalize_sql(statement)):
+        try:
+            entry['plan'] = explain(conn, statement, parameters)
+        except Exception as e:
+            entry['plan_error'] = str(e)
+    _get_logger().info(json.dumps(entry, default=str))
+
+def install_slow_query_log(engine):
+    """Log statements above SLOW_QUERY_MS from this engine (idempotent)."""
+    global _engine
+    _engine = engine
+    add_statement_listener(_log_slow_statement)
@@ -0,0 +1,254 @@
+# monitoring/timing.py
+"""
+Lightweight timing for page sections, helpers and database calls.
+
+Pages mark their lifecycle with begin_page()/section()/end_page(), and
+call stop_page() instead of st.stop() so early exits are recorded too. Helpers
+are wrapped with @timed_function(). Every measurement feeds a rolling
+window per section name kept in process memory (shared by all sessions)
+and, when recorded inside a page run, the list of timings of that rerun.
+"""
+import contextvars
+import functools
+import inspect
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+ROLLING_WINDOW = int(os.environ.get('PERF_ROLLING_WINDOW', '500'))
+
+_samples_lock = threading.Lock()
+_section_samples = {}
+_rerun_listeners = []
+_current_rerun = contextvars.ContextVar('current_rerun', default=None)
+# Reruns begun but not yet ended, by session (see begin_page)
+_open_lock = threading.Lock()
+_open_reruns = {}
+
+class Rerun:
+    """Timings collected during one script run of a page."""
+
+    def __init__(self, page):
+        self.page = page
+        self.thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        self.elapsed_ms = None
+        self.timings = []
+        self.extras = {}
+        self.owner = None
+        self._section = None
+
+    def add(self, name, started, elapsed_ms):
+        self.timings.append({
+            'name': name,
+            'started': started,
+            'elapsed_ms': elapsed_ms,
+            'thread_id': threading.get_ident(),
+            'thread_name': threading.current_thread().name,
+        })
+
+    @property
+    def current_section(self):
+        """Name of the section currently running, if any."""
+        return self._section[0] if self._section else None
+
+    def slowest(self, limit=10):
+        return sorted(self.timings, key=lambda t: t['elapsed_ms'], reverse=True)[:limit]
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def record(name, elapsed_ms, started=None):
+    """Add one measurement to the process-wide stats and the current rerun."""
+    with _samples_lock:
+        samples = _section_samples.get(name)
+        if samples is None:
+            samples = _section_samples[name] = deque(maxlen=ROLLING_WINDOW)
+        samples.append(elapsed_ms)
+    rerun = _current_rerun.get()
+    if rerun is not None:
+        rerun.add(name, started if started is not None else time.perf_counter() - elapsed_ms / 1000, elapsed_ms)
+
+@contextmanager
+def timed(name):
+    """Time the enclosed block under the given section name."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - started) * 1000, started)
+
+def timed_function(name=None):
+    """Decorator timing every call of the wrapped function."""
+    def decorator(fn):
+        label = name or (fn.__qualname__ if '.' in fn.__qualname__
+                         else f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}")
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    record(label, (time.perf_counter() - started) * 1000, started)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, (time.perf_counter() - started) * 1000, started)
+        return wrapper
+    return decorator
+
+def current_rerun():
+    """The Rerun being recorded in this context, or None outside a page run."""
+    return _current_rerun.get()
+
+def _script_run_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    return get_script_run_ctx(suppress_warning=True)
+
+def _run_owner():
+    """The Streamlit session running this script, or the thread outside Streamlit."""
+    ctx = _script_run_ctx()
+    return ctx.session_id if ctx is not None else threading.get_ident()
+
+def _finish_open(owner):
+    """Finish owner's open rerun, if any, at its last recorded activity."""
+    with _open_lock:
+        unfinished = _open_reruns.pop(owner, None)
+    if unfinished is not None:
+        _finish(unfinished, last_activity(unfinished))
+
+def _hook_script_errors(owner):
+    """
+    Finish owner's open rerun from Streamlit's script error handler, so a
+    page that raises releases what its listeners hold (e.g. the rerun's
+    database session) right away. Any handler already set still runs.
+    """
+    ctx = _script_run_ctx()
+    if ctx is None or getattr(ctx.on_script_error, 'finishes_reruns', False):
+        return
+    previous = ctx.on_script_error
+
+    def on_script_error(exception):
+        _finish_open(owner)
+        return previous(exception) if previous else None
+
+    on_script_error.finishes_reruns = True
+    ctx.on_script_error = on_script_error
+
+def begin_page(page):
+    """
+    Start timing a page run. Call once near the top of every page script.
+    A run that raises is finished from the script error handler; a previous
+    run of the same session that still never reached end_page() is finished
+    first, so it is recorded and its listeners run.
+    """
+    owner = _run_owner()
+    _finish_open(owner)
+    _hook_script_errors(owner)
+
+    rerun = Rerun(page)
+    rerun.owner = owner
+    with _open_lock:
+        _open_reruns[owner] = rerun
+    _current_rerun.set(rerun)
+    return rerun
+
+def last_activity(rerun):
+    """perf_counter() of the last thing recorded in a rerun."""
+    ends = [t['started'] + t['elapsed_ms'] / 1000 for t in rerun.timings]
+    if rerun._section:
+        ends.append(rerun._section[1])
+    return max(ends, default=rerun.started)
+
+def _close_section(rerun):
+    if rerun._section:
+        name, started = rerun._section
+        record(f"{rerun.page} › {name}", (time.perf_counter() - started) * 1000, started)
+        rerun._section = None
+
+def section(name):
+    """
+    Mark the start of a page section; the previous section ends here.
+    Sections are laps, so long page scripts need no re-indentation.
+    """
+    rerun = _current_rerun.get()
+    if rerun is None:
+        return
+    _close_section(rerun)
+    rerun._section = (name, time.perf_counter())
+
+def _finish(rerun, ended=None):
+    _close_section(rerun)
+    rerun.elapsed_ms = ((ended or time.perf_counter()) - rerun.started) * 1000
+    record(f"{rerun.page} (total)", rerun.elapsed_ms, rerun.started)
+    if _current_rerun.get() is rerun:
+        _current_rerun.set(None)
+
+    for listener in list(_rerun_listeners):
+        try:
+            listener(rerun)
+        except Exception as e:
+            print(f"Rerun listener {listener.__name__} failed: {e}")
+
+def end_page():
+    """Finish the current page run, notify listeners and show the debug panel."""
+    rerun = _current_rerun.get()
+    if rerun is None:
+        return None
+    with _open_lock:
+        if _open_reruns.get(rerun.owner) is rerun:
+            del _open_reruns[rerun.owner]
+    _finish(rerun)
+
+    from monitoring.debug_panel import PANEL_ENABLED, render_debug_panel
+    if PANEL_ENABLED:
+        render_debug_panel(rerun)
+    return rerun
+
+def stop_page():
+    """end_page() then st.stop(): use instead of st.stop() once begin_page() has run."""
+    import streamlit as st
+
+    end_page()
+    st.stop()
+
+def add_rerun_listener(listener):
+    """Register listener(rerun), called at the end of every page run."""
+    if listener not in _rerun_listeners:
+        _rerun_listeners.append(listener)
+
+def get_section_stats():
+    """Rolling statistics per section, slowest p95 first."""
+    with _samples_lock:
+        snapshot = {name: sorted(samples) for name, samples in _section_samples.items()}
+    stats = []
+    for name, values in snapshot.items():
+        stats.append({
+            'section': name,
+            'count': len(values),
+            'p50_ms': round(_percentile(values, 50), 2),
+            'p95_ms': round(_percentile(values, 95), 2),
+            'p99_ms': round(_percentile(values, 99), 2),
+            'max_ms': round(values[-1], 2) if values else 0.0,
+        })
+    return sorted(stats, key=lambda s: s['p95_ms'], reverse=True)
+
+def reset_stats():
+    with _samples_lock:
+        _section_samples.clear()
@@ -0,0 +1,129 @@
+# monitoring/tracing.py
+"""
+Per-rerun traces in Chrome trace-event format.
+
+Every span timed during a rerun (page sections, utils helpers,
+GamificationQueries and DatabaseManager calls) plus each SQL statement is
+written as a complete ("X") event. Nesting comes from the timestamps, so
+chrome://tracing or ui.perfetto.dev shows the whole call tree per thread.
+Enabled by setting TRACE_DIR.
+"""
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from monitoring.timing import current_rerun, add_rerun_listener
+from monitoring.query_stats import add_statement_listener, normalize_sql
+
+TRACE_DIR = os.environ.get('TRACE_DIR', '')
+# Only reruns at least this slow are written
+TRACE_MIN_MS = float(os.environ.get('TRACE_MIN_MS', '0'))
+# Oldest trace files beyond this count are removed
+TRACE_MAX_FILES = int(os.environ.get('TRACE_MAX_FILES', '200'))
+MAX_STATEMENT_LENGTH = 500
+STATEMENT_NAME_LENGTH = 80
+
+_prune_lock = threading.Lock()
+
+def _category(name):
+    if name.endswith(' (total)'):
+        return 'page'
+    if ' › ' in name:
+        return 'section'
+    if name.startswith(('DatabaseManager.', 'GamificationQueries.')):
+        return 'database'
+    return 'helper'
+
+def _record_statement(conn, statement, parameters, elapsed_ms):
+    rerun = current_rerun()
+    if rerun is None:
+        return
+    rerun.extras.setdefault('statements', []).append({
+        'statement': statement,
+        'started': time.perf_counter() - elapsed_ms / 1000,
+        'elapsed_ms': elapsed_ms,
+        'thread_id': threading.get_ident(),
+        'thread_name': threading.current_thread().name,
+    })
+
+def build_trace(rerun):
+    """The rerun as a Chrome trace-event document."""
+    pid = os.getpid()
+    origin = rerun.started
+
+    def complete(name, category, started, elapsed_ms, thread_id, args=None):
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((started - origin) * 1_000_000, 1),
+            'dur': round(elapsed_ms * 1000, 1),
+            'pid': pid,
+            'tid': thread_id,
+        }
+        if args:
+            event['args'] = args
+        return event
+
+    events, threads = [], {}
+    for timing in rerun.timings:
+        threads[timing['thread_id']] = timing.get('thread_name')
+        events.append(complete(timing['name'], _category(timing['name']), timing['started'],
+                               timing['elapsed_ms'], timing['thread_id']))
+    for stmt in rerun.extras.get('statements', []):
+        threads[stmt['thread_id']] = stmt['thread_name']
+        text = stmt['statement']
+        events.append(complete(normalize_sql(text)[:STATEMENT_NAME_LENGTH] or 'SQL', 'sql',
+                               stmt['started'], stmt['elapsed_ms'], stmt['thread_id'],
+                               {'statement': text[:MAX_STATEMENT_LENGTH]}))
+
+    # Parents first when spans start together, so viewers nest them correctly
+    events.sort(key=lambda e: (e['ts'], -e['dur']))
+    metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': f"streamlit ({rerun.page})"}}]
+    metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name or str(tid)}}
+                 for tid, name in threads.items()]
+    return {
+        'traceEvents': metadata + events,
+        'displayTimeUnit': 'ms',
+        'otherData': {'page': rerun.page, 'elapsed_ms': round(rerun.elapsed_ms, 2)},
+    }
+
+def _prune(directory):
+    with _prune_lock:
+        files = sorted(
+            (entry for entry in os.scandir(directory) if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in files[:max(0, len(files) - TRACE_MAX_FILES)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+def write_trace(rerun, directory=TRACE_DIR):
+    """Write the rerun's trace file and return its path."""
+    os.makedirs(directory, exist_ok=True)
+    page = re.sub(r'[^A-Za-z0-9]+', '-', rerun.page).strip('-') or 'page'
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    path = os.path.join(directory, f"{stamp}-{page}-{rerun.elapsed_ms:.0f}ms.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(build_trace(rerun), f)
+    os.replace(tmp_path, path)
+    if TRACE_MAX_FILES > 0:
+        _prune(directory)
+    return path
+
+def _write_rerun_trace(rerun):
+    if rerun.elapsed_ms >= TRACE_MIN_MS:
+        rerun.extras['trace_path'] = write_trace(rerun)
+
+def install_tracing():
+    """Record statements and write a trace per rerun when TRACE_DIR is set."""
+    if not TRACE_DIR:
+        return
+    add_statement_listener(_record_statement)
+    add_rerun_listener(_write_rerun_trace)
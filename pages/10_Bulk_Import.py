@@ -0,0 +1,87 @@
+import os
+import streamlit as st
+import pandas as pd
+from auth import is_authenticated, user_has_access
+from session_initializer import refresh_session_data
+from monitoring.timing import begin_page, section, end_page, stop_page
+from data import bulk_import
+
+# Page config
+st.set_page_config(page_title="Bulk Import - IT Team Gamification", page_icon="🏆", layout="wide")
+begin_page("Bulk Import")
+refresh_session_data()
+
+# Authentication check
+if not is_authenticated():
+    st.warning("Please log in to access this page.")
+    stop_page()
+
+if not user_has_access('bulk_import'):
+    st.error("You do not have permission to view this page.")
+    stop_page()
+
+st.title("📥 Bulk Import")
+st.write("Load users, teams, badges, sprints or historical badge awards from CSV or JSONL files.")
+
+section("Upload")
+entity = st.selectbox("Import", list(bulk_import.ENTITIES),
+                      format_func=lambda e: e.capitalize())
+st.caption({
+    'teams': "Columns: id, name, description, department",
+    'users': "Columns: id, name, username, password (plain text, stored hashed), email, role, team_id, is_lead",
+    'badges': "Columns: id, name, description, category, how_to_achieve, eligible_roles "
+              "(JSON list or Dev;QA), expected_time_days, validity, badge_type",
+    'sprints': "Columns: id, name, start_date, end_date (YYYY-MM-DD), team_id, description, goals, status",
+    'awards': "Columns: id, user_id, badge_id, awarded_by, awarded_at (YYYY-MM-DD), reason, sprint_id",
+}[entity])
+uploaded = st.file_uploader("File", type=['csv', 'jsonl', 'ndjson', 'json'])
+col1, col2 = st.columns(2)
+with col1:
+    chunk_size = st.number_input("Rows per transaction", min_value=100, max_value=50000,
+                                 value=bulk_import.DEFAULT_CHUNK_SIZE, step=500)
+with col2:
+    restart = st.checkbox("Start over (ignore a previous partial import of this file)")
+
+if uploaded is not None:
+    checkpoint_path, _ = bulk_import.default_paths(f"{entity}-{uploaded.name}-{uploaded.size}")
+    checkpoint = bulk_import.load_checkpoint(checkpoint_path)
+    if checkpoint and not restart:
+        if checkpoint['complete']:
+            st.info(f"This file was already imported: {checkpoint['inserted']} inserted, "
+                    f"{checkpoint['rejected']} rejected. Tick 'Start over' to import it again.")
+        else:
+            st.info(f"A previous import stopped after {checkpoint['records_done']} records; "
+                    "it will resume from there.")
+
+    if st.button("Import", type="primary"):
+        section("Import")
+        status = st.empty()
+
+        def show_progress(summary):
+            status.write(f"{summary['records_done']:,} records read · {summary['inserted']:,} inserted · "
+                         f"{summary['rejected']:,} rejected")
+
+        try:
+            summary = bulk_import.import_upload(uploaded, uploaded.name, entity, chunk_size=int(chunk_size),
+                                                restart=restart, progress=show_progress)
+        except Exception as e:
+            st.error(f"Import stopped: {e}. Run it again to resume from the last completed chunk.")
+        else:
+            show_progress(summary)
+            st.session_state.last_import = summary
+            if summary['inserted']:
+                st.success(f"Imported {summary['inserted']:,} {entity}.")
+
+section("Result")
+summary = st.session_state.get('last_import')
+if summary and summary['rejected'] and os.path.exists(summary['rejected_report']):
+    st.subheader("Rejected rows")
+    rejected = pd.read_csv(summary['rejected_report'])
+    st.dataframe(rejected.head(1000), use_container_width=True, hide_index=True)
+    if len(rejected) > 1000:
+        st.caption(f"Showing the first 1,000 of {len(rejected):,} rejected rows.")
+    with open(summary['rejected_report'], 'rb') as f:
+        st.download_button("Download rejected rows", f.read(),
+                           file_name=f"rejected_{summary['entity']}.csv", mime="text/csv")
+
+end_page()
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta, date
 from auth import is_authenticated, get_current_user
 from queries.gamification_queries import GamificationQueries
 from utils import  get_user_badges, get_team_by_id, calculate_team_stats
+from session_initializer import refresh_session_data
+from monitoring.timing import begin_page, section, end_page, stop_page
 
 def calculate_next_badge_progress(user_badges):
     """
@@ -30,6 +32,8 @@ def calculate_recent_badges(user_badges):
 
 # Page config
 st.set_page_config(page_title="Dashboard - IT Team Gamification", page_icon="🏆", layout="wide")
+begin_page("Dashboard")
+refresh_session_data()
 
 # Initialize session state
 if 'authenticated' not in st.session_state:
@@ -40,10 +44,11 @@ if 'current_user' not in st.session_state:
 # Authentication check
 if not is_authenticated():
     st.warning("Please log in to access this page.")
-    st.stop()
+    stop_page()
 
 # Get current user
 user = get_current_user()
+section("Load user data")
 user_badges = get_user_badges(user['id'])
 team = get_team_by_id(user['team_id'])
 
@@ -55,6 +60,7 @@ st.write(f"Welcome back, **{user['name']}**! Here's a summary of your achievemen
 col1, col2 = st.columns([2, 1])
 
 with col1:
+    section("Badge collection")
     # Badge Summary
     st.subheader("Your Badge Collection")
     if user_badges:
@@ -79,6 +85,7 @@ with col1:
         st.info("You haven't earned any badges yet. Complete tasks to earn your first badge!")
 
 with col2:
+    section("Personal statistics")
     # Personal Stats
     st.subheader("Personal Statistics")
     badge_counts = {category: sum(1 for b in user_badges if b['category'] == category) for category in ['Technical', 'Leadership', 'Teamwork', 'Innovation', 'Other']}
@@ -92,6 +99,7 @@ with col2:
     st.progress(progress/100)
     st.write(f"{progress}% complete")
 
+section("Team performance")
 # Team Performance
 st.subheader(f"Team Performance: {team['name']}")
 team_stats = calculate_team_stats(team['id'])
@@ -103,6 +111,7 @@ with tm2: st.metric("Average Badges/Member", team_stats['avg_badges'])
 with tm3: st.metric("Badges in Last 30 Days", calculate_recent_badges(user_badges))
 with tm4: st.metric("Team Top Performer", team_stats['top_performer'])
 
+section("Team leaderboard")
 # Leaderboard
 st.subheader("Team Leaderboard")
 team_members = GamificationQueries.get_team_members(team['id'])  # Use GamificationQueries instead of DatabaseManager
@@ -126,3 +135,5 @@ if leaderboard_data:
     st.plotly_chart(fig, use_container_width=True)
 else:
     st.info("No team member data available for the leaderboard.")
+
+end_page()
@@ -5,6 +5,8 @@ from crud.db_manager import DatabaseManager
 from models.badge import Badge
 from auth import is_authenticated, get_current_user, user_has_access
 from utils import generate_unique_id
+from session_initializer import refresh_session_data
+from monitoring.timing import begin_page, section, end_page, stop_page
 
 # ---- PAGE CONFIG ----
 st.set_page_config(
@@ -12,6 +14,8 @@ st.set_page_config(
     page_icon="🏆",
     layout="wide"
 )
+begin_page("Badge Management")
+refresh_session_data()
 
 # ---- SESSION STATE INIT ----
 if 'authenticated' not in st.session_state:
@@ -28,7 +32,7 @@ if 'active_tab' not in st.session_state:
 # ---- AUTHENTICATION ----
 if not is_authenticated():
     st.warning("Please log in to access this page.")
-    st.stop()
+    stop_page()
 
 user = get_current_user()
 
@@ -47,9 +51,10 @@ if tab_selection != st.session_state.active_tab:
 
 # ---- VIEW BADGES TAB ----
 if st.session_state.active_tab == "View Badges":
+    section("View badges")
     if not user_has_access('view_badges'):
         st.warning("You don't have permission to create or edit badges.")
-        st.stop()
+        stop_page()
 
     st.subheader("Available Badges")
 
@@ -80,6 +85,7 @@ if st.session_state.active_tab == "View Badges":
     if selected_type != 'All':
         badge_list = [b for b in badge_list if b.get('badge_type', '').lower() == selected_type.lower()]
 
+    section("Badge table")
     # Display Badges
     if badge_list:
         badge_df = pd.DataFrame([
@@ -131,9 +137,10 @@ if st.session_state.active_tab == "View Badges":
 
 # ---- CREATE/EDIT BADGE TAB ----
 elif st.session_state.active_tab == "Create/Edit Badge":
+    section("Create/edit badge")
     if not user_has_access('create_badges'):
         st.warning("You don't have permission to create or edit badges.")
-        st.stop()
+        stop_page()
     
     st.subheader("Create/Edit Badge")
 
@@ -239,3 +246,5 @@ elif st.session_state.active_tab == "Create/Edit Badge":
         if st.button("Cancel Edit"):
             st.session_state.badge_to_edit = None
             st.rerun()
+
+end_page()
@@ -1,13 +1,16 @@
 import json
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, date, timedelta
 
 from crud.db_manager import DatabaseManager
 from models.badge import Badge
 from models.badge_award import BadgeAward
+from crud.archive import reaches_archive, get_archived_awards
 from auth import is_authenticated, get_current_user, user_has_access
 from utils import generate_unique_id, get_user_by_id, get_badge_by_id, get_team_by_id, get_team_members
+from session_initializer import refresh_session_data
+from monitoring.timing import begin_page, section, end_page, stop_page
 
 # Page config
 st.set_page_config(
@@ -15,6 +18,8 @@ st.set_page_config(
     page_icon="🏆",
     layout="wide"
 )
+begin_page("Award Badges")
+refresh_session_data()
 
 # Initialize session state
 if 'authenticated' not in st.session_state:
@@ -31,18 +36,19 @@ if 'sprints' not in st.session_state:
 # Authentication check
 if not is_authenticated():
     st.warning("Please log in to access this page.")
-    st.stop()
+    stop_page()
 
 # Check user access
 user = get_current_user()
 if not user_has_access('award_badges'):
     st.warning("You don't have permission to award badges.")
-    st.stop()
+    stop_page()
 
 # Page title
 st.title("🎖️ Award Badges")
 st.write("Recognize achievements by awarding badges to team members.")
 
+section("Award form")
 tab1, tab2 = st.tabs(["Award Badge", "Award History"])
 
 with tab1:
@@ -73,7 +79,7 @@ with tab1:
     else:
         # Other roles cannot award badges
         st.warning("You don't have permission to award badges.")
-        st.stop()
+        stop_page()
     
     team_members_options = [{'label': m['name'], 'value': m['id']} for m in team_members]
     
@@ -196,30 +202,35 @@ with tab2:
             options=["All Time", "This Month", "Last Month", "This Quarter"]
         )
     
-    # Fetch awards
-    awards = st.session_state.awards
-    team_member_ids = [m['id'] for m in team_members]
-    team_awards = [a for a in awards if a['awarded_by'] in team_member_ids or (a['user_id'] in team_member_ids and user_has_access('view_reports'))]
-    
-    # Apply filters
-    if member_filter != "All":
-        team_awards = [a for a in team_awards if a['user_id'] == member_filter]
-    
+    section("Award history")
     current_date = datetime.now()
+    start_date, end_date = "1900-01-01", "2100-12-31"
     if time_filter == "This Month":
         start_date = current_date.replace(day=1).strftime("%Y-%m-%d")
-        team_awards = [a for a in team_awards if a.get('awarded_at', '') >= start_date]
     elif time_filter == "Last Month":
         last_month = current_date.month - 1 if current_date.month > 1 else 12
         last_month_year = current_date.year if current_date.month > 1 else current_date.year - 1
         start_date = datetime(last_month_year, last_month, 1).strftime("%Y-%m-%d")
-        end_date = current_date.replace(day=1).strftime("%Y-%m-%d")
-        team_awards = [a for a in team_awards if start_date <= a.get('awarded_at', '') < end_date]
+        end_date = (current_date.replace(day=1) - timedelta(days=1)).strftime("%Y-%m-%d")
     elif time_filter == "This Quarter":
         quarter_start_month = ((current_date.month - 1) // 3) * 3 + 1
         start_date = datetime(current_date.year, quarter_start_month, 1).strftime("%Y-%m-%d")
-        team_awards = [a for a in team_awards if a.get('awarded_at', '') >= start_date]
+
+    # Fetch awards; sessions only hold the hot ones, older ones come from the archive
+    awards = st.session_state.awards if time_filter == "All Time" else [
+        a for a in st.session_state.awards if start_date <= (a.get('awarded_at') or '') <= end_date
+    ]
+    first_day, last_day = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    if reaches_archive(first_day):
+        awards = awards + get_archived_awards(first_day, last_day)
+    team_member_ids = [m['id'] for m in team_members]
+    team_awards = [a for a in awards if a['awarded_by'] in team_member_ids or (a['user_id'] in team_member_ids and user_has_access('view_reports'))]
     
+    # Apply filters
+    if member_filter != "All":
+        team_awards = [a for a in team_awards if a['user_id'] == member_filter]
+    
+    section("Award history table")
     # Display awards
     if team_awards:
         award_data = []
@@ -277,3 +288,5 @@ with tab2:
                                 st.write(f"**Sprint:** {sprint['name']}")
     else:
         st.info("No awards found matching the selected criteria.")
+
+end_page()
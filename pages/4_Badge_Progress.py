@@ -7,6 +7,10 @@ from utils import calculate_badge_progress, get_team_members
 from crud.db_manager import DatabaseManager
 from models.badge import Badge
 from models.badge_award import BadgeAward
+from crud.award_rollup import get_daily_counts
+from queries.gamification_queries import GamificationQueries
+from session_initializer import refresh_session_data
+from monitoring.timing import begin_page, section, end_page, stop_page
 
 # Badge type filtering helper
 def normalize_criteria(value):
@@ -28,11 +32,13 @@ st.set_page_config(
     page_icon="🏆",
     layout="wide"
 )
+begin_page("Badge Progress")
+refresh_session_data()
 
 # Authentication check
 if not is_authenticated():
     st.warning("Please log in to access this page.")
-    st.stop()
+    stop_page()
 
 # Page header
 st.title("📊 Badge Progress Tracker")
@@ -41,6 +47,7 @@ st.write("Track your progress towards earning new badges.")
 # Get current user
 user = get_current_user()
 
+section("Member selection")
 # Determine whose progress to show
 if user['role'] == 'Manager':
     col1, = st.columns(1)
@@ -68,9 +75,11 @@ else:
     progress_user_id = user['id']
     progress_user_role = user['role']
 
+section("Eligible badges")
 # Prepare badges
 badges = st.session_state.badges
-user_awards = [a for a in st.session_state.awards if a['user_id'] == progress_user_id]
+# Hot and archived awards; session state only holds the hot ones
+user_awards = GamificationQueries.get_user_badges(progress_user_id)
 earned_ids = [a['badge_id'] for a in user_awards]
 
 # Modified badge filtering
@@ -97,6 +106,7 @@ unearned_badges = [b for b in eligible_badges if b['id'] not in earned_ids]
 # Create tabs
 tab1, tab2 = st.tabs(["Available Badges", "Earned Badges"])
 
+section("Available badges")
 with tab1:
     st.subheader("Badges Available to Earn")
     if unearned_badges:
@@ -172,6 +182,7 @@ with tab1:
     else:
         st.info("You've earned all available badges for your role! Congratulations!")
 
+section("Earned badges")
 with tab2:
     st.subheader("Your Earned Badges")
 
@@ -227,13 +238,18 @@ with tab2:
             fig.update_traces(textposition='inside', textinfo='percent+label')
             st.plotly_chart(fig, use_container_width=True)
 
-            # Chart: Accumulation Over Time
-            earned_df['Date'] = pd.to_datetime(earned_df['Date Earned'], errors='coerce')
-            earned_df = earned_df.sort_values('Date')
-            earned_df['Cumulative'] = range(1, len(earned_df) + 1)
+            # Chart: Accumulation Over Time, from the daily award rollup
+            daily_counts = get_daily_counts(
+                user_id=progress_user_id,
+                category=None if selected_earned_category == 'All' else selected_earned_category,
+                badge_type=None if selected_earned_type == 'All' else normalize_criteria(selected_earned_type),
+            )
+            accumulation_df = pd.DataFrame(daily_counts, columns=['day', 'count'])
+            accumulation_df['Date'] = pd.to_datetime(accumulation_df['day'])
+            accumulation_df['Cumulative'] = accumulation_df['count'].cumsum()
 
             fig = px.line(
-                earned_df,
+                accumulation_df,
                 x='Date',
                 y='Cumulative',
                 title='Badge Accumulation Over Time',
@@ -245,6 +261,7 @@ with tab2:
     else:
         st.info("You haven't earned any badges yet. Start completing tasks to earn your first badge!")
 
+section("Work/objective split")
 # Work/Objective Split Analysis
 st.subheader("Regular Work vs. Objectives Split")
 
@@ -290,3 +307,5 @@ if total > 0:
         st.info("Your badge distribution shows a reasonable balance, but could be optimized further.")
 else:
     st.info("Earn badges to see your work/objective distribution.")
+
+end_page()
@@ -6,17 +6,23 @@ from utils import get_team_by_id, generate_unique_id, get_team_members, calculat
 from models.team import Team
 from models.user import User
 from crud.db_manager import DatabaseManager
+from crud.unit_of_work import transaction
+from crud.archive import get_archived_counts
+from session_initializer import refresh_session_data
+from monitoring.timing import begin_page, section, end_page, stop_page
 # Page config
 st.set_page_config(
     page_title="Teams - IT Team Gamification",
     page_icon="🏆",
     layout="wide"
 )
+begin_page("Teams")
+refresh_session_data()
 
 # Authentication check
 if not is_authenticated():
     st.warning("Please log in to access this page.")
-    st.stop()
+    stop_page()
 
 # Get current user
 user = get_current_user()
@@ -28,6 +34,7 @@ st.write("View and manage team structures and performance.")
 # Define tabs
 tab1, tab2 = st.tabs(["Team Overview", "Team Management"])
 
+section("Team overview")
 with tab1:
     st.subheader("Team Performance Overview")
     
@@ -73,12 +80,15 @@ with tab1:
         with col4:
             st.metric("Top Performer", team_stats['top_performer'])
         
+        section("Team members")
         # Team members
         st.subheader("Team Members")
         
         if team_members:
             # Create member table
             member_data = []
+            # Session state only holds the hot awards; add the archived counts
+            archived_counts = get_archived_counts(m['id'] for m in team_members)
             
             for member in team_members:
                 # Count badges
@@ -91,7 +101,7 @@ with tab1:
                 member_data.append({
                     'Name': member['name'],
                     'Role': member['role'],
-                    'Total Badges': len(member_badges),
+                    'Total Badges': len(member_badges) + archived_counts.get(member['id'], 0),
                     'Work Badges': work_badges,
                     'Objective Badges': obj_badges,
                     'ID': member['id']
@@ -109,6 +119,7 @@ with tab1:
                 use_container_width=True
             )
             
+            section("Team charts")
             # Visualization: Badge distribution
             st.subheader("Badge Distribution Across Team")
             
@@ -148,6 +159,7 @@ with tab1:
     else:
         st.error("Failed to retrieve team details.")
 
+section("Team management")
 with tab2:
     # Check if user has permission to manage teams
     if not user_has_access('edit_teams'):
@@ -219,22 +231,26 @@ with tab2:
                             teams[team_idx]['description'] = team_desc
                             teams[team_idx]['department'] = team_dept
                             
-                            # Update team lead if changed
-                            if selected_lead:
-                                # Reset lead status for all members
-                                users = st.session_state.users
-                                for i, user in enumerate(users):
-                                    if user['team_id'] == selected_team['id'] and user.get('is_lead', False):
-                                        users[i]['is_lead'] = False
-                                
-                                # Set new lead
-                                lead_idx = next((i for i, u in enumerate(users) 
-                                               if u['id'] == selected_lead), -1)
-                                if lead_idx >= 0:
-                                    users[lead_idx]['is_lead'] = True
-                                    st.session_state.users = users
+                            # Team and lead changes are committed together
+                            with transaction():
+                                # Update team lead if changed
+                                if selected_lead:
+                                    # Reset lead status for all members
+                                    users = st.session_state.users
+                                    for i, user in enumerate(users):
+                                        if user['team_id'] == selected_team['id'] and user.get('is_lead', False):
+                                            users[i]['is_lead'] = False
+                                            DatabaseManager.update(User, user['id'], {'is_lead': False})
+                                    
+                                    # Set new lead
+                                    lead_idx = next((i for i, u in enumerate(users) 
+                                                   if u['id'] == selected_lead), -1)
+                                    if lead_idx >= 0:
+                                        users[lead_idx]['is_lead'] = True
+                                        DatabaseManager.update(User, selected_lead, {'is_lead': True})
+                                        st.session_state.users = users
 
-                            DatabaseManager.update(Team, teams[team_idx]['id'], teams[team_idx])
+                                DatabaseManager.update(Team, teams[team_idx]['id'], teams[team_idx])
                             st.session_state.teams = teams
                             st.success("Team details updated successfully!")
                             st.rerun()
@@ -245,6 +261,7 @@ with tab2:
         if team_members:
             # Create member table with editable role field
             member_data = []
+            archived_counts = get_archived_counts(m['id'] for m in team_members)
             
             for member in team_members:
                 # Count badges
@@ -253,7 +270,7 @@ with tab2:
                 member_data.append({
                     'Name': member['name'],
                     'Role': member['role'],
-                    'Badges': len(member_badges),
+                    'Badges': len(member_badges) + archived_counts.get(member['id'], 0),
                     'Email': member.get('email', 'N/A'),
                     'ID': member['id']
                 })
@@ -401,3 +418,5 @@ with tab2:
                         st.rerun()
     else:
         st.error("Failed to retrieve team details.")
+
+end_page()
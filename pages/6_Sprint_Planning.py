@@ -7,6 +7,8 @@ from models.sprint import Sprint
 from datetime import datetime, timedelta, date
 from auth import is_authenticated, get_current_user, user_has_access
 from utils import generate_unique_id, get_team_by_id, get_current_sprint
+from session_initializer import refresh_session_data
+from monitoring.timing import begin_page, section, end_page, stop_page
 
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
@@ -19,11 +21,13 @@ st.set_page_config(
     page_icon="🏆",
     layout="wide"
 )
+begin_page("Sprint Planning")
+refresh_session_data()
 
 # Authentication check
 if not is_authenticated():
     st.warning("Please log in to access this page.")
-    st.stop()
+    stop_page()
 
 # Get current user
 user = get_current_user()
@@ -38,6 +42,7 @@ user_team = get_team_by_id(user['team_id'])
 # Define tabs
 tab1, tab2, tab3 = st.tabs(["Current Sprint", "Sprint History", "Sprint Management"])
 
+section("Current sprint")
 with tab1:
     st.subheader("Current Sprint Overview")
     
@@ -96,6 +101,7 @@ with tab1:
         else:
             st.write("No specific goals defined for this sprint.")
         
+        section("Current sprint awards")
         # Badge tracking
         st.subheader("Badge Awards in Current Sprint")
         
@@ -188,6 +194,7 @@ with tab1:
     else:
         st.warning("No active sprint found. Use the Sprint Management tab to create a new sprint.")
 
+section("Sprint history")
 with tab2:
     st.subheader("Sprint History")
     
@@ -308,12 +315,13 @@ with tab2:
     else:
         st.info("No completed sprints found.")
 
+section("Sprint management")
 with tab3:
     st.subheader("Sprint Management")
     
     if not user_has_access('create_sprints'):
         st.warning("You don't have permission to manage sprints.")
-        st.stop()
+        stop_page()
 
     st.write("### Active and Upcoming Sprints")
     
@@ -414,3 +422,5 @@ with tab3:
                 
                 st.success(f"Sprint '{sprint_name}' created successfully!")
                 st.rerun()
+
+end_page()
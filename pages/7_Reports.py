@@ -5,7 +5,16 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta, date
 import io
 from auth import is_authenticated, get_current_user, user_has_access
-from utils import get_team_by_id, export_to_csv, calculate_team_stats, get_badge_by_id
+from utils import get_team_by_id, export_to_csv, export_table_csv, calculate_team_stats, get_badge_by_id
+from models.badge_award import BadgeAward
+from models.badge_award_archive import BadgeAwardArchive
+from crud.archive import reaches_archive, get_archived_awards, get_archived_sprint_awards
+from queries.gamification_queries import GamificationQueries
+from crud.award_rollup import get_daily_counts
+from crud.recipient_sketches import approx_unique_recipients
+from caching.report_cache import cached_report
+from session_initializer import refresh_session_data
+from monitoring.timing import begin_page, section, end_page, stop_page, timed_function
 
 if not user_has_access('view_reports'):
     st.warning("You don't have permission to manage sprints.")
@@ -25,11 +34,13 @@ st.set_page_config(
     page_icon="🏆",
     layout="wide"
 )
+begin_page("Reports")
+refresh_session_data()
 
 # Authentication check
 if not is_authenticated():
     st.warning("Please log in to access this page.")
-    st.stop()
+    stop_page()
 
 # Get current user
 user = get_current_user()
@@ -45,8 +56,8 @@ if not user_has_access('view_reports'):
     # Show limited personal reports
     st.subheader("Your Achievement Summary")
 
-    # Get user badges
-    user_awards = [a for a in st.session_state.awards if a['user_id'] == user['id']]
+    # Get user badges, archived ones included
+    user_awards = GamificationQueries.get_user_badges(user['id'])
 
     if user_awards:
         badge_data = []
@@ -80,76 +91,123 @@ if not user_has_access('view_reports'):
     else:
         st.info("You haven't earned any badges yet.")
 
-    st.stop()
-
-# Define report types
-report_type = st.selectbox(
-    "Report Type",
-    ["Team Performance Overview", "Badge Distribution Analysis", 
-     "Work-Objective Balance", "Sprint Achievement Analysis", 
-     "Leaderboard", "Custom Report"]
-)
-
-# Get teams for filtering
-teams = st.session_state.teams
-team_options = [{'label': t['name'], 'value': t['id']} for t in teams]
-
-# Time period filter
-time_period = st.selectbox(
-    "Time Period",
-    ["All Time", "This Month", "Last Month", "Last 3 Months", "Last 6 Months", "This Year", "Custom Range"]
-)
-
-# Handle custom date range
-if time_period == "Custom Range":
-    col1, col2 = st.columns(2)
-    with col1:
-        start_date = st.date_input("Start Date", datetime.now() - timedelta(days=30))
-    with col2:
-        end_date = st.date_input("End Date", datetime.now())
-
-    start_date_str = start_date.strftime("%Y-%m-%d")
-    end_date_str = end_date.strftime("%Y-%m-%d")
-else:
-    # Calculate date range based on selection
-    today = datetime.now()
-
-    if time_period == "This Month":
-        start_date_str = today.replace(day=1).strftime("%Y-%m-%d")
-        end_date_str = today.strftime("%Y-%m-%d")
-    elif time_period == "Last Month":
-        last_month = today.month - 1 if today.month > 1 else 12
-        last_month_year = today.year if today.month > 1 else today.year - 1
-        start_date_str = datetime(last_month_year, last_month, 1).strftime("%Y-%m-%d")
-        end_date_str = today.replace(day=1).strftime("%Y-%m-%d")
-    elif time_period == "Last 3 Months":
-        start_date_str = (today - timedelta(days=90)).strftime("%Y-%m-%d")
-        end_date_str = today.strftime("%Y-%m-%d")
-    elif time_period == "Last 6 Months":
-        start_date_str = (today - timedelta(days=180)).strftime("%Y-%m-%d")
-        end_date_str = today.strftime("%Y-%m-%d")
-    elif time_period == "This Year":
-        start_date_str = today.replace(month=1, day=1).strftime("%Y-%m-%d")
-        end_date_str = today.strftime("%Y-%m-%d")
-    else:  # All Time
-        start_date_str = "1900-01-01"
-        end_date_str = "2100-12-31"
-
-# Get all awards
-all_awards = st.session_state.awards
-
-# Filter awards by date
-start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-
-filtered_awards = [
-    a for a in all_awards
-    if safe_date(a.get('awarded_at')) and start_date <= safe_date(a['awarded_at']) <= end_date
-]
-
-
-# Specific report generation based on selection
-if report_type == "Team Performance Overview":
+    stop_page()
+
+# The page is built from st.fragment units: each report with its own
+# filters, and inside it the table, every chart and the export button.
+# A widget reruns only the unit it sits in; the Report Type and Time
+# Period filters feed every unit, so they rerun the page. Units read
+# their inputs through session_memo(), so a rerun with unchanged inputs
+# skips resolving the period, filtering awards, loading reports and
+# building figures.
+
+def session_memo(name, key, build):
+    """
+    build() for this session, reused on later reruns while key and the
+    versions of the session's loaded data are unchanged. One entry is
+    kept per name.
+    """
+    memo = st.session_state.setdefault('reports_memo', {})
+    key = (key, tuple(sorted(st.session_state.get('loaded_versions', {}).items())))
+    entry = memo.get(name)
+    if entry is None or entry[0] != key:
+        entry = memo[name] = (key, build())
+    return entry[1]
+
+def resolve_period(time_period, custom_start=None, custom_end=None):
+    """(start_date, end_date) of a Time Period selection."""
+    if time_period == "Custom Range":
+        start_date_str = custom_start.strftime("%Y-%m-%d")
+        end_date_str = custom_end.strftime("%Y-%m-%d")
+    else:
+        # Calculate date range based on selection
+        today = datetime.now()
+
+        if time_period == "This Month":
+            start_date_str = today.replace(day=1).strftime("%Y-%m-%d")
+            end_date_str = today.strftime("%Y-%m-%d")
+        elif time_period == "Last Month":
+            last_month = today.month - 1 if today.month > 1 else 12
+            last_month_year = today.year if today.month > 1 else today.year - 1
+            start_date_str = datetime(last_month_year, last_month, 1).strftime("%Y-%m-%d")
+            end_date_str = today.replace(day=1).strftime("%Y-%m-%d")
+        elif time_period == "Last 3 Months":
+            start_date_str = (today - timedelta(days=90)).strftime("%Y-%m-%d")
+            end_date_str = today.strftime("%Y-%m-%d")
+        elif time_period == "Last 6 Months":
+            start_date_str = (today - timedelta(days=180)).strftime("%Y-%m-%d")
+            end_date_str = today.strftime("%Y-%m-%d")
+        elif time_period == "This Year":
+            start_date_str = today.replace(month=1, day=1).strftime("%Y-%m-%d")
+            end_date_str = today.strftime("%Y-%m-%d")
+        else:  # All Time
+            start_date_str = "1900-01-01"
+            end_date_str = "2100-12-31"
+
+    start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+    end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+    return start_date, end_date
+
+def awards_in_range(start_date, end_date):
+    """Awards in the selected date range, built only when a report is not cached."""
+    def build():
+        awards = [
+            a for a in st.session_state.awards
+            if safe_date(a.get('awarded_at')) and start_date <= safe_date(a['awarded_at']) <= end_date
+        ]
+        # Sessions only hold the hot awards; older ones come from the archive when the range reaches it
+        if reaches_archive(start_date):
+            awards += get_archived_awards(start_date, end_date)
+        return awards
+    return session_memo("Awards in range", (start_date, end_date), build)
+
+def awards_by_sprint(sprints):
+    """{sprint id: awards} for the given sprints, built only when a report is not cached."""
+    def build():
+        by_sprint = {s['id']: [] for s in sprints}
+        for a in st.session_state.awards:
+            if a.get('sprint_id') in by_sprint:
+                by_sprint[a['sprint_id']].append(a)
+        # Sprints that started before the archive horizon also have archived awards
+        earliest = min((safe_date(s.get('start_date')) or date.min for s in sprints), default=None)
+        if earliest is not None and reaches_archive(earliest):
+            for a in get_archived_sprint_awards(by_sprint):
+                by_sprint[a['sprint_id']].append(a)
+        return by_sprint
+    return session_memo("Awards by sprint", tuple(sorted(s['id'] for s in sprints)), build)
+
+@st.fragment
+def table_unit(data):
+    st.dataframe(data, use_container_width=True)
+
+@st.fragment
+def chart_unit(name, key, build_figure, error_message=None):
+    """One chart; its figure is only rebuilt when key changes. build_figure may return None."""
+    try:
+        fig = session_memo(f"Chart: {name}", key, build_figure)
+    except Exception:
+        if error_message is None:
+            raise
+        st.warning(error_message)
+        return
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def export_unit(label, export):
+    """Export button; clicking it reruns only this unit, not the report."""
+    if st.button(label):
+        export()
+
+def team_label(team_id):
+    return next((t['label'] for t in team_options if t['value'] == team_id), team_id)
+
+def team_filter_label(team_id):
+    return "All Teams" if team_id == "All Teams" else team_label(team_id)
+
+@st.fragment
+@timed_function("Reports fragment › Team Performance Overview")
+def team_performance_report(start_date, end_date):
     st.subheader("Team Performance Overview")
 
     # Select team(s) to include
@@ -157,12 +215,15 @@ if report_type == "Team Performance Overview":
         "Select Teams",
         options=[t['id'] for t in teams],
         default=[user['team_id']],  # Default to user's team
-        format_func=lambda x: next((t['label'] for t in team_options if t['value'] == x), x)
+        format_func=team_label
     )
 
     if not selected_teams:
         st.warning("Please select at least one team to generate the report.")
-    else:
+        return
+
+    def build_team_stats():
+        filtered_awards = awards_in_range(start_date, end_date)
         # Calculate stats for each selected team
         team_stats_data = []
 
@@ -197,51 +258,56 @@ if report_type == "Team Performance Overview":
 
         # Create DataFrame
         team_stats_df = pd.DataFrame(team_stats_data)
-
-        # Display team stats table
-        st.dataframe(team_stats_df.drop(columns=['Team ID']), use_container_width=True)
-
-        # Create visualizations
-        st.subheader("Team Comparisons")
-
-        # Total badges by team
-        fig1 = px.bar(
-            team_stats_df,
-            x='Team',
-            y='Total Badges',
-            title='Total Badges by Team',
-            color='Team',
-            labels={'Total Badges': 'Number of Badges'}
-        )
-        st.plotly_chart(fig1, use_container_width=True)
-
-        # Average badges per member
-        fig2 = px.bar(
-            team_stats_df,
-            x='Team',
-            y='Avg Badges/Member',
-            title='Average Badges per Team Member',
-            color='Team',
-            labels={'Avg Badges/Member': 'Average Badges'}
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-
-        # Work-Objective split
-        fig3 = px.bar(
-            team_stats_df,
-            x='Team',
-            y=['Work Badges', 'Objective Badges'],
-            title='Work vs. Objective Badge Distribution',
-            barmode='group',
-            labels={'value': 'Number of Badges', 'variable': 'Badge Type'}
-        )
-        st.plotly_chart(fig3, use_container_width=True)
-
-        # Export option
-        if st.button("Export Team Performance Data"):
-            export_to_csv(team_stats_df.drop(columns=['Team ID']), "team_performance_report.csv")
-
-elif report_type == "Badge Distribution Analysis":
+        return team_stats_df
+
+    key = (start_date, end_date, selected_teams)
+    team_stats_df = session_memo("Team Performance Overview", key, lambda: cached_report(
+        "Team Performance Overview", build_team_stats, start_date, end_date, team=selected_teams))
+    team_table_df = team_stats_df.drop(columns=['Team ID'])
+
+    # Display team stats table
+    table_unit(team_table_df)
+
+    # Create visualizations
+    st.subheader("Team Comparisons")
+
+    # Total badges by team
+    chart_unit("Total Badges by Team", key, lambda: px.bar(
+        team_stats_df,
+        x='Team',
+        y='Total Badges',
+        title='Total Badges by Team',
+        color='Team',
+        labels={'Total Badges': 'Number of Badges'}
+    ))
+
+    # Average badges per member
+    chart_unit("Average Badges per Team Member", key, lambda: px.bar(
+        team_stats_df,
+        x='Team',
+        y='Avg Badges/Member',
+        title='Average Badges per Team Member',
+        color='Team',
+        labels={'Avg Badges/Member': 'Average Badges'}
+    ))
+
+    # Work-Objective split
+    chart_unit("Work vs. Objective Badge Distribution", key, lambda: px.bar(
+        team_stats_df,
+        x='Team',
+        y=['Work Badges', 'Objective Badges'],
+        title='Work vs. Objective Badge Distribution',
+        barmode='group',
+        labels={'value': 'Number of Badges', 'variable': 'Badge Type'}
+    ))
+
+    # Export option
+    export_unit("Export Team Performance Data",
+                lambda: export_to_csv(team_table_df, "team_performance_report.csv"))
+
+@st.fragment
+@timed_function("Reports fragment › Badge Distribution Analysis")
+def badge_distribution_report(start_date, end_date):
     st.subheader("Badge Distribution Analysis")
 
     # Filters
@@ -252,8 +318,7 @@ elif report_type == "Badge Distribution Analysis":
         selected_team_id = st.selectbox(
             "Select Team",
             options=["All Teams"] + [t['id'] for t in teams],
-            format_func=lambda x: "All Teams" if x == "All Teams" else next(
-                (t['label'] for t in team_options if t['value'] == x), x)
+            format_func=team_filter_label
         )
 
     with col2:
@@ -270,116 +335,126 @@ elif report_type == "Badge Distribution Analysis":
     selected_team_id = st.selectbox(
         "Select Team",
         options=["All Teams"] + [t['id'] for t in teams],
-        format_func=lambda x: "All Teams" if x == "All Teams" else next(
-            (t['label'] for t in team_options if t['value'] == x), x),
-        key="bd_team" 
+        format_func=team_filter_label,
+        key="bd_team"
     )
 
+    def build_badge_distribution():
+        filtered_awards = awards_in_range(start_date, end_date)
+        if selected_team_id != "All Teams":
+            team_members = [u['id'] for u in st.session_state.users if u['team_id'] == selected_team_id]
+            badge_awards = [a for a in filtered_awards if a['user_id'] in team_members]
+        else:
+            badge_awards = filtered_awards
 
-    if selected_team_id != "All Teams":
-        team_members = [u['id'] for u in st.session_state.users if u['team_id'] == selected_team_id]
-        badge_awards = [a for a in filtered_awards if a['user_id'] in team_members]
-    else:
-        badge_awards = filtered_awards
+        # Prepare badge data
+        badge_data = []
 
-    # Prepare badge data
-    badge_data = []
+        for award in badge_awards:
+            badge = get_badge_by_id(award['badge_id'])
+            user = next((u for u in st.session_state.users if u['id'] == award['user_id']), None)
+            team = get_team_by_id(user['team_id']) if user else None
+
+            if badge and user and team:
+                if selected_category == "All Categories" or badge['category'] == selected_category:
+                    badge_data.append({
+                        'Badge': badge['name'],
+                        'Category': badge['category'],
+                        'Recipient': user['name'],
+                        'Team': team['name'],
+                        'Role': user['role'],
+                        'Date': award.get('awarded_at', 'N/A'),
+                        'Type': award.get('badge_type', 'work').capitalize()
+                    })
 
-    for award in badge_awards:
-        badge = get_badge_by_id(award['badge_id'])
-        user = next((u for u in st.session_state.users if u['id'] == award['user_id']), None)
-        team = get_team_by_id(user['team_id']) if user else None
+        # Create DataFrame
+        badge_df = pd.DataFrame(badge_data)
+        return badge_df
 
-        if badge and user and team:
-            if selected_category == "All Categories" or badge['category'] == selected_category:
-                badge_data.append({
-                    'Badge': badge['name'],
-                    'Category': badge['category'],
-                    'Recipient': user['name'],
-                    'Team': team['name'],
-                    'Role': user['role'],
-                    'Date': award.get('awarded_at', 'N/A'),
-                    'Type': award.get('badge_type', 'work').capitalize()
-                })
+    key = (start_date, end_date, selected_team_id, selected_category)
+    badge_df = session_memo("Badge Distribution Analysis", key, lambda: cached_report(
+        "Badge Distribution Analysis", build_badge_distribution, start_date, end_date,
+        team=selected_team_id, category=selected_category))
 
-    # Create DataFrame
-    badge_df = pd.DataFrame(badge_data)
+    if badge_df.empty:
+        st.info("No badges found matching the selected filters.")
+        return
 
-    if not badge_df.empty:
-        # Show badge distribution
-        st.write(f"Total badges awarded: **{len(badge_df)}**")
+    # Show badge distribution
+    st.write(f"Total badges awarded: **{len(badge_df)}**")
 
-        # Display table
-        st.dataframe(badge_df, use_container_width=True)
+    # Display table
+    table_unit(badge_df)
 
-        # Visualizations
-        st.subheader("Badge Distribution Analysis")
+    # Visualizations
+    st.subheader("Badge Distribution Analysis")
 
-        col1, col2 = st.columns(2)
+    col1, col2 = st.columns(2)
 
-        with col1:
-            # Categories distribution
+    with col1:
+        # Categories distribution
+        def category_chart():
             category_counts = badge_df['Category'].value_counts().reset_index()
             category_counts.columns = ['Category', 'Count']
 
-            fig1 = px.pie(
+            return px.pie(
                 category_counts,
                 values='Count',
                 names='Category',
                 title='Badge Distribution by Category',
                 color_discrete_sequence=px.colors.qualitative.Safe
             )
-            st.plotly_chart(fig1, use_container_width=True)
+        chart_unit("Badge Distribution by Category", key, category_chart)
 
-        with col2:
-            # Role distribution
+    with col2:
+        # Role distribution
+        def role_chart():
             role_counts = badge_df['Role'].value_counts().reset_index()
             role_counts.columns = ['Role', 'Count']
 
-            fig2 = px.pie(
+            return px.pie(
                 role_counts,
                 values='Count',
                 names='Role',
                 title='Badge Distribution by Role',
                 color_discrete_sequence=px.colors.qualitative.Pastel
             )
-            st.plotly_chart(fig2, use_container_width=True)
-
-        # Badges over time
-        if 'Date' in badge_df.columns:
-            try:
-                # Convert to datetime for charting
-                badge_df['DateObj'] = pd.to_datetime(badge_df['Date'], errors='coerce')
-                badge_df = badge_df.sort_values('DateObj')
-
-                # Group by date
-                date_counts = badge_df.groupby(badge_df['DateObj'].dt.strftime('%Y-%m-%d')).size().reset_index()
-                date_counts.columns = ['Date', 'Count']
-                date_counts['DateObj'] = pd.to_datetime(date_counts['Date'])
-                date_counts = date_counts.sort_values('DateObj')
-
-                # Calculate cumulative sum
-                date_counts['Cumulative'] = date_counts['Count'].cumsum()
-
-                # Create time series chart
-                fig3 = px.line(
-                    date_counts,
-                    x='DateObj',
-                    y=['Count', 'Cumulative'],
-                    title='Badge Awards Over Time',
-                    labels={'value': 'Number of Badges', 'variable': 'Metric', 'DateObj': 'Date'}
-                )
-                st.plotly_chart(fig3, use_container_width=True)
-            except:
-                st.warning("Could not create time series chart due to date format issues.")
+        chart_unit("Badge Distribution by Role", key, role_chart)
+
+    # Badges over time, from the daily rollup rather than the award rows
+    def awards_over_time_chart():
+        daily_counts = get_daily_counts(
+            start_date=start_date,
+            end_date=end_date,
+            team_id=None if selected_team_id == "All Teams" else selected_team_id,
+            category=None if selected_category == "All Categories" else selected_category,
+        )
+        if not daily_counts:
+            return None
+        date_counts = pd.DataFrame(daily_counts).rename(columns={'count': 'Count'})
+        date_counts['DateObj'] = pd.to_datetime(date_counts['day'])
+
+        # Calculate cumulative sum
+        date_counts['Cumulative'] = date_counts['Count'].cumsum()
+
+        # Create time series chart
+        return px.line(
+            date_counts,
+            x='DateObj',
+            y=['Count', 'Cumulative'],
+            title='Badge Awards Over Time',
+            labels={'value': 'Number of Badges', 'variable': 'Metric', 'DateObj': 'Date'}
+        )
+    chart_unit("Badge Awards Over Time", key, awards_over_time_chart,
+               error_message="Could not create time series chart due to date format issues.")
 
-        # Export option
-        if st.button("Export Badge Distribution Data"):
-            export_to_csv(badge_df, "badge_distribution_report.csv")
-    else:
-        st.info("No badges found matching the selected filters.")
+    # Export option
+    export_unit("Export Badge Distribution Data",
+                lambda: export_to_csv(badge_df, "badge_distribution_report.csv"))
 
-elif report_type == "Work-Objective Balance":
+@st.fragment
+@timed_function("Reports fragment › Work-Objective Balance")
+def balance_report(start_date, end_date):
     st.subheader("Work-Objective Balance Analysis")
 
     # Filters
@@ -390,8 +465,7 @@ elif report_type == "Work-Objective Balance":
         selected_team_id = st.selectbox(
             "Select Team",
             options=["All Teams"] + [t['id'] for t in teams],
-            format_func=lambda x: "All Teams" if x == "All Teams" else next(
-                (t['label'] for t in team_options if t['value'] == x), x),
+            format_func=team_filter_label,
             key="wo_team"
         )
 
@@ -410,7 +484,12 @@ elif report_type == "Work-Objective Balance":
     if selected_role != "All Roles":
         team_members = [m for m in team_members if m['role'] == selected_role]
 
-    if team_members:
+    if not team_members:
+        st.warning("No team members found matching the selected criteria.")
+        return
+
+    def build_balance():
+        filtered_awards = awards_in_range(start_date, end_date)
         # Calculate work-objective balance for each member
         balance_data = []
 
@@ -456,290 +535,334 @@ elif report_type == "Work-Objective Balance":
 
         # Sort by total badges (descending)
         balance_df = balance_df.sort_values('Total Badges', ascending=False)
-
-        # Display table
-        st.dataframe(balance_df, use_container_width=True)
-
-        # Analytics
-        st.subheader("Balance Analytics")
-
-        if not balance_df.empty and any(balance_df['Total Badges'] > 0):
-            # Stacked bar chart for individuals
-            top_members = balance_df[balance_df['Total Badges'] > 0].head(10)
-
-            if not top_members.empty:
-                fig1 = px.bar(
-                    top_members,
-                    x='Name',
-                    y=['Work %', 'Objective %'],
-                    title='Work-Objective Balance by Individual (Top 10)',
-                    labels={'value': 'Percentage', 'variable': 'Type'},
-                    color_discrete_map={'Work %': '#4169E1', 'Objective %': '#32CD32'}
-                )
-                st.plotly_chart(fig1, use_container_width=True)
-
-            # Balance distribution
-            status_counts = balance_df['Balance Status'].value_counts().reset_index()
-            status_counts.columns = ['Status', 'Count']
-
-            fig2 = px.pie(
-                status_counts,
-                values='Count',
-                names='Status',
-                title='Balance Status Distribution',
-                color_discrete_sequence=px.colors.qualitative.Bold
+        return balance_df
+
+    key = (start_date, end_date, selected_team_id, selected_role)
+    balance_df = session_memo("Work-Objective Balance", key, lambda: cached_report(
+        "Work-Objective Balance", build_balance, start_date, end_date,
+        team=selected_team_id, role=selected_role))
+
+    # Display table
+    table_unit(balance_df)
+
+    # Analytics
+    st.subheader("Balance Analytics")
+
+    if balance_df.empty or not any(balance_df['Total Badges'] > 0):
+        st.info("No badge data available for the selected filters.")
+        return
+
+    # Stacked bar chart for individuals
+    def individual_chart():
+        top_members = balance_df[balance_df['Total Badges'] > 0].head(10)
+        if top_members.empty:
+            return None
+
+        return px.bar(
+            top_members,
+            x='Name',
+            y=['Work %', 'Objective %'],
+            title='Work-Objective Balance by Individual (Top 10)',
+            labels={'value': 'Percentage', 'variable': 'Type'},
+            color_discrete_map={'Work %': '#4169E1', 'Objective %': '#32CD32'}
+        )
+    chart_unit("Work-Objective Balance by Individual", key, individual_chart)
+
+    # Balance distribution
+    def status_chart():
+        status_counts = balance_df['Balance Status'].value_counts().reset_index()
+        status_counts.columns = ['Status', 'Count']
+
+        return px.pie(
+            status_counts,
+            values='Count',
+            names='Status',
+            title='Balance Status Distribution',
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )
+    chart_unit("Balance Status Distribution", key, status_chart)
+
+    # Team averages (if multiple teams)
+    if selected_team_id == "All Teams" and len(teams) > 1:
+        def team_chart():
+            team_avgs = balance_df.groupby('Team').agg({
+                'Work %': 'mean',
+                'Objective %': 'mean',
+                'Total Badges': 'sum'
+            }).reset_index()
+
+            fig3 = px.bar(
+                team_avgs,
+                x='Team',
+                y=['Work %', 'Objective %'],
+                title='Work-Objective Balance by Team',
+                barmode='stack',
+                labels={'value': 'Percentage', 'variable': 'Type'},
+                color_discrete_map={'Work %': '#4169E1', 'Objective %': '#32CD32'}
             )
-            st.plotly_chart(fig2, use_container_width=True)
-
-            # Team averages (if multiple teams)
-            if selected_team_id == "All Teams" and len(teams) > 1:
-                team_avgs = balance_df.groupby('Team').agg({
-                    'Work %': 'mean',
-                    'Objective %': 'mean',
-                    'Total Badges': 'sum'
-                }).reset_index()
-
-                fig3 = px.bar(
-                    team_avgs,
-                    x='Team',
-                    y=['Work %', 'Objective %'],
-                    title='Work-Objective Balance by Team',
-                    barmode='stack',
-                    labels={'value': 'Percentage', 'variable': 'Type'},
-                    color_discrete_map={'Work %': '#4169E1', 'Objective %': '#32CD32'}
-                )
 
-                # Add ideal balance reference line
-                fig3.add_shape(
-                    type='line',
-                    x0=-0.5,
-                    x1=len(team_avgs)-0.5,
-                    y0=80,
-                    y1=80,
-                    line=dict(color='red', width=2, dash='dash'),
-                    name='Ideal Work %'
-                )
+            # Add ideal balance reference line
+            fig3.add_shape(
+                type='line',
+                x0=-0.5,
+                x1=len(team_avgs)-0.5,
+                y0=80,
+                y1=80,
+                line=dict(color='red', width=2, dash='dash'),
+                name='Ideal Work %'
+            )
+            return fig3
+        chart_unit("Work-Objective Balance by Team", key, team_chart)
+
+    # Export option
+    export_unit("Export Work-Objective Balance Data",
+                lambda: export_to_csv(balance_df, "work_objective_balance_report.csv"))
+
+@st.fragment
+def sprint_detail_unit(selected_sprints, sprint_options, filtered_sprints):
+    """Detailed analysis of one sprint; picking another reruns only this unit."""
+    st.subheader("Detailed Sprint Analysis")
+    selected_detail_sprint = st.selectbox(
+        "Select Sprint for Detailed Analysis",
+        options=selected_sprints,
+        format_func=lambda x: next((s['label'] for s in sprint_options if s['value'] == x), x)
+    )
 
-                st.plotly_chart(fig3, use_container_width=True)
+    if not selected_detail_sprint:
+        return
 
-            # Export option
-            if st.button("Export Work-Objective Balance Data"):
-                export_to_csv(balance_df, "work_objective_balance_report.csv")
-        else:
-            st.info("No badge data available for the selected filters.")
-    else:
-        st.warning("No team members found matching the selected criteria.")
+    def build_award_details():
+        # Get detailed awards for this sprint, shared with the analysis above
+        selected_sprint_rows = [s for s in filtered_sprints if s['id'] in selected_sprints]
+        detail_awards = awards_by_sprint(selected_sprint_rows)[selected_detail_sprint]
+        if not detail_awards:
+            return None
 
-elif report_type == "Sprint Achievement Analysis":
-    st.subheader("Sprint Achievement Analysis")
+        # Create award details
+        award_details = []
 
-    # Get sprints
-    sprints = st.session_state.sprints
+        for award in detail_awards:
+            badge = get_badge_by_id(award['badge_id'])
+            user = next((u for u in st.session_state.users if u['id'] == award['user_id']), None)
+            awarder = next((u for u in st.session_state.users if u['id'] == award.get('awarded_by')), None)
 
-    # Filter completed sprints within the date range
-    filtered_sprints = [
-        s for s in sprints 
-        if s.get('status') == 'completed' and
-        isinstance(s.get('end_date'), date) and
-        start_date_str <= s.get('end_date').strftime('%Y-%m-%d') <= end_date_str
-    ]
+            if badge and user:
+                award_details.append({
+                    'Date': award.get('awarded_at', 'N/A'),
+                    'Badge': badge['name'],
+                    'Category': badge['category'],
+                    'Recipient': user['name'],
+                    'Role': user['role'],
+                    'Team': next((t['name'] for t in teams if t['id'] == user['team_id']), 'Unknown'),
+                    'Awarded By': awarder['name'] if awarder else 'System',
+                    'Type': award.get('badge_type', 'work').capitalize()
+                })
 
-    if filtered_sprints:
-        # Sort by end date (newest first)
-        filtered_sprints = sorted(
-            filtered_sprints,
-            key=lambda x: x.get('end_date', '1900-01-01'),
-            reverse=True
+        # Create DataFrame
+        award_df = pd.DataFrame(award_details)
+
+        # Sort by date
+        award_df = award_df.sort_values('Date', ascending=False)
+        return award_df
+
+    award_df = session_memo("Sprint detail", selected_detail_sprint, build_award_details)
+    if award_df is None:
+        st.info(f"No badges were awarded in the selected sprint.")
+        return
+
+    # Get sprint details
+    sprint = next((s for s in filtered_sprints if s['id'] == selected_detail_sprint), None)
+    if not sprint:
+        return
+
+    st.write(f"### Detailed Analysis: {sprint['name']}")
+    st.write(f"**Duration:** {sprint.get('start_date', 'N/A')} to {sprint.get('end_date', 'N/A')}")
+
+    # Display table
+    table_unit(award_df)
+
+    # Badge distribution by category
+    def category_chart():
+        category_counts = award_df['Category'].value_counts().reset_index()
+        category_counts.columns = ['Category', 'Count']
+
+        return px.pie(
+            category_counts,
+            values='Count',
+            names='Category',
+            title=f'Badge Distribution by Category - {sprint["name"]}',
+            color_discrete_sequence=px.colors.qualitative.Safe
         )
-
-        # Sprint selection
-        sprint_options = [
-            {'label': f"{s['name']} ({s.get('start_date', 'N/A')} to {s.get('end_date', 'N/A')})", 
-             'value': s['id']} for s in filtered_sprints
-        ]
-
-        selected_sprints = st.multiselect(
-            "Select Sprints to Analyze",
-            options=[s['id'] for s in filtered_sprints],
-            default=[filtered_sprints[0]['id']] if filtered_sprints else [],
-            format_func=lambda x: next((s['label'] for s in sprint_options if s['value'] == x), x)
+    chart_unit("Sprint Badge Distribution by Category", selected_detail_sprint, category_chart)
+
+    # Distribution by recipient
+    def recipient_chart():
+        recipient_counts = award_df['Recipient'].value_counts().reset_index()
+        recipient_counts.columns = ['Recipient', 'Count']
+
+        return px.bar(
+            recipient_counts.head(10),  # Top 10 recipients
+            x='Recipient',
+            y='Count',
+            title=f'Top Badge Recipients - {sprint["name"]}',
+            color='Count',
+            color_continuous_scale='Blues',
+            labels={'Count': 'Number of Badges', 'Recipient': 'Team Member'}
         )
+    chart_unit("Top Badge Recipients", selected_detail_sprint, recipient_chart)
 
-        if selected_sprints:
-            # Analyze each selected sprint
-            sprint_data = []
-
-            for sprint_id in selected_sprints:
-                sprint = next((s for s in filtered_sprints if s['id'] == sprint_id), None)
+@st.fragment
+@timed_function("Reports fragment › Sprint Achievement Analysis")
+def sprint_analysis_report(start_date, end_date):
+    st.subheader("Sprint Achievement Analysis")
 
-                if sprint:
-                    # Get awards for this sprint
-                    sprint_awards = [a for a in all_awards if a.get('sprint_id') == sprint_id]
+    # Filter completed sprints within the date range, newest first
+    filtered_sprints = session_memo("Completed sprints", (start_date, end_date), lambda: sorted(
+        [
+            s for s in st.session_state.sprints
+            if s.get('status') == 'completed' and
+            safe_date(s.get('end_date')) and
+            start_date <= safe_date(s.get('end_date')) <= end_date
+        ],
+        key=lambda x: x.get('end_date', '1900-01-01'),
+        reverse=True
+    ))
+
+    if not filtered_sprints:
+        st.info("No completed sprints found in the selected date range.")
+        return
 
-                    # Count different badge types
-                    work_badges = sum(1 for a in sprint_awards if a.get('badge_type') == 'work')
-                    obj_badges = sum(1 for a in sprint_awards if a.get('badge_type') == 'objective')
+    # Sprint selection
+    sprint_options = [
+        {'label': f"{s['name']} ({s.get('start_date', 'N/A')} to {s.get('end_date', 'N/A')})",
+         'value': s['id']} for s in filtered_sprints
+    ]
 
-                    # Get unique recipients
-                    unique_recipients = len(set(a['user_id'] for a in sprint_awards))
+    selected_sprints = st.multiselect(
+        "Select Sprints to Analyze",
+        options=[s['id'] for s in filtered_sprints],
+        default=[filtered_sprints[0]['id']] if filtered_sprints else [],
+        format_func=lambda x: next((s['label'] for s in sprint_options if s['value'] == x), x)
+    )
 
-                    # Calculate sprint duration
-                    try:
-                        start_date = datetime.strptime(sprint.get('start_date', '2100-01-01'), "%Y-%m-%d")
-                        end_date = datetime.strptime(sprint.get('end_date', '2100-01-01'), "%Y-%m-%d")
-                        duration = (end_date - start_date).days + 1
-                    except:
-                        duration = 0
-
-                    sprint_data.append({
-                        'Sprint': sprint['name'],
-                        'Start Date': sprint.get('start_date', 'N/A'),
-                        'End Date': sprint.get('end_date', 'N/A'),
-                        'Duration (days)': duration,
-                        'Total Badges': len(sprint_awards),
-                        'Work Badges': work_badges,
-                        'Objective Badges': obj_badges,
-                        'Unique Recipients': unique_recipients,
-                        'ID': sprint_id
-                    })
+    recipient_mode = st.radio(
+        "Unique Recipients", ["Exact", "Approximate"], horizontal=True, key="sprint_recipient_mode",
+        help="Approximate counts merge per-day recipient sketches instead of scanning awards."
+    )
 
-            # Create DataFrame
-            sprint_df = pd.DataFrame(sprint_data)
+    if not selected_sprints:
+        st.warning("Please select at least one sprint to analyze.")
+        return
 
-            # Sort by start date
-            sprint_df = sprint_df.sort_values('Start Date')
+    def build_sprint_analysis():
+        # Analyze each selected sprint
+        sprint_data = []
+        if recipient_mode == "Approximate":
+            approx_recipients = {
+                row['sprint_id']: row['count']
+                for row in approx_unique_recipients(group_by=('sprint_id',), sprint_ids=selected_sprints)
+            }
+        sprint_award_lists = awards_by_sprint([s for s in filtered_sprints if s['id'] in selected_sprints])
 
-            # Display table
-            st.dataframe(sprint_df.drop(columns=['ID']), use_container_width=True)
+        for sprint_id in selected_sprints:
+            sprint = next((s for s in filtered_sprints if s['id'] == sprint_id), None)
 
-            # Visualizations
-            st.subheader("Sprint Analytics")
+            if sprint:
+                # Get awards for this sprint
+                sprint_awards = sprint_award_lists[sprint_id]
 
-            # Badges by sprint
-            fig1 = px.bar(
-                sprint_df,
-                x='Sprint',
-                y=['Work Badges', 'Objective Badges'],
-                title='Badges Awarded by Sprint',
-                barmode='stack',
-                labels={'value': 'Number of Badges', 'variable': 'Badge Type'}
-            )
-            st.plotly_chart(fig1, use_container_width=True)
-
-            # Recipients vs badges
-            fig2 = px.scatter(
-                sprint_df,
-                x='Total Badges',
-                y='Unique Recipients',
-                size='Duration (days)',
-                color='Sprint',
-                title='Recipients vs. Total Badges by Sprint',
-                labels={'Total Badges': 'Total Badges Awarded', 
-                        'Unique Recipients': 'Unique Badge Recipients'}
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-
-            # Badges per day trend
-            sprint_df['Badges per Day'] = sprint_df['Total Badges'] / sprint_df['Duration (days)'].replace(0, 1)
-
-            fig3 = px.line(
-                sprint_df,
-                x='Sprint',
-                y='Badges per Day',
-                markers=True,
-                title='Badge Award Rate Trend',
-                labels={'Badges per Day': 'Average Badges per Day'}
-            )
-            st.plotly_chart(fig3, use_container_width=True)
-
-            # Detailed sprint analysis
-            st.subheader("Detailed Sprint Analysis")
-            selected_detail_sprint = st.selectbox(
-                "Select Sprint for Detailed Analysis",
-                options=selected_sprints,
-                format_func=lambda x: next((s['label'] for s in sprint_options if s['value'] == x), x)
-            )
+                # Count different badge types
+                work_badges = sum(1 for a in sprint_awards if a.get('badge_type') == 'work')
+                obj_badges = sum(1 for a in sprint_awards if a.get('badge_type') == 'objective')
 
-            if selected_detail_sprint:
-                # Get detailed awards for this sprint
-                detail_awards = [a for a in all_awards if a.get('sprint_id') == selected_detail_sprint]
-
-                if detail_awards:
-                    # Get sprint details
-                    sprint = next((s for s in filtered_sprints if s['id'] == selected_detail_sprint), None)
-
-                    if sprint:
-                        st.write(f"### Detailed Analysis: {sprint['name']}")
-                        st.write(f"**Duration:** {sprint.get('start_date', 'N/A')} to {sprint.get('end_date', 'N/A')}")
-
-                        # Create award details
-                        award_details = []
-
-                        for award in detail_awards:
-                            badge = get_badge_by_id(award['badge_id'])
-                            user = next((u for u in st.session_state.users if u['id'] == award['user_id']), None)
-                            awarder = next((u for u in st.session_state.users if u['id'] == award.get('awarded_by')), None)
-
-                            if badge and user:
-                                award_details.append({
-                                    'Date': award.get('awarded_at', 'N/A'),
-                                    'Badge': badge['name'],
-                                    'Category': badge['category'],
-                                    'Recipient': user['name'],
-                                    'Role': user['role'],
-                                    'Team': next((t['name'] for t in teams if t['id'] == user['team_id']), 'Unknown'),
-                                    'Awarded By': awarder['name'] if awarder else 'System',
-                                    'Type': award.get('badge_type', 'work').capitalize()
-                                })
-
-                        # Create DataFrame
-                        award_df = pd.DataFrame(award_details)
-
-                        # Sort by date
-                        award_df = award_df.sort_values('Date', ascending=False)
-
-                        # Display table
-                        st.dataframe(award_df, use_container_width=True)
-
-                        # Badge distribution by category
-                        category_counts = award_df['Category'].value_counts().reset_index()
-                        category_counts.columns = ['Category', 'Count']
-
-                        fig4 = px.pie(
-                            category_counts,
-                            values='Count',
-                            names='Category',
-                            title=f'Badge Distribution by Category - {sprint["name"]}',
-                            color_discrete_sequence=px.colors.qualitative.Safe
-                        )
-                        st.plotly_chart(fig4, use_container_width=True)
-
-                        # Distribution by recipient
-                        recipient_counts = award_df['Recipient'].value_counts().reset_index()
-                        recipient_counts.columns = ['Recipient', 'Count']
-
-                        fig5 = px.bar(
-                            recipient_counts.head(10),  # Top 10 recipients
-                            x='Recipient',
-                            y='Count',
-                            title=f'Top Badge Recipients - {sprint["name"]}',
-                            color='Count',
-                            color_continuous_scale='Blues',
-                            labels={'Count': 'Number of Badges', 'Recipient': 'Team Member'}
-                        )
-                        st.plotly_chart(fig5, use_container_width=True)
+                # Get unique recipients
+                if recipient_mode == "Approximate":
+                    unique_recipients = approx_recipients.get(sprint_id, 0)
                 else:
-                    st.info(f"No badges were awarded in the selected sprint.")
+                    unique_recipients = len(set(a['user_id'] for a in sprint_awards))
 
-            # Export option
-            if st.button("Export Sprint Analysis Data"):
-                export_to_csv(sprint_df.drop(columns=['ID']), "sprint_analysis_report.csv")
-        else:
-            st.warning("Please select at least one sprint to analyze.")
-    else:
-        st.info("No completed sprints found in the selected date range.")
+                # Calculate sprint duration
+                try:
+                    sprint_start = datetime.strptime(sprint.get('start_date', '2100-01-01'), "%Y-%m-%d")
+                    sprint_end = datetime.strptime(sprint.get('end_date', '2100-01-01'), "%Y-%m-%d")
+                    duration = (sprint_end - sprint_start).days + 1
+                except:
+                    duration = 0
+
+                sprint_data.append({
+                    'Sprint': sprint['name'],
+                    'Start Date': sprint.get('start_date', 'N/A'),
+                    'End Date': sprint.get('end_date', 'N/A'),
+                    'Duration (days)': duration,
+                    'Total Badges': len(sprint_awards),
+                    'Work Badges': work_badges,
+                    'Objective Badges': obj_badges,
+                    'Unique Recipients': unique_recipients,
+                    'ID': sprint_id
+                })
 
-elif report_type == "Leaderboard":
+        # Create DataFrame
+        sprint_df = pd.DataFrame(sprint_data)
+
+        # Sort by start date
+        sprint_df = sprint_df.sort_values('Start Date')
+        return sprint_df
+
+    key = (selected_sprints, recipient_mode)
+    sprint_df = session_memo("Sprint Achievement Analysis", key, lambda: cached_report(
+        "Sprint Achievement Analysis", build_sprint_analysis,
+        sprints=selected_sprints, recipient_mode=recipient_mode))
+
+    # Badges per day trend
+    sprint_df['Badges per Day'] = sprint_df['Total Badges'] / sprint_df['Duration (days)'].replace(0, 1)
+
+    # Display table
+    table_unit(sprint_df.drop(columns=['ID', 'Badges per Day']))
+
+    # Visualizations
+    st.subheader("Sprint Analytics")
+
+    # Badges by sprint
+    chart_unit("Badges Awarded by Sprint", key, lambda: px.bar(
+        sprint_df,
+        x='Sprint',
+        y=['Work Badges', 'Objective Badges'],
+        title='Badges Awarded by Sprint',
+        barmode='stack',
+        labels={'value': 'Number of Badges', 'variable': 'Badge Type'}
+    ))
+
+    # Recipients vs badges
+    chart_unit("Recipients vs. Total Badges by Sprint", key, lambda: px.scatter(
+        sprint_df,
+        x='Total Badges',
+        y='Unique Recipients',
+        size='Duration (days)',
+        color='Sprint',
+        title='Recipients vs. Total Badges by Sprint',
+        labels={'Total Badges': 'Total Badges Awarded',
+                'Unique Recipients': 'Unique Badge Recipients'}
+    ))
+
+    chart_unit("Badge Award Rate Trend", key, lambda: px.line(
+        sprint_df,
+        x='Sprint',
+        y='Badges per Day',
+        markers=True,
+        title='Badge Award Rate Trend',
+        labels={'Badges per Day': 'Average Badges per Day'}
+    ))
+
+    # Detailed sprint analysis
+    sprint_detail_unit(selected_sprints, sprint_options, filtered_sprints)
+
+    # Export option
+    export_unit("Export Sprint Analysis Data",
+                lambda: export_to_csv(sprint_df.drop(columns=['ID']), "sprint_analysis_report.csv"))
+
+@st.fragment
+@timed_function("Reports fragment › Leaderboard")
+def leaderboard_report(start_date, end_date):
     st.subheader("Leaderboard")
 
     # Filters
@@ -750,8 +873,7 @@ elif report_type == "Leaderboard":
         selected_team_id = st.selectbox(
             "Team",
             options=["All Teams"] + [t['id'] for t in teams],
-            format_func=lambda x: "All Teams" if x == "All Teams" else next(
-                (t['label'] for t in team_options if t['value'] == x), x),
+            format_func=team_filter_label,
             key="lb_team"
         )
 
@@ -774,7 +896,12 @@ elif report_type == "Leaderboard":
     if selected_role != "All Roles":
         users = [u for u in users if u['role'] == selected_role]
 
-    if users:
+    if not users:
+        st.warning("No users found matching the selected criteria.")
+        return
+
+    def build_leaderboard():
+        filtered_awards = awards_in_range(start_date, end_date)
         # Create leaderboard data
         leaderboard_data = []
 
@@ -789,13 +916,13 @@ elif report_type == "Leaderboard":
                 user_awards = [a for a in user_awards if a.get('badge_type') == 'objective']
 
             # Count badges by category
-            technical_badges = sum(1 for a in user_awards if 
+            technical_badges = sum(1 for a in user_awards if
                                   get_badge_by_id(a['badge_id']).get('category') == 'Technical')
-            leadership_badges = sum(1 for a in user_awards if 
+            leadership_badges = sum(1 for a in user_awards if
                                    get_badge_by_id(a['badge_id']).get('category') == 'Leadership')
-            teamwork_badges = sum(1 for a in user_awards if 
+            teamwork_badges = sum(1 for a in user_awards if
                                  get_badge_by_id(a['badge_id']).get('category') == 'Teamwork')
-            innovation_badges = sum(1 for a in user_awards if 
+            innovation_badges = sum(1 for a in user_awards if
                                    get_badge_by_id(a['badge_id']).get('category') == 'Innovation')
 
             leaderboard_data.append({
@@ -815,63 +942,64 @@ elif report_type == "Leaderboard":
 
         # Sort by total badges (descending)
         leaderboard_df = leaderboard_df.sort_values('Total Badges', ascending=False)
-
-        # Display leaderboard
-        st.write(f"### Top Performers ({selected_badge_type})")
-
-        # Highlight current user
-        leaderboard_df['Current User'] = leaderboard_df['ID'] == user['id']
-
-        # Display table
-        st.dataframe(
-            leaderboard_df.drop(columns=['ID', 'Current User']),
-            use_container_width=True
-        )
-
-        #Visualizations
-        st.subheader("Leaderboard Visualizations")
-
-        # Top performers chart
-        top_users = leaderboard_df.head(10)
-
-        if not top_users.empty and any(top_users['Total Badges'] > 0):
-            fig1 = px.bar(
-                top_users,
-                x='Name',
-                y='Total Badges',
-                color='Team',
-                title='Top 10 Badge Earners',
-                labels={'Total Badges': 'Number of Badges'}
-            )
-            st.plotly_chart(fig1, use_container_width=True)
-
-            # Category distribution for top performers
-            fig2 = px.bar(
-                top_users,
-                x='Name',
-                y=['Technical', 'Leadership', 'Teamwork', 'Innovation'],
-                title='Badge Categories for Top Performers',
-                barmode='stack',
-                labels={'value': 'Number of Badges', 'variable': 'Category'}
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-
-            # Show current user's position
-            if user['id'] in leaderboard_df['ID'].values:
-                user_position = leaderboard_df.index[leaderboard_df['ID'] == user['id']].tolist()[0] + 1
-                user_row = leaderboard_df[leaderboard_df['ID'] == user['id']]
-
-                st.info(f"Your current position: **#{user_position}** with **{user_row['Total Badges'].values[0]}** badges")
-
-            # Export option
-            if st.button("Export Leaderboard Data"):
-                export_to_csv(leaderboard_df.drop(columns=['ID', 'Current User']), "leaderboard_report.csv")
-        else:
-            st.info("No badge data available for the selected filters.")
-    else:
-        st.warning("No users found matching the selected criteria.")
-
-elif report_type == "Custom Report":
+        return leaderboard_df
+
+    key = (start_date, end_date, selected_team_id, selected_role, selected_badge_type)
+    leaderboard_df = session_memo("Leaderboard", key, lambda: cached_report(
+        "Leaderboard", build_leaderboard, start_date, end_date,
+        team=selected_team_id, role=selected_role, badge_type=selected_badge_type))
+    leaderboard_table_df = leaderboard_df.drop(columns=['ID'])
+
+    # Display leaderboard
+    st.write(f"### Top Performers ({selected_badge_type})")
+
+    # Display table
+    table_unit(leaderboard_table_df)
+
+    #Visualizations
+    st.subheader("Leaderboard Visualizations")
+
+    # Top performers chart
+    top_users = leaderboard_df.head(10)
+
+    if top_users.empty or not any(top_users['Total Badges'] > 0):
+        st.info("No badge data available for the selected filters.")
+        return
+
+    chart_unit("Top 10 Badge Earners", key, lambda: px.bar(
+        top_users,
+        x='Name',
+        y='Total Badges',
+        color='Team',
+        title='Top 10 Badge Earners',
+        labels={'Total Badges': 'Number of Badges'}
+    ))
+
+    # Category distribution for top performers
+    chart_unit("Badge Categories for Top Performers", key, lambda: px.bar(
+        top_users,
+        x='Name',
+        y=['Technical', 'Leadership', 'Teamwork', 'Innovation'],
+        title='Badge Categories for Top Performers',
+        barmode='stack',
+        labels={'value': 'Number of Badges', 'variable': 'Category'}
+    ))
+
+    # Show current user's position
+    if user['id'] in leaderboard_df['ID'].values:
+        user_position = leaderboard_df.index[leaderboard_df['ID'] == user['id']].tolist()[0] + 1
+        user_row = leaderboard_df[leaderboard_df['ID'] == user['id']]
+
+        st.info(f"Your current position: **#{user_position}** with **{user_row['Total Badges'].values[0]}** badges")
+
+    # Export option
+    export_unit("Export Leaderboard Data",
+                lambda: export_to_csv(leaderboard_table_df, "leaderboard_report.csv"))
+
+
+@st.fragment
+@timed_function("Reports fragment › Custom Report")
+def custom_report(start_date, end_date):
     st.subheader("Custom Report Builder")
 
     # Report configuration
@@ -901,53 +1029,87 @@ elif report_type == "Custom Report":
     # Select dimensions and metrics
     selected_dimensions = st.multiselect("Dimensions", dimensions, default=[dimensions[0]])
     selected_metrics = st.multiselect("Metrics", metrics, default=[metrics[0]])
+    recipient_mode = "Exact"
+    if "Unique Recipients" in selected_metrics:
+        recipient_mode = st.radio(
+            "Unique Recipients", ["Exact", "Approximate"], horizontal=True, key="custom_recipient_mode",
+            help="Approximate counts merge per-day recipient sketches instead of scanning awards."
+        )
 
     if not selected_dimensions or not selected_metrics:
         st.warning("Please select at least one dimension and one metric.")
     else:
         # Generate report
         st.write("### Custom Report Results")
+        key = (start_date, end_date, data_source, selected_dimensions, selected_metrics, recipient_mode)
 
         # Prepare data based on selection
         if data_source == "Badges":
-            report_data = []
-
-            for award in filtered_awards:
-                badge = get_badge_by_id(award['badge_id'])
-                user = next((u for u in st.session_state.users if u['id'] == award['user_id']), None)
-                team = get_team_by_id(user['team_id']) if user else None
-
-                if badge and user and team:
-                    item = {}
+            # Sketches are kept per day and team, so only those dimensions can be approximated
+            sketch_keys = {"Date Awarded": 'day', "Team": 'team_id'}
+            approximate = recipient_mode == "Approximate" and set(selected_dimensions) <= set(sketch_keys)
+            if recipient_mode == "Approximate" and not approximate:
+                st.caption("Approximate recipient counts support the Team and Date Awarded dimensions; showing exact counts.")
+
+            def build_custom_badges():
+                filtered_awards = awards_in_range(start_date, end_date)
+                report_data = []
+
+                for award in filtered_awards:
+                    badge = get_badge_by_id(award['badge_id'])
+                    user = next((u for u in st.session_state.users if u['id'] == award['user_id']), None)
+                    team = get_team_by_id(user['team_id']) if user else None
+
+                    if badge and user and team:
+                        item = {"Recipient ID": user['id']}
+
+                        # Add selected dimensions
+                        if "Category" in selected_dimensions:
+                            item["Category"] = badge['category']
+                        if "Badge Name" in selected_dimensions:
+                            item["Badge Name"] = badge['name']
+                        if "Recipient" in selected_dimensions:
+                            item["Recipient"] = user['name']
+                        if "Team" in selected_dimensions:
+                            item["Team"] = team['name']
+                        if "Role" in selected_dimensions:
+                            item["Role"] = user['role']
+                        if "Date Awarded" in selected_dimensions:
+                            item["Date Awarded"] = award.get('awarded_at', 'N/A')
+                        if "Badge Type" in selected_dimensions:
+                            item["Badge Type"] = award.get('badge_type', 'work').capitalize()
+
+                        report_data.append(item)
+
+                if not report_data:
+                    return None
 
-                    # Add selected dimensions
-                    if "Category" in selected_dimensions:
-                        item["Category"] = badge['category']
-                    if "Badge Name" in selected_dimensions:
-                        item["Badge Name"] = badge['name']
-                    if "Recipient" in selected_dimensions:
-                        item["Recipient"] = user['name']
-                    if "Team" in selected_dimensions:
-                        item["Team"] = team['name']
-                    if "Role" in selected_dimensions:
-                        item["Role"] = user['role']
-                    if "Date Awarded" in selected_dimensions:
-                        item["Date Awarded"] = award.get('awarded_at', 'N/A')
-                    if "Badge Type" in selected_dimensions:
-                        item["Badge Type"] = award.get('badge_type', 'work').capitalize()
-
-                    report_data.append(item)
-
-            if report_data:
                 # Create DataFrame
                 df = pd.DataFrame(report_data)
 
                 # Add metrics (aggregates)
                 result_df = df.groupby(selected_dimensions).size().reset_index(name='Count')
 
-                if "Unique Recipients" in selected_metrics and "Recipient" in df.columns:
-                    recipient_counts = df.groupby(selected_dimensions)['Recipient'].nunique().reset_index(name='Unique Recipients')
-                    result_df = pd.merge(result_df, recipient_counts, on=selected_dimensions)
+                if "Unique Recipients" in selected_metrics:
+                    if approximate:
+                        team_names = {t['id']: t['name'] for t in teams}
+                        recipient_counts = pd.DataFrame([
+                            {
+                                **({"Date Awarded": row['day'].isoformat()} if "Date Awarded" in selected_dimensions else {}),
+                                **({"Team": team_names.get(row['team_id'])} if "Team" in selected_dimensions else {}),
+                                'Unique Recipients': row['count'],
+                            }
+                            for row in approx_unique_recipients(
+                                group_by=tuple(sketch_keys[d] for d in selected_dimensions),
+                                start_date=start_date,
+                                end_date=end_date,
+                            )
+                        ], columns=selected_dimensions + ['Unique Recipients'])
+                        result_df = pd.merge(result_df, recipient_counts, on=selected_dimensions, how='left')
+                        result_df['Unique Recipients'] = result_df['Unique Recipients'].fillna(0).astype(int)
+                    else:
+                        recipient_counts = df.groupby(selected_dimensions)['Recipient ID'].nunique().reset_index(name='Unique Recipients')
+                        result_df = pd.merge(result_df, recipient_counts, on=selected_dimensions)
 
                 if "Team Distribution" in selected_metrics and "Team" in df.columns:
                     # This is more complex - we'll just add team counts as new columns
@@ -957,232 +1119,268 @@ elif report_type == "Custom Report":
                         result_df = pd.merge(result_df, team_counts, on=selected_dimensions, how='left')
                         result_df[f"Team: {team_name}"] = result_df[f"Team: {team_name}"].fillna(0)
 
+                return result_df
+
+            result_df = session_memo("Custom Report", key, lambda: cached_report(
+                "Custom Report", build_custom_badges, start_date, end_date,
+                source=data_source, dimensions=selected_dimensions,
+                metrics=selected_metrics, recipient_mode=recipient_mode))
+
+            if result_df is not None:
                 # Display results
-                st.dataframe(result_df, use_container_width=True)
+                table_unit(result_df)
 
                 # Create visualization
                 if len(selected_dimensions) == 1:
                     # Create bar chart for single dimension
-                    fig = px.bar(
+                    chart_unit("Custom Badge Count", key, lambda: px.bar(
                         result_df.sort_values('Count', ascending=False),
                         x=selected_dimensions[0],
                         y='Count',
                         title=f'Badge Count by {selected_dimensions[0]}',
                         color=selected_dimensions[0] if len(result_df) <= 10 else None
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    ))
                 elif len(selected_dimensions) == 2:
                     # Create heatmap for two dimensions
-                    pivot_table = df.pivot_table(
-                        index=selected_dimensions[0], 
-                        columns=selected_dimensions[1], 
-                        aggfunc='size', 
-                        fill_value=0
-                    )
-
-                    fig = px.imshow(
-                        pivot_table,
-                        labels=dict(x=selected_dimensions[1], y=selected_dimensions[0], color="Count"),
-                        title=f'Badge Distribution: {selected_dimensions[0]} vs {selected_dimensions[1]}'
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    def heatmap():
+                        pivot_table = result_df.pivot_table(
+                            index=selected_dimensions[0],
+                            columns=selected_dimensions[1],
+                            values='Count',
+                            aggfunc='sum',
+                            fill_value=0
+                        )
+
+                        return px.imshow(
+                            pivot_table,
+                            labels=dict(x=selected_dimensions[1], y=selected_dimensions[0], color="Count"),
+                            title=f'Badge Distribution: {selected_dimensions[0]} vs {selected_dimensions[1]}'
+                        )
+                    chart_unit("Custom Badge Distribution", key, heatmap)
 
                 # Export option
-                if st.button("Export Custom Report"):
-                    export_to_csv(result_df, "custom_badge_report.csv")
+                export_unit("Export Custom Report", lambda: export_to_csv(result_df, "custom_badge_report.csv"))
             else:
                 st.info("No badge data available for the selected filters.")
 
         elif data_source == "Users":
-            report_data = []
+            def build_custom_users():
+                filtered_awards = awards_in_range(start_date, end_date)
+                report_data = []
 
-            for user_item in st.session_state.users:
-                # Filter by team if applicable
-                if selected_team_id != "All Teams" and user_item['team_id'] != selected_team_id:
-                    continue
+                for user_item in st.session_state.users:
+                    # Filter by team if applicable
+                    if selected_team_id != "All Teams" and user_item['team_id'] != selected_team_id:
+                        continue
 
-                # Get user's awards
-                user_awards = [a for a in filtered_awards if a['user_id'] == user_item['id']]
+                    # Get user's awards
+                    user_awards = [a for a in filtered_awards if a['user_id'] == user_item['id']]
 
-                item = {}
+                    item = {}
 
-                # Add selected dimensions
-                if "Name" in selected_dimensions:
-                    item["Name"] = user_item['name']
-                if "Team" in selected_dimensions:
-                    item["Team"] = next((t['name'] for t in teams if t['id'] == user_item['team_id']), 'Unknown')
-                if "Role" in selected_dimensions:
-                    item["Role"] = user_item['role']
+                    # Add selected dimensions
+                    if "Name" in selected_dimensions:
+                        item["Name"] = user_item['name']
+                    if "Team" in selected_dimensions:
+                        item["Team"] = next((t['name'] for t in teams if t['id'] == user_item['team_id']), 'Unknown')
+                    if "Role" in selected_dimensions:
+                        item["Role"] = user_item['role']
+
+                    # Add selected metrics
+                    if "Total Badges" in selected_metrics:
+                        item["Total Badges"] = len(user_awards)
+                    if "Work Badges" in selected_metrics:
+                        item["Work Badges"] = sum(1 for a in user_awards if a.get('badge_type') == 'work')
+                    if "Objective Badges" in selected_metrics:
+                        item["Objective Badges"] = sum(1 for a in user_awards if a.get('badge_type') == 'objective')
+
+                    # Badge categories
+                    if "Technical Badges" in selected_metrics:
+                        item["Technical Badges"] = sum(1 for a in user_awards if 
+                                                   get_badge_by_id(a['badge_id']).get('category') == 'Technical')
+                    if "Leadership Badges" in selected_metrics:
+                        item["Leadership Badges"] = sum(1 for a in user_awards if 
+                                                   get_badge_by_id(a['badge_id']).get('category') == 'Leadership')
+                    if "Teamwork Badges" in selected_metrics:
+                        item["Teamwork Badges"] = sum(1 for a in user_awards if 
+                                                  get_badge_by_id(a['badge_id']).get('category') == 'Teamwork')
+                    if "Innovation Badges" in selected_metrics:
+                        item["Innovation Badges"] = sum(1 for a in user_awards if 
+                                                   get_badge_by_id(a['badge_id']).get('category') == 'Innovation')
 
-                # Add selected metrics
-                if "Total Badges" in selected_metrics:
-                    item["Total Badges"] = len(user_awards)
-                if "Work Badges" in selected_metrics:
-                    item["Work Badges"] = sum(1 for a in user_awards if a.get('badge_type') == 'work')
-                if "Objective Badges" in selected_metrics:
-                    item["Objective Badges"] = sum(1 for a in user_awards if a.get('badge_type') == 'objective')
-
-                # Badge categories
-                if "Technical Badges" in selected_metrics:
-                    item["Technical Badges"] = sum(1 for a in user_awards if 
-                                               get_badge_by_id(a['badge_id']).get('category') == 'Technical')
-                if "Leadership Badges" in selected_metrics:
-                    item["Leadership Badges"] = sum(1 for a in user_awards if 
-                                               get_badge_by_id(a['badge_id']).get('category') == 'Leadership')
-                if "Teamwork Badges" in selected_metrics:
-                    item["Teamwork Badges"] = sum(1 for a in user_awards if 
-                                              get_badge_by_id(a['badge_id']).get('category') == 'Teamwork')
-                if "Innovation Badges" in selected_metrics:
-                    item["Innovation Badges"] = sum(1 for a in user_awards if 
-                                               get_badge_by_id(a['badge_id']).get('category') == 'Innovation')
-
-                report_data.append(item)
+                    report_data.append(item)
+                return report_data
+
+            report_data = session_memo("Custom Report", key, lambda: cached_report(
+                "Custom Report", build_custom_users, start_date, end_date,
+                source=data_source, dimensions=selected_dimensions, metrics=selected_metrics))
 
             if report_data:
                 # Create DataFrame
                 df = pd.DataFrame(report_data)
 
                 # Display results
-                st.dataframe(df, use_container_width=True)
+                table_unit(df)
 
                 # Create visualization
                 if len(selected_metrics) == 1 and len(selected_dimensions) == 1:
                     # Simple bar chart
-                    fig = px.bar(
+                    chart_unit("Custom User Metric", key, lambda: px.bar(
                         df.sort_values(selected_metrics[0], ascending=False),
                         x=selected_dimensions[0],
                         y=selected_metrics[0],
                         title=f'{selected_metrics[0]} by {selected_dimensions[0]}',
                         color=selected_dimensions[0] if len(df) <= 10 else None
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    ))
                 elif len(selected_metrics) > 1 and "Name" in selected_dimensions:
                     # Multi-metric comparison for users
-                    top_users = df.sort_values("Total Badges" if "Total Badges" in df.columns else selected_metrics[0], 
-                                             ascending=False).head(10)
-
-                    fig = px.bar(
-                        top_users,
-                        x='Name',
-                        y=selected_metrics,
-                        title='Badge Metrics for Top Users',
-                        barmode='group'
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    def top_users_chart():
+                        top_users = df.sort_values("Total Badges" if "Total Badges" in df.columns else selected_metrics[0],
+                                                   ascending=False).head(10)
+
+                        return px.bar(
+                            top_users,
+                            x='Name',
+                            y=selected_metrics,
+                            title='Badge Metrics for Top Users',
+                            barmode='group'
+                        )
+                    chart_unit("Badge Metrics for Top Users", key, top_users_chart)
 
                 # Export option
-                if st.button("Export User Report"):
-                    export_to_csv(df, "custom_user_report.csv")
+                export_unit("Export User Report", lambda: export_to_csv(df, "custom_user_report.csv"))
             else:
                 st.info("No user data available for the selected filters.")
 
         elif data_source == "Teams":
-            report_data = []
+            def build_custom_teams():
+                filtered_awards = awards_in_range(start_date, end_date)
+                report_data = []
 
-            for team in teams:
-                # Get team members
-                team_members = [u['id'] for u in st.session_state.users if u['team_id'] == team['id']]
+                for team in teams:
+                    # Get team members
+                    team_members = [u['id'] for u in st.session_state.users if u['team_id'] == team['id']]
 
-                # Get team awards
-                team_awards = [a for a in filtered_awards if a['user_id'] in team_members]
+                    # Get team awards
+                    team_awards = [a for a in filtered_awards if a['user_id'] in team_members]
 
-                item = {}
+                    item = {}
 
-                # Add selected dimensions
-                if "Team Name" in selected_dimensions:
-                    item["Team Name"] = team['name']
-                if "Department" in selected_dimensions:
-                    item["Department"] = team.get('department', 'N/A')
+                    # Add selected dimensions
+                    if "Team Name" in selected_dimensions:
+                        item["Team Name"] = team['name']
+                    if "Department" in selected_dimensions:
+                        item["Department"] = team.get('department', 'N/A')
+
+                    # Add selected metrics
+                    if "Member Count" in selected_metrics:
+                        item["Member Count"] = len(team_members)
+                    if "Total Badges" in selected_metrics:
+                        item["Total Badges"] = len(team_awards)
+                    if "Avg Badges/Member" in selected_metrics:
+                        item["Avg Badges/Member"] = round(len(team_awards) / len(team_members), 2) if team_members else 0
+                    if "Work Badges" in selected_metrics:
+                        item["Work Badges"] = sum(1 for a in team_awards if a.get('badge_type') == 'work')
+                    if "Objective Badges" in selected_metrics:
+                        item["Objective Badges"] = sum(1 for a in team_awards if a.get('badge_type') == 'objective')
 
-                # Add selected metrics
-                if "Member Count" in selected_metrics:
-                    item["Member Count"] = len(team_members)
-                if "Total Badges" in selected_metrics:
-                    item["Total Badges"] = len(team_awards)
-                if "Avg Badges/Member" in selected_metrics:
-                    item["Avg Badges/Member"] = round(len(team_awards) / len(team_members), 2) if team_members else 0
-                if "Work Badges" in selected_metrics:
-                    item["Work Badges"] = sum(1 for a in team_awards if a.get('badge_type') == 'work')
-                if "Objective Badges" in selected_metrics:
-                    item["Objective Badges"] = sum(1 for a in team_awards if a.get('badge_type') == 'objective')
+                    report_data.append(item)
+                return report_data
 
-                report_data.append(item)
+            report_data = session_memo("Custom Report", key, lambda: cached_report(
+                "Custom Report", build_custom_teams, start_date, end_date,
+                source=data_source, dimensions=selected_dimensions, metrics=selected_metrics))
 
             if report_data:
                 # Create DataFrame
                 df = pd.DataFrame(report_data)
 
                 # Display results
-                st.dataframe(df, use_container_width=True)
+                table_unit(df)
 
                 # Create visualization
                 if "Total Badges" in selected_metrics:
                     # Bar chart for total badges by team
-                    fig = px.bar(
+                    chart_unit("Custom Total Badges by Team", key, lambda: px.bar(
                         df.sort_values("Total Badges", ascending=False),
                         x="Team Name",
                         y="Total Badges",
                         title='Total Badges by Team',
                         color="Team Name" if len(df) <= 10 else None
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    ))
 
                 if "Work Badges" in selected_metrics and "Objective Badges" in selected_metrics:
                     # Stacked bar for work vs objective
-                    fig = px.bar(
+                    chart_unit("Custom Work vs Objective Badges by Team", key, lambda: px.bar(
                         df,
                         x="Team Name",
                         y=["Work Badges", "Objective Badges"],
                         title='Work vs Objective Badges by Team',
                         barmode='stack'
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    ))
 
                 # Export option
-                if st.button("Export Team Report"):
-                    export_to_csv(df, "custom_team_report.csv")
+                export_unit("Export Team Report", lambda: export_to_csv(df, "custom_team_report.csv"))
             else:
                 st.info("No team data available for the selected filters.")
 
         else:  # Sprints
-            report_data = []
+            def build_custom_sprints():
+                start_date_str, end_date_str = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+                report_data = []
+                if recipient_mode == "Approximate":
+                    approx_recipients = {row['sprint_id']: row['count']
+                                         for row in approx_unique_recipients(group_by=('sprint_id',))}
 
-            for sprint in st.session_state.sprints:
                 # Filter by date range
-                if not (start_date_str <= sprint.get('end_date', '2100-01-01') <= end_date_str):
-                    continue
+                sprints_in_range = [
+                    sprint for sprint in st.session_state.sprints
+                    if start_date_str <= sprint.get('end_date', '2100-01-01') <= end_date_str
+                ]
+                sprint_award_lists = awards_by_sprint(sprints_in_range)
 
-                # Get awards for this sprint
-                sprint_awards = [a for a in all_awards if a.get('sprint_id') == sprint['id']]
-
-                item = {}
-
-                # Add selected dimensions
-                if "Sprint Name" in selected_dimensions:
-                    item["Sprint Name"] = sprint['name']
-                if "Start Date" in selected_dimensions:
-                    item["Start Date"] = sprint.get('start_date', 'N/A')
-                if "End Date" in selected_dimensions:
-                    item["End Date"] = sprint.get('end_date', 'N/A')
-                if "Duration" in selected_dimensions:
-                    try:
-                        start_date = datetime.strptime(sprint.get('start_date', '2100-01-01'), "%Y-%m-%d")
-                        end_date = datetime.strptime(sprint.get('end_date', '2100-01-01'), "%Y-%m-%d")
-                        item["Duration"] = f"{(end_date - start_date).days + 1} days"
-                    except:
-                        item["Duration"] = "N/A"
-
-                # Add selected metrics
-                if "Total Badges" in selected_metrics:
-                    item["Total Badges"] = len(sprint_awards)
-                if "Work Badges" in selected_metrics:
-                    item["Work Badges"] = sum(1 for a in sprint_awards if a.get('badge_type') == 'work')
-                if "Objective Badges" in selected_metrics:
-                    item["Objective Badges"] = sum(1 for a in sprint_awards if a.get('badge_type') == 'objective')
-                if "Unique Recipients" in selected_metrics:
-                    item["Unique Recipients"] = len(set(a['user_id'] for a in sprint_awards))
+                for sprint in sprints_in_range:
+
+                    # Get awards for this sprint
+                    sprint_awards = sprint_award_lists[sprint['id']]
+
+                    item = {}
+
+                    # Add selected dimensions
+                    if "Sprint Name" in selected_dimensions:
+                        item["Sprint Name"] = sprint['name']
+                    if "Start Date" in selected_dimensions:
+                        item["Start Date"] = sprint.get('start_date', 'N/A')
+                    if "End Date" in selected_dimensions:
+                        item["End Date"] = sprint.get('end_date', 'N/A')
+                    if "Duration" in selected_dimensions:
+                        try:
+                            sprint_start = datetime.strptime(sprint.get('start_date', '2100-01-01'), "%Y-%m-%d")
+                            sprint_end = datetime.strptime(sprint.get('end_date', '2100-01-01'), "%Y-%m-%d")
+                            item["Duration"] = f"{(sprint_end - sprint_start).days + 1} days"
+                        except:
+                            item["Duration"] = "N/A"
+
+                    # Add selected metrics
+                    if "Total Badges" in selected_metrics:
+                        item["Total Badges"] = len(sprint_awards)
+                    if "Work Badges" in selected_metrics:
+                        item["Work Badges"] = sum(1 for a in sprint_awards if a.get('badge_type') == 'work')
+                    if "Objective Badges" in selected_metrics:
+                        item["Objective Badges"] = sum(1 for a in sprint_awards if a.get('badge_type') == 'objective')
+                    if "Unique Recipients" in selected_metrics:
+                        if recipient_mode == "Approximate":
+                            item["Unique Recipients"] = approx_recipients.get(sprint['id'], 0)
+                        else:
+                            item["Unique Recipients"] = len(set(a['user_id'] for a in sprint_awards))
+
+                    report_data.append(item)
+                return report_data
 
-                report_data.append(item)
+            report_data = session_memo("Custom Report", key, lambda: cached_report(
+                "Custom Report", build_custom_sprints, start_date, end_date,
+                award_range=False, source=data_source, dimensions=selected_dimensions,
+                metrics=selected_metrics, recipient_mode=recipient_mode))
 
             if report_data:
                 # Create DataFrame
@@ -1195,34 +1393,86 @@ elif report_type == "Custom Report":
                     df = df.drop(columns=["Start Date Obj"])
 
                 # Display results
-                st.dataframe(df, use_container_width=True)
+                table_unit(df)
 
                 # Create visualization
                 if "Total Badges" in selected_metrics:
                     # Line chart for badges over sprints
-                    fig = px.line(
+                    chart_unit("Custom Total Badges by Sprint", key, lambda: px.line(
                         df,
                         x="Sprint Name",
                         y="Total Badges",
                         title='Total Badges by Sprint',
                         markers=True
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    ))
 
                 if "Work Badges" in selected_metrics and "Objective Badges" in selected_metrics:
                     # Stacked bar for work vs objective
-                    fig = px.bar(
+                    chart_unit("Custom Work vs Objective Badges by Sprint", key, lambda: px.bar(
                         df,
                         x="Sprint Name",
                         y=["Work Badges", "Objective Badges"],
                         title='Work vs Objective Badges by Sprint',
                         barmode='stack'
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    ))
 
                 # Export option
-                if st.button("Export Sprint Report"):
-                    export_to_csv(df, "custom_sprint_report.csv")
+                export_unit("Export Sprint Report", lambda: export_to_csv(df, "custom_sprint_report.csv"))
             else:
                 st.info("No sprint data available for the selected filters.")
 
+@st.fragment
+def award_history_export():
+    st.divider()
+    st.subheader("Award History Export")
+    st.write("Every badge award ever recorded, regardless of the filters above.")
+    export_unit("Export Award History", lambda: export_table_csv([BadgeAwardArchive, BadgeAward], "award_history.csv"))
+
+REPORTS = {
+    "Team Performance Overview": team_performance_report,
+    "Badge Distribution Analysis": badge_distribution_report,
+    "Work-Objective Balance": balance_report,
+    "Sprint Achievement Analysis": sprint_analysis_report,
+    "Leaderboard": leaderboard_report,
+    "Custom Report": custom_report,
+}
+
+section("Filters")
+# Define report types
+report_type = st.selectbox("Report Type", list(REPORTS))
+
+# Get teams for filtering
+teams = st.session_state.teams
+team_options = [{'label': t['name'], 'value': t['id']} for t in teams]
+
+# Time period filter
+time_period = st.selectbox(
+    "Time Period",
+    ["All Time", "This Month", "Last Month", "Last 3 Months", "Last 6 Months", "This Year", "Custom Range"]
+)
+
+# Handle custom date range
+custom_start = custom_end = None
+if time_period == "Custom Range":
+    col1, col2 = st.columns(2)
+    with col1:
+        custom_start = st.date_input("Start Date", datetime.now() - timedelta(days=30))
+    with col2:
+        custom_end = st.date_input("End Date", datetime.now())
+
+# Relative periods end today, so the day is part of the key
+start_date, end_date = session_memo(
+    "Time Period", (time_period, custom_start, custom_end, date.today()),
+    lambda: resolve_period(time_period, custom_start, custom_end)
+)
+
+# Specific report generation based on selection
+section(report_type)
+REPORTS[report_type](start_date, end_date)
+
+# Full award history, streamed from the database rather than session state
+if user_has_access('export_data'):
+    section("Award history export")
+    award_history_export()
+
+end_page()
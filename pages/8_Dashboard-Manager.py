@@ -3,20 +3,25 @@ import pandas as pd
 import plotly.express as px
 from auth import is_authenticated, get_current_user
 from utils import get_team_members, get_user_badges, calculate_team_stats
+from crud.award_rollup import get_daily_counts
+from session_initializer import refresh_session_data
+from monitoring.timing import begin_page, section, end_page, stop_page
 
 # Page config
 st.set_page_config(page_title="Dashboard - IT Team Gamification", page_icon="🏆", layout="wide")
+begin_page("Manager Dashboard")
+refresh_session_data()
 
 # Authentication check
 if not is_authenticated():
     st.warning("Please log in to access this page.")
-    st.stop()
+    stop_page()
 
 user = get_current_user()
 
 if user['role'] != 'Manager':
     st.error("You do not have permission to view this page.")
-    st.stop()
+    stop_page()
 
 st.title("🏆 Dashboard")
 st.write(f"Welcome, **{user['name']}**! Here is an overview of all teams and members.")
@@ -26,8 +31,9 @@ teams = st.session_state.teams if 'teams' in st.session_state else []
 
 if not teams:
     st.info("No teams found in the system.")
-    st.stop()
+    stop_page()
 
+section("Team selection")
 # Team selection
 team_options = [{'label': t['name'], 'value': t['id']} for t in teams]
 selected_team_id = st.selectbox(
@@ -43,6 +49,7 @@ if selected_team:
     team_stats = calculate_team_stats(selected_team['id'])
     st.write(f"**Total Badges:** {team_stats['total_badges']} &nbsp;&nbsp; **Avg Badges/Member:** {team_stats['avg_badges']} &nbsp;&nbsp; **Top Performer:** {team_stats['top_performer']}")
 
+    section("Team members")
     # Team members and their badges
     members = get_team_members(selected_team['id'])
     if not members:
@@ -64,6 +71,7 @@ if selected_team:
             fig = px.bar(df, x='Name', y='Badges', color='Badges', title=f"{selected_team['name']} Leaderboard")
             st.plotly_chart(fig, use_container_width=True)
 
+section("Organization overview")
 # Organization-wide stats
 st.header("Organization Overview")
 org_stats = {
@@ -79,6 +87,7 @@ col3.metric("Total Badges Awarded", org_stats["Total Badges Awarded"])
 st.info("For more analytics, visit the Reports page or use the Award Badges and Badge Management pages.")
 
 
+section("Team comparison")
 # --- Team Comparison Table and Visualization ---
 st.header("Team Comparison Overview")
 
@@ -114,33 +123,27 @@ if not comparison_df.empty:
     st.plotly_chart(fig, use_container_width=True)
 
 
+section("Sprint & year analysis")
 # --- Sprint/Year/Category Filters ---
 st.header("Sprint & Year Badge Analysis")
 
-# Collect all badge awards for all teams
-all_badge_awards = []
-for t in teams:
-    members = get_team_members(t['id'])
-    for m in members:
-        badges = get_user_badges(m['id'])
-        for b in badges:
-            all_badge_awards.append({
-                "Team": t['name'],
-                "TeamID": t['id'],
-                "Member": m['name'],
-                "Badge": b['name'],
-                "Category": b.get('category', 'Other'),
-                "Awarded At": b.get('awarded_at'),
-                "Sprint": b.get('sprint', None)  # If you have sprint info
-            })
-
-awards_df = pd.DataFrame(all_badge_awards)
+# Daily award counts per team and category, from the award rollup
+team_names = {t['id']: t['name'] for t in teams}
+awards_df = pd.DataFrame([
+    {
+        "Team": team_names[row['team_id']],
+        "TeamID": row['team_id'],
+        "Category": row['category'] or 'Other',
+        "Awarded At": row['day'],
+        "Count": row['count'],
+    }
+    for row in get_daily_counts(group_by=('day', 'team_id', 'category'))
+    if row['team_id'] in team_names
+])
 if not awards_df.empty:
-    # Extract year and sprint if available
+    # Extract year, and a sprint placeholder by month
     awards_df['Year'] = pd.to_datetime(awards_df['Awarded At']).dt.year
-    if 'Sprint' not in awards_df or awards_df['Sprint'].isnull().all():
-        # If no sprint info, create a placeholder (e.g., by month)
-        awards_df['Sprint'] = pd.to_datetime(awards_df['Awarded At']).dt.strftime('M%Y-%m')
+    awards_df['Sprint'] = pd.to_datetime(awards_df['Awarded At']).dt.strftime('M%Y-%m')
     
     years = sorted(awards_df['Year'].dropna().unique())
     sprints = ['All'] + sorted(awards_df['Sprint'].dropna().unique())
@@ -163,7 +166,7 @@ if not awards_df.empty:
         filtered_df = filtered_df[filtered_df['Category'] == selected_category]
 
     # Group by team and show badge counts
-    team_sprint_counts = filtered_df.groupby('Team').size().reset_index(name='Badge Count')
+    team_sprint_counts = filtered_df.groupby('Team')['Count'].sum().reset_index(name='Badge Count')
     st.subheader(f"Badges Awarded per Team (Sprint: {selected_sprint}, Year: {selected_year})")
     st.dataframe(team_sprint_counts, use_container_width=True)
 
@@ -174,7 +177,7 @@ if not awards_df.empty:
     if selected_sprint != 'All':
         pivot = pivot[pivot['Sprint'] == selected_sprint]
     fig = px.bar(
-        pivot.groupby(['Sprint', 'Team']).size().reset_index(name='Badge Count'),
+        pivot.groupby(['Sprint', 'Team'])['Count'].sum().reset_index(name='Badge Count'),
         x='Sprint',
         y='Badge Count',
         color='Team',
@@ -183,4 +186,6 @@ if not awards_df.empty:
     )
     st.plotly_chart(fig, use_container_width=True)
 else:
-    st.info("No badge award data available for the selected filters.")
\ No newline at end of file
+    st.info("No badge award data available for the selected filters.")
+
+end_page()
@@ -0,0 +1,107 @@
+import tracemalloc
+import streamlit as st
+import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from datetime import datetime
+from auth import is_authenticated, user_has_access
+from monitoring.timing import begin_page, section, end_page, stop_page
+from monitoring import memory
+
+# Page config
+st.set_page_config(page_title="Memory Usage - IT Team Gamification", page_icon="🏆", layout="wide")
+begin_page("Memory Usage")
+
+# Authentication check
+if not is_authenticated():
+    st.warning("Please log in to access this page.")
+    stop_page()
+
+if not user_has_access('view_memory'):
+    st.error("You do not have permission to view this page.")
+    stop_page()
+
+def mb(size):
+    return round(size / (1024 * 1024), 2) if size is not None else None
+
+st.title("🧠 Memory Usage")
+st.write("Estimated memory held by session state across all sessions of this server process.")
+
+section("Overview")
+if not memory.MEMORY_ACCOUNTING:
+    st.info("Automatic sampling is off. Set `MEMORY_ACCOUNTING=1` to measure every session; "
+            "only sessions measured on demand are listed below.")
+
+if st.button("Measure my session now"):
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        memory.record_session(ctx.session_id, "Memory Usage")
+
+sessions = memory.get_session_usage()
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Process RSS (MB)", mb(memory.process_rss()) or "n/a")
+with col2:
+    st.metric("Session state total (MB)", mb(sum(s['total'] for s in sessions)))
+with col3:
+    st.metric("Measured sessions", len(sessions))
+
+section("Largest consumers")
+st.subheader("Session state keys across sessions")
+key_totals = memory.get_key_totals()
+if key_totals:
+    st.dataframe(pd.DataFrame([
+        {'Key': t['key'], 'Sessions': t['sessions'], 'Total (MB)': mb(t['total']),
+         'Largest (MB)': mb(t['max']), 'Average (MB)': mb(t['total'] / t['sessions'])}
+        for t in key_totals
+    ]), use_container_width=True, hide_index=True)
+else:
+    st.info("No sessions have been measured yet.")
+
+st.subheader("Largest single entries")
+consumers = memory.get_largest_consumers()
+if consumers:
+    st.dataframe(pd.DataFrame([
+        {'Session': c['session_id'][:8], 'Last page': c['page'], 'Key': c['key'], 'Size (MB)': mb(c['bytes'])}
+        for c in consumers
+    ]), use_container_width=True, hide_index=True)
+
+st.subheader("Sessions")
+if sessions:
+    st.dataframe(pd.DataFrame([
+        {'Session': s['session_id'][:8], 'Last page': s['page'], 'Keys': len(s['keys']),
+         'Total (MB)': mb(s['total']),
+         'Measured': datetime.fromtimestamp(s['measured_at']).strftime('%H:%M:%S'),
+         'Last seen': datetime.fromtimestamp(s['last_seen']).strftime('%H:%M:%S')}
+        for s in sessions
+    ]), use_container_width=True, hide_index=True)
+
+section("tracemalloc")
+st.subheader("Allocation snapshots")
+st.caption("tracemalloc slows the whole process while it runs; stop it when done.")
+group_by = st.selectbox("Group allocations by", ['lineno', 'filename', 'traceback'])
+col1, col2, col3 = st.columns(3)
+with col1:
+    if st.button("Start tracing", disabled=tracemalloc.is_tracing()):
+        memory.start_tracemalloc()
+        st.rerun()
+with col2:
+    take_snapshot = st.button("Take snapshot", disabled=not tracemalloc.is_tracing())
+with col3:
+    if st.button("Stop tracing", disabled=not tracemalloc.is_tracing()):
+        memory.stop_tracemalloc()
+        st.rerun()
+
+if take_snapshot:
+    top, diff = memory.take_tracemalloc_snapshot(group_by=group_by)
+    st.write("**Largest allocation sites**")
+    st.dataframe(pd.DataFrame([
+        {'Location': t['location'], 'Size (MB)': mb(t['size']), 'Blocks': t['count']} for t in top
+    ]), use_container_width=True, hide_index=True)
+    if diff:
+        st.write("**Change since previous snapshot**")
+        st.dataframe(pd.DataFrame([
+            {'Location': d['location'], 'Change (MB)': mb(d['size_diff']), 'Blocks': d['count_diff']}
+            for d in diff
+        ]), use_container_width=True, hide_index=True)
+
+end_page()
@@ -0,0 +1,32 @@
+# queries/async_gamification_queries.py
+"""
+Coroutine versions of the GamificationQueries lookups, for gather()
+in crud/async_db_manager.py. They run the same registered statements.
+"""
+from datetime import datetime
+from models.user import User
+from models.sprint import Sprint
+from models.badge_award import BadgeAward
+from crud.async_db_manager import fetch_all
+from queries import statements
+from monitoring.timing import timed_function
+
+class AsyncGamificationQueries:
+    @staticmethod
+    @timed_function()
+    async def get_team_members(team_id):
+        return await fetch_all(User, statements.statement('team_members'), {'team_id': team_id})
+
+    @staticmethod
+    @timed_function()
+    async def get_active_sprints(team_id=None):
+        today = datetime.today().date()
+        if team_id:
+            return await fetch_all(Sprint, statements.statement('team_active_sprints'),
+                                   {'today': today, 'team_id': team_id})
+        return await fetch_all(Sprint, statements.statement('active_sprints'), {'today': today})
+
+    @staticmethod
+    @timed_function()
+    async def get_user_badges(user_id):
+        return await fetch_all(BadgeAward, statements.statement('user_badges'), {'user_id': user_id})
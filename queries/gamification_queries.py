@@ -2,42 +2,40 @@ from datetime import datetime
 from models.user import User
 from models.sprint import Sprint
 from models.badge_award import BadgeAward
-from database import Session, get_database_connection
+from database import get_database_connection
+from crud.rows import fetch_dicts
+from crud.unit_of_work import read_session
+from queries import statements
+from monitoring.timing import timed_function
 
 class GamificationQueries:
     @staticmethod
+    @timed_function()
     def get_team_members(team_id):
-        with Session() as session:
-            return [
-                user.to_dict()
-                for user in session.query(User)
-                .filter(User.team_id == team_id)
-                .all()
-            ]
+        with read_session() as session:
+            return fetch_dicts(session, User, statement=statements.statement('team_members'),
+                               params={'team_id': team_id})
     
     @staticmethod
+    @timed_function()
     def get_active_sprints(team_id=None):
         today = datetime.today().date()
-        with Session() as session:
-            query = session.query(Sprint).filter(
-                Sprint.start_date <= today,
-                Sprint.end_date >= today
-            )
+        with read_session() as session:
             if team_id:
-                query = query.filter(Sprint.team_id == team_id)
-            return [sprint.to_dict() for sprint in query.all()]
+                return fetch_dicts(session, Sprint, statement=statements.statement('team_active_sprints'),
+                                   params={'today': today, 'team_id': team_id})
+            return fetch_dicts(session, Sprint, statement=statements.statement('active_sprints'),
+                               params={'today': today})
 
     @staticmethod
+    @timed_function()
     def get_user_badges(user_id):
-        with Session() as session:
-            return [
-                award.to_dict()
-                for award in session.query(BadgeAward)
-                .filter(BadgeAward.user_id == user_id)
-                .all()
-            ]
+        with read_session() as session:
+            return fetch_dicts(session, BadgeAward, statement=statements.statement('user_badges'),
+                               params={'user_id': user_id})
         
     @staticmethod
+    @timed_function()
     def execute_query(query, params):
         connection = None
         cursor = None
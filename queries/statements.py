@@ -0,0 +1,93 @@
+# queries/statements.py
+"""
+Registry of pre-built select() statements for the hot lookups.
+
+Each statement is built once, with bindparam() placeholders, and reused
+for every call, so SQLAlchemy only derives its cache key and finds the
+compiled form in the engine's compiled cache instead of rebuilding and
+recompiling the query. Identical SQL text also lets drivers that keep
+prepared statements (sqlite3's statement cache, pyodbc's reuse of the
+last prepared statement, SQL Server's plan cache) reuse theirs.
+
+install_statement_stats(engine) counts compiled-cache hits and misses per
+statement; see get_statement_stats().
+"""
+import threading
+
+from sqlalchemy import bindparam, event, union_all
+
+from models.user import User
+from models.sprint import Sprint
+from models.badge_award import BadgeAward
+from models.badge_award_archive import BadgeAwardArchive
+from crud.rows import select_rows
+from monitoring.metrics import record_cache_lookup
+
+_BUILDERS = {
+    'user_by_username': lambda: select_rows(User).where(User.username == bindparam('username')),
+    'team_members': lambda: select_rows(User).where(User.team_id == bindparam('team_id')),
+    # Archived awards have the same columns, so both tiers decode as BadgeAward rows
+    'user_badges': lambda: union_all(
+        select_rows(BadgeAward).where(BadgeAward.user_id == bindparam('user_id')),
+        select_rows(BadgeAwardArchive).where(BadgeAwardArchive.user_id == bindparam('user_id')),
+    ),
+    'active_sprints': lambda: select_rows(Sprint).where(
+        Sprint.start_date <= bindparam('today'),
+        Sprint.end_date >= bindparam('today'),
+    ),
+    'team_active_sprints': lambda: select_rows(Sprint).where(
+        Sprint.start_date <= bindparam('today'),
+        Sprint.end_date >= bindparam('today'),
+        Sprint.team_id == bindparam('team_id'),
+    ),
+}
+
+_lock = threading.Lock()
+_statements = {}
+_names = {}
+_stats = {}
+
+def _register(name, build):
+    with _lock:
+        stmt = _statements.get(name)
+        if stmt is None:
+            stmt = _statements[name] = build()
+            _names[id(stmt)] = name
+            _stats[name] = {'executions': 0, 'compiled_hits': 0, 'compiled_misses': 0}
+        return stmt
+
+def statement(name):
+    """The registered statement called name, built on first use."""
+    stmt = _statements.get(name)
+    return stmt if stmt is not None else _register(name, _BUILDERS[name])
+
+def by_id(model):
+    """Primary-key lookup for model, with the key bound as :id."""
+    name = f"{model.__tablename__}.by_id"
+    stmt = _statements.get(name)
+    if stmt is None:
+        (key,) = model.__table__.primary_key.columns
+        stmt = _register(name, lambda: select_rows(model).where(key == bindparam('id')))
+    return stmt
+
+def _count_execution(conn, cursor, statement_text, parameters, context, executemany):
+    compiled = getattr(context, 'compiled', None)
+    name = _names.get(id(compiled.statement)) if compiled is not None else None
+    if name is None:
+        return
+    hit = context.cache_hit == context.dialect.CACHE_HIT
+    with _lock:
+        stats = _stats[name]
+        stats['executions'] += 1
+        stats['compiled_hits' if hit else 'compiled_misses'] += 1
+    record_cache_lookup('compiled_statements', hit)
+
+def get_statement_stats():
+    """{name: {'executions', 'compiled_hits', 'compiled_misses'}} per registered statement."""
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+def install_statement_stats(engine):
+    """Count compiled-cache hits and misses of registered statements (idempotent)."""
+    if not event.contains(engine, 'after_cursor_execute', _count_execution):
+        event.listen(engine, 'after_cursor_execute', _count_execution)
@@ -1,3 +1,8 @@
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 from models.team import Team
 from models.user import User
@@ -5,22 +10,146 @@ from models.badge import Badge
 from models.sprint import Sprint
 from models.badge_award import BadgeAward
 from crud.db_manager import DatabaseManager
+from caching import snapshot
+from caching.version_poller import current_versions, start_version_poller
+
+# Collections loaded on the first run of a session, keyed by the
+# session_state attribute they populate
+BOOTSTRAP_COLLECTIONS = {
+    'teams': Team,
+    'badges_dict': Badge,
+    'users': User,
+    'awards': BadgeAward,
+    'sprints': Sprint,
+}
+
+# Session keys served from the warm-start snapshot store instead of a query
+SNAPSHOT_KEYS = {
+    'teams': 'teams',
+    'badges_dict': 'badges',
+    'users': 'users',
+    'sprints': 'sprints',
+}
+
+# Session keys derived from a bootstrap collection, dropped with it
+DERIVED_KEYS = {
+    'badges_dict': ['badges'],
+}
+
+# Run bootstrap queries as coroutines on the async engine instead of a
+# thread pool (needs the optional async driver, see crud/async_db_manager.py)
+ASYNC_QUERIES = os.environ.get('ASYNC_QUERIES', '0') == '1'
+
+# Timings (ms) of the most recent bootstrap in this process
+last_bootstrap_timings = {}
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+async def _timed_async(coro):
+    started = time.perf_counter()
+    result = await coro
+    return result, (time.perf_counter() - started) * 1000
+
+def _load_collections_async(keys):
+    from crud.async_db_manager import AsyncDatabaseManager, gather
+    results = gather(**{key: _timed_async(AsyncDatabaseManager.get_all(BOOTSTRAP_COLLECTIONS[key]))
+                        for key in keys})
+    data = {key: result for key, (result, _) in results.items()}
+    timings = {key: elapsed for key, (_, elapsed) in results.items()}
+    return data, timings
+
+def load_collections(keys, max_workers=None):
+    """
+    Fetch the given bootstrap collections concurrently.
+    Every worker goes through DatabaseManager.get_all, which opens its own
+    session, so each query runs on a separate pooled connection.
+    With ASYNC_QUERIES=1 they are gathered on the async engine instead.
+    Returns (data, timings) where timings are in milliseconds.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}, {}
+
+    started = time.perf_counter()
+    if ASYNC_QUERIES:
+        data, timings = _load_collections_async(keys)
+        timings['total'] = (time.perf_counter() - started) * 1000
+        return data, timings
+
+    data, timings = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(keys),
+                            thread_name_prefix='bootstrap') as pool:
+        futures = {key: pool.submit(contextvars.copy_context().run, _timed,
+                                   DatabaseManager.get_all, BOOTSTRAP_COLLECTIONS[key]) for key in keys}
+        for key, future in futures.items():
+            data[key], timings[key] = future.result()
+    timings['total'] = (time.perf_counter() - started) * 1000
+    return data, timings
 
 def initialize_app_data():
-    if 'teams' not in st.session_state:
-        st.session_state.teams = DatabaseManager.get_all(Team)
-    if 'badges_dict' not in st.session_state:
-        badges = DatabaseManager.get_all(Badge)
-        st.session_state.badges_dict = {b['id']: b for b in badges}
-    if 'users' not in st.session_state:
-        st.session_state.users = DatabaseManager.get_all(User)
-    if 'awards' not in st.session_state:
-        st.session_state.awards = DatabaseManager.get_all(BadgeAward)
-    if 'sprints' not in st.session_state:
-        st.session_state.sprints = DatabaseManager.get_all(Sprint)
+    global last_bootstrap_timings
+
+    missing = [key for key in BOOTSTRAP_COLLECTIONS if key not in st.session_state]
+    if missing:
+        # Versions are read before the data, so a racing write shows up as stale later
+        versions = current_versions()
+        snapshot_keys = [key for key in missing if key in SNAPSHOT_KEYS]
+        query_keys = [key for key in missing if key not in SNAPSHOT_KEYS]
+
+        # Reference data comes from the snapshot store (delta-synced against
+        # data_versions) while the remaining collections are queried
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='bootstrap-snapshot') as pool:
+            reference_future = None
+            if snapshot_keys:
+                names = [SNAPSHOT_KEYS[key] for key in snapshot_keys]
+                reference_future = pool.submit(contextvars.copy_context().run, _timed,
+                                               snapshot.get_reference_data, names)
+            data, timings = load_collections(query_keys)
+            if reference_future:
+                reference, timings['snapshot'] = reference_future.result()
+                for key in snapshot_keys:
+                    data[key] = reference[SNAPSHOT_KEYS[key]]
+                timings['total'] = max(timings.get('total', 0), timings['snapshot'])
+        snapshot.start_snapshot_writer()
+        start_version_poller()
+
+        if 'badges_dict' in data:
+            data['badges_dict'] = {b['id']: b for b in data['badges_dict']}
+        for key, value in data.items():
+            st.session_state[key] = value
+        loaded_versions = dict(st.session_state.get('loaded_versions', {}))
+        for key in data:
+            loaded_versions[key] = versions.get(BOOTSTRAP_COLLECTIONS[key].__tablename__)
+        st.session_state.loaded_versions = loaded_versions
+        st.session_state.bootstrap_timings = timings
+        last_bootstrap_timings = timings
     if 'badges' not in st.session_state:
         st.session_state.badges = st.session_state.badges_dict
 
+def refresh_session_data():
+    """
+    Reload the session's collections whose table was written since they
+    were loaded (by any process). Returns the reloaded keys.
+    """
+    loaded_versions = st.session_state.get('loaded_versions')
+    if not loaded_versions:
+        return []
+    versions = current_versions()
+    stale = [
+        key for key, version in loaded_versions.items()
+        if versions.get(BOOTSTRAP_COLLECTIONS[key].__tablename__) != version
+    ]
+    for key in stale:
+        st.session_state.pop(key, None)
+        for derived in DERIVED_KEYS.get(key, []):
+            st.session_state.pop(derived, None)
+    if stale:
+        initialize_app_data()
+    return stale
+
 def initialize_auth_state():
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
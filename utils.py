@@ -7,9 +7,24 @@ from models.badge import Badge
 from models.sprint import Sprint
 from models.badge_award import BadgeAward
 from crud.db_manager import DatabaseManager
+from crud.rows import table_columns
+from crud.unit_of_work import transaction
+from crud.archive import get_archived_counts
 from queries.gamification_queries import GamificationQueries
+from monitoring.timing import timed_function
+from caching import shared_cache
+import csv
+import io
 import json
+import os
+import tempfile
 
+# Rows per chunk when streaming whole tables (exports, aggregations)
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', '5000'))
+# In-memory size of a table export before it spills to a temporary file
+EXPORT_SPOOL_BYTES = int(os.environ.get('EXPORT_SPOOL_BYTES', str(8 * 1024 * 1024)))
+
+@timed_function()
 def load_data(data_type):
     if data_type == 'badges':
         return {badge['id']: badge for badge in DatabaseManager.get_all(Badge)}
@@ -30,85 +45,91 @@ def load_data(data_type):
         return []
 
 
+@timed_function()
 def save_data(data_type, data):
     """
     Save data to database.
-    For bulk operations, this would be optimized in a production app.
+    All rows are written in one transaction.
     """
-    if data_type == 'badges':
-        # For dictionary-based badges
-        if isinstance(data, dict):
-            for badge_id, badge_data in data.items():
-                badge_data['id'] = badge_id
-                # Check if badge exists
-                existing = DatabaseManager.get_by_id(Badge, badge_id)
-                if existing:
-                    DatabaseManager.update(Badge, badge_id, badge_data)
-                else:
-                    DatabaseManager.create(Badge, badge_data)
-        # For list-based badges
-        else:
-            for badge_data in data:
-                badge_id = badge_data.get('id')
-                if badge_id:
+    with transaction():
+        if data_type == 'badges':
+            # For dictionary-based badges
+            if isinstance(data, dict):
+                for badge_id, badge_data in data.items():
+                    badge_data['id'] = badge_id
+                    # Check if badge exists
                     existing = DatabaseManager.get_by_id(Badge, badge_id)
                     if existing:
                         DatabaseManager.update(Badge, badge_id, badge_data)
                     else:
                         DatabaseManager.create(Badge, badge_data)
+            # For list-based badges
+            else:
+                for badge_data in data:
+                    badge_id = badge_data.get('id')
+                    if badge_id:
+                        existing = DatabaseManager.get_by_id(Badge, badge_id)
+                        if existing:
+                            DatabaseManager.update(Badge, badge_id, badge_data)
+                        else:
+                            DatabaseManager.create(Badge, badge_data)
     
-    elif data_type == 'users':
-        for user_data in data:
-            user_id = user_data.get('id')
-            if user_id:
-                existing = DatabaseManager.get_by_id(User, user_id)
-                if existing:
-                    DatabaseManager.update(User, user_id, user_data)
-                else:
-                    DatabaseManager.create(User, user_data)
+        elif data_type == 'users':
+            for user_data in data:
+                user_id = user_data.get('id')
+                if user_id:
+                    existing = DatabaseManager.get_by_id(User, user_id)
+                    if existing:
+                        DatabaseManager.update(User, user_id, user_data)
+                    else:
+                        DatabaseManager.create(User, user_data)
     
-    elif data_type == 'teams':
-        for team_data in data:
-            team_id = team_data.get('id')
-            if team_id:
-                existing = DatabaseManager.get_by_id(Team, team_id)
-                if existing:
-                    DatabaseManager.update(Team, team_id, team_data)
-                else:
-                    DatabaseManager.create(Team, team_data)
+        elif data_type == 'teams':
+            for team_data in data:
+                team_id = team_data.get('id')
+                if team_id:
+                    existing = DatabaseManager.get_by_id(Team, team_id)
+                    if existing:
+                        DatabaseManager.update(Team, team_id, team_data)
+                    else:
+                        DatabaseManager.create(Team, team_data)
     
-    elif data_type == 'awards':
-        for award_data in data:
-            award_id = award_data.get('id')
-            if award_id:
-                existing = DatabaseManager.get_by_id(BadgeAward, award_id)
-                if existing:
-                    DatabaseManager.update(BadgeAward, award_id, award_data)
-                else:
-                    DatabaseManager.create(BadgeAward, award_data)
+        elif data_type == 'awards':
+            for award_data in data:
+                award_id = award_data.get('id')
+                if award_id:
+                    existing = DatabaseManager.get_by_id(BadgeAward, award_id)
+                    if existing:
+                        DatabaseManager.update(BadgeAward, award_id, award_data)
+                    else:
+                        DatabaseManager.create(BadgeAward, award_data)
     
-    elif data_type == 'sprints':
-        for sprint_data in data:
-            sprint_id = sprint_data.get('id')
-            if sprint_id:
-                existing = DatabaseManager.get_by_id(Sprint, sprint_id)
-                if existing:
-                    DatabaseManager.update(Sprint, sprint_id, sprint_data)
-                else:
-                    DatabaseManager.create(Sprint, sprint_data)
+        elif data_type == 'sprints':
+            for sprint_data in data:
+                sprint_id = sprint_data.get('id')
+                if sprint_id:
+                    existing = DatabaseManager.get_by_id(Sprint, sprint_id)
+                    if existing:
+                        DatabaseManager.update(Sprint, sprint_id, sprint_data)
+                    else:
+                        DatabaseManager.create(Sprint, sprint_data)
 
+@timed_function()
 def get_user_by_id(user_id):
     """Get a user by their ID"""
     return DatabaseManager.get_by_id(User, user_id)
 
+@timed_function()
 def get_badge_by_id(badge_id):
     """Get a badge by its ID"""
     return DatabaseManager.get_by_id(Badge, badge_id)
 
+@timed_function()
 def get_team_by_id(team_id):
     """Get a team by its ID"""
     return DatabaseManager.get_by_id(Team, team_id)
 
+@timed_function()
 def get_user_badges(user_id):
     """Get all badges for a specific user"""
     awards = GamificationQueries.get_user_badges(user_id)
@@ -127,6 +148,7 @@ def get_user_badges(user_id):
     
     return result
 
+@timed_function()
 def get_team_members(team_id):
     """Get all members of a specific team"""
     return GamificationQueries.get_team_members(team_id)
@@ -148,6 +170,7 @@ def format_date(date_val):
     except:
         return str(date_val)
 
+@timed_function()
 def calculate_badge_progress(user_id, badge_id):
     """
     Calculate a user's progress towards earning a specific badge
@@ -167,6 +190,39 @@ def calculate_badge_progress(user_id, badge_id):
     import random
     return random.randint(0, 99)
 
+@timed_function()
+def export_table_csv(models, filename="export.csv", columns=None):
+    """
+    Export whole tables (a model or a list of models with the same columns)
+    to one CSV for download, built chunk by chunk from the database into a
+    spooled temporary file that moves to disk past EXPORT_SPOOL_BYTES.
+    st.download_button still takes the finished file as one bytes value,
+    so the whole CSV is held in memory once while the button is shown.
+    """
+    models = models if isinstance(models, (list, tuple)) else [models]
+    fieldnames = [column.name for column in table_columns(models[0], columns)]
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as spool:
+        text = io.TextIOWrapper(spool, encoding='utf-8', newline='')
+        writer = csv.DictWriter(text, fieldnames=fieldnames)
+        # Header from the model's columns, so an empty table still exports one
+        writer.writeheader()
+        for model in models:
+            for chunk in DatabaseManager.iter_all(model, STREAM_BATCH_SIZE, columns=columns):
+                writer.writerows(chunk)
+        text.flush()
+        text.detach()
+        spool.seek(0)
+        data = spool.read()
+
+    # Create a download button
+    st.download_button(
+        label="Download CSV",
+        data=data,
+        file_name=filename,
+        mime="text/csv"
+    )
+
+@timed_function()
 def export_to_csv(data, filename="export.csv"):
     """Export data to a CSV file for download"""
     df = pd.DataFrame(data)
@@ -180,6 +236,7 @@ def export_to_csv(data, filename="export.csv"):
         mime="text/csv"
     )
 
+@timed_function()
 def filter_badges_by_role(badges, role):
     """Filter badges by role requirement"""
     if role == 'All':
@@ -193,6 +250,7 @@ def filter_badges_by_role(badges, role):
     
     return [b for b in badges_list if role in b.get('eligible_roles', [])]
 
+@timed_function()
 def get_current_sprint():
     """Get the current active sprint"""
     active_sprints = GamificationQueries.get_active_sprints()
@@ -206,29 +264,35 @@ def get_current_sprint():
     
     return None
 
+@timed_function()
 def calculate_team_stats(team_id):
     """Calculate statistics for a team"""
+    return _calculate_team_stats(team_id, date.today().isoformat())
+
+# Shared by all server processes; "recent" depends on the day, so it is part of the key
+@shared_cache.cached('team_stats', tables=('users', 'badge_awards', 'award_archive_summary'))
+def _calculate_team_stats(team_id, as_of):
     team_members = get_team_members(team_id)
-    awards = DatabaseManager.get_all(BadgeAward)
     
     total_badges = 0
-    badges_per_member = {}
+    badges_per_member = {member['id']: 0 for member in team_members}
     recent_badges = 0
     
     # Calculate 30 days ago
-    thirty_days_ago = (datetime.now() - timedelta(days=30)).date()
+    thirty_days_ago = date.fromisoformat(as_of) - timedelta(days=30)
     
-    for member in team_members:
-        member_id = member['id']
-        member_awards = [a for a in awards if a['user_id'] == member_id]
-        
-        # Count total badges
-        member_badge_count = len(member_awards)
-        total_badges += member_badge_count
-        badges_per_member[member_id] = member_badge_count
-        
-        # Count recent badges
-        for award in member_awards:
+    # Awards are streamed in chunks so the whole history is never held at once
+    for chunk in DatabaseManager.iter_all(BadgeAward, STREAM_BATCH_SIZE, columns=['user_id', 'awarded_at']):
+        for award in chunk:
+            member_id = award['user_id']
+            if member_id not in badges_per_member:
+                continue
+            
+            # Count total badges
+            total_badges += 1
+            badges_per_member[member_id] += 1
+            
+            # Count recent badges
             awarded_at = award.get('awarded_at')
             # Convert string to date if necessary
             if isinstance(awarded_at, str):
@@ -239,6 +303,11 @@ def calculate_team_stats(team_id):
             if awarded_at and isinstance(awarded_at, date) and awarded_at >= thirty_days_ago:
                 recent_badges += 1
     
+    # Archived awards are older than any "recent" window; only their counts are needed
+    for member_id, count in get_archived_counts(badges_per_member).items():
+        total_badges += count
+        badges_per_member[member_id] += count
+    
     # Calculate average badges per member
     avg_badges = total_badges / len(team_members) if team_members else 0
     